@@ -0,0 +1,148 @@
+"""Peak RSS and throughput of the streaming CSV ingest vs. the legacy loader.
+
+Usage:
+    python benchmarks/bench_ingest.py [--repeat 20] [--chunksize 50000]
+
+``--repeat`` replicates the bundled CSV N times into a temporary file (every
+other copy with the whole-line quoting the scraper sometimes emits) so the
+loaders can be compared at archive scale. Each loader runs in a fresh
+process so its peak RSS is not polluted by the other one.
+"""
+
+import argparse
+import io
+import multiprocessing as mp
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _legacy_load(path):
+    """The original ``load_data``: readlines + cleaned copy + one big StringIO."""
+    import pandas as pd
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        lines = f.readlines()
+
+    header = lines[0].strip()
+    cleaned = [header]
+    for line in lines[1:]:
+        line = line.strip()
+        if line.startswith('"') and line.endswith('"'):
+            line = line[1:-1]
+            line = line.replace('""', '"')
+        cleaned.append(line)
+
+    df = pd.read_csv(io.StringIO('\n'.join(cleaned)))
+
+    def _extract_date(filename):
+        m = re.search(r'(\d{2})-(\d{2})-(\d{4})_al_(\d{2})-(\d{2})-(\d{4})', str(filename))
+        if m:
+            return pd.to_datetime(f"{m.group(6)}-{m.group(5)}-{m.group(4)}")
+        m = re.search(r'(\d{2})-(\d{2})-(\d{4})', str(filename))
+        if m:
+            return pd.to_datetime(f"{m.group(3)}-{m.group(2)}-{m.group(1)}")
+        return None
+
+    df['date'] = df['file'].apply(_extract_date)
+    df = df.dropna(subset=['date'])
+    df['year'] = df['date'].dt.year
+    df = df.drop_duplicates(subset=['N_Registro', 'status', 'date'])
+    return df
+
+
+def _streaming_count(path, chunksize):
+    """Consume the chunk iterator without materialising the full frame."""
+    from cnmv.ingest import iter_event_chunks
+    return sum(len(c) for c in iter_event_chunks(path, chunksize))
+
+
+def _streaming_load(path, chunksize):
+    from cnmv.ingest import load_events
+    return len(load_events(path, chunksize))
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def _worker(mode, path, chunksize, out):
+    import pandas  # noqa: F401  (import cost excluded from the measurement)
+    import cnmv.ingest  # noqa: F401
+    base = _peak_rss_mb()
+    t0 = time.perf_counter()
+    if mode == 'legacy':
+        rows = len(_legacy_load(path))
+    elif mode == 'stream':
+        rows = _streaming_count(path, chunksize)
+    else:
+        rows = _streaming_load(path, chunksize)
+    elapsed = time.perf_counter() - t0
+    out.put({'mode': mode, 'rows': rows, 'seconds': elapsed,
+             'peak_rss_mb': _peak_rss_mb(), 'import_rss_mb': base})
+
+
+def _make_input(repeat):
+    src = ROOT / 'cnmv_funds_data_FINAL.csv'
+    if repeat <= 1:
+        return str(src), None
+    with open(src, 'r', encoding='utf-8-sig') as f:
+        header = f.readline()
+        body = f.read().splitlines()
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for i in range(repeat):
+            # Offset the registry number so copies are distinct funds, not duplicates
+            for line in body:
+                head, _, reg = line.rpartition(',')
+                if reg.strip():
+                    line = f"{head},{int(float(reg)) + i * 100_000}"
+                if i % 2:
+                    line = '"' + line.replace('"', '""') + '"'
+                f.write(line)
+                f.write('\n')
+    return path, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    args = parser.parse_args()
+
+    path, tmp = _make_input(args.repeat)
+    ctx = mp.get_context('spawn')
+    try:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"input: {size_mb:.1f} MB  chunksize={args.chunksize:,}")
+        print(f"{'loader':<18}{'rows':>12}{'seconds':>10}{'rows/s':>14}{'peak RSS MB':>14}{'Δ RSS MB':>11}")
+        for mode, label in [('legacy', 'legacy readlines'),
+                            ('load', 'streaming concat'),
+                            ('stream', 'streaming iter')]:
+            out = ctx.Queue()
+            p = ctx.Process(target=_worker, args=(mode, path, args.chunksize, out))
+            p.start()
+            p.join()
+            if p.exitcode != 0:
+                raise RuntimeError(f"{label} worker failed (exit code {p.exitcode})")
+            r = out.get()
+            print(f"{label:<18}{r['rows']:>12,}{r['seconds']:>10.2f}"
+                  f"{r['rows'] / r['seconds']:>14,.0f}{r['peak_rss_mb']:>14.1f}"
+                  f"{r['peak_rss_mb'] - r['import_rss_mb']:>11.1f}")
+    finally:
+        if tmp:
+            os.unlink(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Before/after memory footprint of the compact (dictionary-encoded) schema.
+
+Usage:
+    python benchmarks/bench_memory.py [--repeat 1]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cnmv.compact import memory_report  # noqa: E402
+from cnmv.ingest import load_events  # noqa: E402
+from cnmv.lifecycle import build_lifecycle  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='stack the event table N times (registry numbers offset)')
+    args = parser.parse_args()
+
+    events = load_events(ROOT / 'cnmv_funds_data_FINAL.csv')
+    if args.repeat > 1:
+        events = pd.concat([events.assign(N_Registro=events['N_Registro'] + i * 100_000)
+                            for i in range(args.repeat)], ignore_index=True)
+    lifecycle = build_lifecycle(events)
+
+    with pd.option_context('display.float_format', '{:,.2f}'.format):
+        print(memory_report({'events': events, 'lifecycle': lifecycle}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Per-stage timings of the pipeline on synthetic event streams of growing size.
+
+Usage:
+    python benchmarks/bench_scaling.py [--sizes 10000 100000 1000000]
+        [--stages ingest lifecycle km_curves ...] [--out results.json]
+        [--compare previous.json]
+
+Each size gets a fresh stream from ``cnmv.synthetic`` (calibrated on the
+bundled CSV, fixed ``--seed``). It is written as CSV and pushed through every
+stage: ingest, entity resolution, compact encoding, lifecycle, edges, KM
+curves, the Cox model, HHI and the 3D graph. Results go to JSON together
+with the commit and library versions, so two runs can be diffed with
+``--compare``.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cnmv.compact import compact_frame  # noqa: E402
+from cnmv.concentration import compute_hhi_over_time  # noqa: E402
+from cnmv.cox import lifecycle_cox  # noqa: E402
+from cnmv.entities import build_entity_map, canonicalize  # noqa: E402
+from cnmv.ingest import load_events  # noqa: E402
+from cnmv.lifecycle import build_edges, build_lifecycle  # noqa: E402
+from cnmv.network3d import build_3d_html  # noqa: E402
+from cnmv.survival import FILTER_TYPES, compute_km_curves, compute_km_global  # noqa: E402
+from cnmv.synthetic import fit_profile, generate_events, write_events_csv  # noqa: E402
+
+
+def _stage_generate(s):
+    s['raw'] = generate_events(s['size'], seed=s['seed'], profile=s['profile'])
+
+
+def _stage_ingest(s):
+    write_events_csv(s['raw'], s['csv'])
+    s['events'] = load_events(s['csv'])
+
+
+def _stage_entities(s):
+    s['events'] = canonicalize(s['events'], build_entity_map(s['events']))
+
+
+def _stage_compact(s):
+    s['events'] = compact_frame(s['events'])
+
+
+def _stage_lifecycle(s):
+    s['lifecycle'] = compact_frame(build_lifecycle(s['events']))
+
+
+def _stage_edges(s):
+    s['edges'] = build_edges(s['events'])
+
+
+def _stage_km_curves(s):
+    for filter_type in FILTER_TYPES:
+        compute_km_curves(s['lifecycle'], filter_type)
+
+
+def _stage_km_global(s):
+    for filter_type in FILTER_TYPES:
+        compute_km_global(s['lifecycle'], filter_type)
+
+
+def _stage_cox(s):
+    lifecycle_cox(s['lifecycle'])
+
+
+def _stage_hhi(s):
+    compute_hhi_over_time(s['lifecycle'])
+
+
+def _stage_graph_3d(s):
+    build_3d_html(s['edges'], s['lifecycle'], 2)
+
+
+STAGES = {
+    'generate': _stage_generate,
+    'ingest': _stage_ingest,
+    'entities': _stage_entities,
+    'compact': _stage_compact,
+    'lifecycle': _stage_lifecycle,
+    'edges': _stage_edges,
+    'km_curves': _stage_km_curves,
+    'km_global': _stage_km_global,
+    'cox': _stage_cox,
+    'hhi': _stage_hhi,
+    'graph_3d': _stage_graph_3d,
+}
+
+# Stages whose output later stages read; always run, only timed if selected
+_REQUIRED = ['generate', 'ingest', 'entities', 'compact', 'lifecycle', 'edges']
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size, stages, profile, seed, workdir):
+    state = {'size': size, 'seed': seed, 'profile': profile, 'csv': Path(workdir) / f'events-{size}.csv'}
+    timings = {}
+    for name, stage in STAGES.items():
+        if name not in stages and name not in _REQUIRED:
+            continue
+        t0 = time.perf_counter()
+        stage(state)
+        if name in stages:
+            timings[name] = time.perf_counter() - t0
+        print(f'  {size:>11,}  {name:<10} {time.perf_counter() - t0:9.3f}s', flush=True)
+    return {
+        'size': size,
+        'events': len(state['events']),
+        'funds': len(state['lifecycle']),
+        'links': len(state['edges']),
+        'seconds': timings,
+    }
+
+
+def _compare(current, previous_path):
+    previous = json.loads(Path(previous_path).read_text())
+    old = {(r['size'], k): v for r in previous['runs'] for k, v in r['seconds'].items()}
+    print(f"\nvs {previous_path} (commit {previous['meta'].get('commit')})")
+    print(f"  {'size':>11}  {'stage':<10} {'before':>9} {'after':>9} {'ratio':>8}")
+    for r in current['runs']:
+        for name, after in r['seconds'].items():
+            before = old.get((r['size'], name))
+            if before is None:
+                continue
+            print(f"  {r['size']:>11,}  {name:<10} {before:8.3f}s {after:8.3f}s {after / before:7.3f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None,
+                        help='JSON results path (default benchmarks/results/scaling-<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to diff against')
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    out = Path(args.out) if args.out else ROOT / 'benchmarks' / 'results' / f'scaling-{commit or "local"}.json'
+    profile = fit_profile(load_events(ROOT / 'cnmv_funds_data_FINAL.csv'))
+
+    results = {
+        'meta': {
+            'commit': commit,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'seed': args.seed,
+        },
+        'runs': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results['runs'].append(run_size(size, args.stages, profile, args.seed, workdir))
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f'\nwrote {out}')
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
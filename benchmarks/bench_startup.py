@@ -0,0 +1,85 @@
+"""Dashboard startup: module import time and time to the first full render.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5]
+
+Every measurement runs in a fresh interpreter so nothing is already in
+``sys.modules``. "imports" times the top-level imports of the original
+``main.py`` against the current ones; "first render" runs ``main.py`` once
+headlessly (``streamlit.testing``) with the table cache warm, and lists which
+heavy modules the default view ended up importing.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LEGACY_IMPORTS = [
+    'streamlit', 'streamlit.components.v1', 'pandas', 'plotly.express',
+    'plotly.graph_objects', 'plotly.subplots', 'networkx', 'numpy', 're',
+    'collections', 'datetime',
+]
+
+CURRENT_IMPORTS = ['streamlit', 'pandas', 'plotly.graph_objects', 'plotly.subplots', 'cnmv']
+
+HEAVY_MODULES = ['networkx', 'plotly.express', 'scipy', 'matplotlib', 'streamlit.components.v1']
+
+_IMPORT_SNIPPET = '''
+import time
+t0 = time.perf_counter()
+{imports}
+print(time.perf_counter() - t0)
+'''
+
+_RENDER_SNIPPET = '''
+import sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('main.py', default_timeout=600).run()
+elapsed = time.perf_counter() - t0
+assert not at.exception, at.exception
+print(elapsed)
+print(','.join(m for m in {heavy!r} if m in sys.modules) or 'none')
+'''
+
+
+def _run(code):
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    return out.stdout.strip().splitlines()
+
+
+def _import_time(modules):
+    return float(_run(_IMPORT_SNIPPET.format(imports='\n'.join(f'import {m}' for m in modules)))[-1])
+
+
+def _summary(label, times):
+    print(f'{label:<24} median {statistics.median(times):6.2f}s   min {min(times):6.2f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Warm the table and artifact cache so the render timing excludes parsing
+    _run('import cnmv; cnmv.load_shared(); cnmv.load_artifacts()')
+
+    _summary('imports (legacy)', [_import_time(LEGACY_IMPORTS) for _ in range(args.repeat)])
+    _summary('imports (current)', [_import_time(CURRENT_IMPORTS) for _ in range(args.repeat)])
+
+    times = []
+    for _ in range(args.repeat):
+        lines = _run(_RENDER_SNIPPET.format(heavy=HEAVY_MODULES))
+        times.append(float(lines[-2]))
+        loaded = lines[-1]
+    _summary('first render (current)', times)
+    print(f'heavy modules loaded by the default view: {loaded}')
+
+
+if __name__ == '__main__':
+    main()
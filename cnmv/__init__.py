@@ -0,0 +1,55 @@
+"""Headless analytics for the CNMV fund observatory.
+
+Submodules are imported on first use: ``cnmv.load_events`` loads only
+:mod:`cnmv.ingest`, so importing the package alone pulls in neither pyarrow
+(cache, artifacts) nor the bootstrap's process pool. Scripts that know what
+they need can import the submodules directly.
+"""
+
+import importlib
+
+# Public name → defining submodule
+_EXPORTS = {
+    'artifacts': ('export_artifacts', 'load_artifacts', 'load_bootstrap'),
+    'asof': ('AsOfIndex',),
+    'bias': ('survivorship_bias',),
+    'bootstrap': ('bootstrap_intervals',),
+    'cache': ('cached_json', 'cached_table', 'fingerprint', 'load_cached', 'load_entity_map'),
+    'compact': ('compact_frame', 'expand_days', 'from_days', 'memory_report', 'to_days'),
+    'concentration': ('compute_hhi_over_time', 'concentration_series'),
+    'cox': ('fit_cox', 'lifecycle_covariates', 'lifecycle_cox'),
+    'crises': ('CRISES', 'event_study'),
+    'cube': ('EventCube', 'event_cube'),
+    'entities': ('build_entity_map', 'canonicalize', 'name_key'),
+    'incremental': ('LifecycleStore',),
+    'ingest': ('DATA_FILE', 'bulletin_windows', 'iter_event_chunks', 'load_events'),
+    'lifecycle': ('birth_records', 'build_edges', 'build_lifecycle', 'build_network_data', 'death_dates',
+                  'finish_lifecycle', 'is_structured', 'node_sizes'),
+    'network3d': ('build_3d_html', 'graph_data', 'graph_view', 'render_3d_html'),
+    'rates': ('DEFAULT_WINDOWS', 'rolling_rates'),
+    'shared': ('attach', 'load_shared', 'publish'),
+    'stock': ('FundStock',),
+    'survival': ('COHORT_LABELS', 'LaunchYearIndex', 'SurvivalCurve', 'binned_hazard', 'cohort_edges',
+                 'cohort_ranges', 'compute_km_curves', 'compute_km_global', 'entity_survival',
+                 'greenwood_band', 'grouped_counts', 'grouped_km', 'horizon_survival', 'kaplan_meier',
+                 'km_counts', 'km_from_table', 'launch_cohorts', 'logrank', 'nelson_aalen', 'range_label',
+                 'rolling_ranges', 'smoothed_hazard', 'survival_tables'),
+    'synthetic': ('fit_profile', 'generate_events', 'write_events_csv'),
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
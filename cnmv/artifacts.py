@@ -0,0 +1,174 @@
+"""Precomputed dashboard artifacts: survival curves, tests and models, HHI, event cube and graph.
+
+Artifacts live in the CSV-fingerprinted cache next to the tables (see
+:mod:`cnmv.cache`), so the dashboard only reads them; whichever comes first,
+the batch CLI or the first session, computes them. Every artifact is
+computed from the tables as they stood on ``as_of`` (see :mod:`cnmv.asof`),
+with alive funds censored at that date, so each is cached per ``as_of`` day;
+only month ends and the latest other day are kept. Bootstrap intervals are
+cached per filter as well, on demand.
+"""
+
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from .asof import AsOfIndex
+from .bias import survivorship_bias
+from .bootstrap import DEFAULT_REPLICATES, bootstrap_intervals
+from .cache import CACHE_DIR, cached_json, cached_table, fingerprint, load_cached, write_table
+from .concentration import compute_hhi_over_time
+from .cox import lifecycle_cox
+from .crises import event_study
+from .cube import event_cube
+from .ingest import DATA_FILE
+from .network3d import graph_data
+from .rates import rolling_rates
+from .survival import FILTER_TYPES, entity_survival, launch_cohorts, survival_tables
+
+EXPORT_FORMATS = ('arrow', 'parquet', 'csv')
+
+# The ``YYYYMMDD`` as-of stamp in an artifact name (``km-20240131``, ``bootstrap-all-20240131-2000-0``)
+_STAMP = re.compile(r'-(\d{8})(?=-|$)')
+
+
+def _as_of(as_of, path, cache_dir):
+    """``as_of`` as a day; by default the last event date, the latest state the CSV observes."""
+    if as_of is None:
+        return pd.Timestamp(load_cached(path, cache_dir)[0]['date'].max()).normalize()
+    return pd.Timestamp(as_of).normalize()
+
+
+def _tables(path, cache_dir, as_of):
+    """``(events, lifecycle, edges)`` of ``path`` as they stood on ``as_of``."""
+    return AsOfIndex(*load_cached(path, cache_dir)).tables(as_of)
+
+
+def _prune(path, cache_dir, as_of):
+    """Delete the cached artifacts of days other than ``as_of`` that are not slider dates.
+
+    Month ends and the last event date are the dashboard's slider dates and
+    are kept; any other day (a one-off ``--as-of`` or library call) only
+    keeps its artifacts until another such day is requested.
+    """
+    keep = {f'{as_of:%Y%m%d}', f'{_as_of(None, path, cache_dir):%Y%m%d}'}
+    for target in (Path(cache_dir) / fingerprint(path, cache_dir)).glob('*-*'):
+        match = _STAMP.search(target.stem)
+        if not match or match.group(1) in keep:
+            continue
+        day = pd.Timestamp(match.group(1))
+        if not day.is_month_end:
+            target.unlink(missing_ok=True)
+
+
+def load_artifacts(path=DATA_FILE, cache_dir=CACHE_DIR, as_of=None):
+    """``{'km', 'logrank', 'cox', 'hhi', 'cube', 'graph'}`` for ``path``, computing any missing artifact once."""
+    as_of = _as_of(as_of, path, cache_dir)
+    stamp = f'{as_of:%Y%m%d}'
+    _prune(path, cache_dir, as_of)
+    computed = {}
+
+    def tables():
+        if 'tables' not in computed:
+            computed['tables'] = _tables(path, cache_dir, as_of)
+        return computed['tables']
+
+    def lifecycle():
+        return tables()[1]
+
+    def edges():
+        return tables()[2]
+
+    def survival(name):
+        # Curves and tests come from one pass; build both on a miss of either
+        if name not in computed:
+            computed['km'], computed['logrank'] = survival_tables(lifecycle(), as_of)
+        return computed[name]
+
+    return {
+        'km': cached_table(f'km-{stamp}', lambda: survival('km'), path, cache_dir),
+        'logrank': cached_table(f'logrank-{stamp}', lambda: survival('logrank'), path, cache_dir),
+        'cox': cached_table(f'cox-{stamp}', lambda: lifecycle_cox(lifecycle(), as_of).reset_index(),
+                            path, cache_dir),
+        'hhi': cached_table(f'hhi-{stamp}', lambda: compute_hhi_over_time(lifecycle(), as_of=as_of),
+                            path, cache_dir),
+        'cube': cached_table(f'cube-{stamp}', lambda: event_cube(tables()[0], lifecycle()), path, cache_dir),
+        'graph': cached_json(f'graph-{stamp}', lambda: graph_data(edges(), lifecycle(), as_of),
+                             path, cache_dir),
+    }
+
+
+def load_bootstrap(filter_type, path=DATA_FILE, cache_dir=CACHE_DIR, as_of=None,
+                   replicates=DEFAULT_REPLICATES, seed=0):
+    """Bootstrap intervals of the cohort-table statistics for one filter, computed once."""
+    as_of = _as_of(as_of, path, cache_dir)
+    name = f'bootstrap-{filter_type}-{as_of:%Y%m%d}-{replicates}-{seed}'
+    return cached_table(name, lambda: bootstrap_intervals(_tables(path, cache_dir, as_of)[1], filter_type,
+                                                          replicates, seed=seed, as_of=as_of),
+                        path, cache_dir)
+
+
+def _write(df, target, fmt):
+    if fmt == 'arrow':
+        write_table(df, target)
+    elif fmt == 'parquet':
+        df.to_parquet(target, index=False)
+    else:
+        df.to_csv(target, index=False)
+
+
+def export_artifacts(out_dir, path=DATA_FILE, cache_dir=CACHE_DIR, as_of=None, fmt='arrow',
+                     replicates=DEFAULT_REPLICATES):
+    """Write every derived table and artifact for ``path`` to ``out_dir``.
+
+    Tables are taken as they stood on ``as_of``. They go out as
+    ``<name>.<fmt>``, the graph as ``graph.json``, plus a
+    ``manifest.json`` with the CSV fingerprint, ``as_of`` date and row counts.
+    ``replicates=0`` leaves out the bootstrap tables.
+    Returns the list of files written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'fmt must be one of {EXPORT_FORMATS}, got {fmt!r}')
+    as_of = _as_of(as_of, path, cache_dir)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    _, lifecycle, edges = _tables(path, cache_dir, as_of)
+    artifacts = load_artifacts(path, cache_dir, as_of)
+    tables = {'lifecycle': lifecycle, 'edges': edges, 'km': artifacts['km'],
+              'logrank': artifacts['logrank'], 'cox': artifacts['cox'], 'hhi': artifacts['hhi'],
+              'cube': artifacts['cube']}
+    for name, by in (('gestora', 'Gestora'), ('depositaria', 'Depositaria'),
+                     ('pair', ['Gestora', 'Depositaria'])):
+        tables[f'survival_{name}'] = entity_survival(lifecycle, by, as_of=as_of).reset_index()
+    for name, by in (('bias', None), ('bias_gestora', 'Gestora'), ('bias_cohort', launch_cohorts(lifecycle))):
+        tables[name] = survivorship_bias(lifecycle, by, as_of).reset_index()
+    for name, by in (('rates', None), ('rates_gestora', 'Gestora')):
+        tables[name] = rolling_rates(lifecycle, by=by, as_of=as_of).reset_index()
+    for name, by in (('crises', None), ('crises_gestora', 'Gestora')):
+        tables[name] = event_study(lifecycle, by=by, as_of=as_of).reset_index()
+    for filter_type in FILTER_TYPES if replicates else ():
+        tables[f'bootstrap_{filter_type}'] = load_bootstrap(filter_type, path, cache_dir, as_of, replicates)
+
+    written = []
+    for name, df in tables.items():
+        target = out_dir / f'{name}.{fmt}'
+        _write(df, target, fmt)
+        written.append(target)
+    target = out_dir / 'graph.json'
+    target.write_text(json.dumps(artifacts['graph']))
+    written.append(target)
+
+    manifest = {
+        'source': str(Path(path).resolve()),
+        'fingerprint': fingerprint(path, cache_dir),
+        'as_of': as_of.strftime('%Y-%m-%d'),
+        'format': fmt,
+        'rows': {name: len(df) for name, df in tables.items()},
+    }
+    target = out_dir / 'manifest.json'
+    target.write_text(json.dumps(manifest, indent=2))
+    written.append(target)
+    return written
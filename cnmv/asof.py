@@ -0,0 +1,71 @@
+"""Point-in-time views of the event, lifecycle and network tables.
+
+:class:`AsOfIndex` sorts event dates and launch dates once. The state on any
+date is then a binary search into those sorted arrays plus a row take:
+- the events published up to the date;
+- the funds launched by then, with later liquidations undone (so they are
+  active again, and censored at the date by the survival code);
+- the network edges rebuilt from that event prefix.
+On the bundled data the lifecycle matches a rebuild from the truncated event
+history. That holds as long as each fund's first registration record is its
+earliest one.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .lifecycle import build_edges
+
+
+class AsOfIndex:
+    """Events, lifecycle and edges as they stood on any past date.
+
+    Build it once from the full tables (as returned by ``load_cached`` or
+    ``load_shared``). Views keep the original row order. Dates on or after
+    the last event return the full tables themselves, with no copy.
+    """
+
+    def __init__(self, events, lifecycle, edges):
+        self._events, self._lifecycle, self._edges = events, lifecycle, edges
+        dates = events['date'].to_numpy()
+        self._event_order = np.argsort(dates, kind='stable')
+        self._event_dates = dates[self._event_order]
+        alta = lifecycle['Fecha_Alta'].to_numpy()
+        self._fund_order = np.argsort(alta, kind='stable')
+        self._fund_dates = alta[self._fund_order]
+        self.last = pd.Timestamp(self._event_dates[-1]) if len(dates) else pd.Timestamp.min
+
+    @staticmethod
+    def _upto(order, sorted_dates, date):
+        """Positions (in original row order) of the rows dated on or before ``date``."""
+        k = np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(date), 'ns'), side='right')
+        return np.sort(order[:k])
+
+    def events(self, date):
+        """Events published on or before ``date``."""
+        if pd.Timestamp(date) >= self.last:
+            return self._events
+        return self._events.iloc[self._upto(self._event_order, self._event_dates, date)].reset_index(drop=True)
+
+    def lifecycle(self, date):
+        """Funds launched on or before ``date``; liquidations after it are undone."""
+        date = pd.Timestamp(date)
+        if date >= self.last:
+            return self._lifecycle
+        lc = self._lifecycle.iloc[self._upto(self._fund_order, self._fund_dates, date)].reset_index(drop=True)
+        late = (lc['Fecha_Baja'] > date).to_numpy()
+        if late.any():
+            lc.loc[late, 'Fecha_Baja'] = pd.NaT
+            lc.loc[late, ['Vida_Anos', 'Año_Baja']] = np.nan
+            lc.loc[late, 'Activo'] = True
+        return lc
+
+    def edges(self, date):
+        """Gestora–Depositaria edges of the events published on or before ``date``."""
+        if pd.Timestamp(date) >= self.last:
+            return self._edges
+        return build_edges(self.events(date))
+
+    def tables(self, date):
+        """``(events, lifecycle, edges)`` as of ``date``."""
+        return self.events(date), self.lifecycle(date), self.edges(date)
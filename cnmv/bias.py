@@ -0,0 +1,70 @@
+"""Survivorship bias over time: the share of launched funds a survivor-only view no longer shows."""
+
+import numpy as np
+import pandas as pd
+
+_COLUMNS = ['launched', 'liquidated', 'alive', 'bias']
+
+
+def _month_grid(start, now):
+    """Month ends from ``start``'s month up to ``now``, plus ``now`` itself if it is mid-month."""
+    grid = pd.date_range(pd.Timestamp(start) + pd.offsets.MonthEnd(0), now, freq='ME')
+    if not len(grid) or grid[-1] != now:
+        grid = grid.append(pd.DatetimeIndex([now]))
+    return grid
+
+
+def survivorship_bias(lifecycle, by=None, as_of=None):
+    """Monthly share of the funds launched so far that have since been liquidated.
+
+    That share is what a database of surviving funds silently leaves out. For
+    each month end ``t`` up to ``as_of`` (today by default; the last point is
+    ``as_of`` itself) the columns are ``launched`` (``Fecha_Alta`` ≤ t),
+    ``liquidated`` (``Fecha_Baja`` ≤ t), ``alive`` and ``bias`` =
+    liquidated / launched.
+
+    All months come from one sweep: birth and death dates are placed on the
+    month grid with one ``searchsorted`` each, counted per (group, month)
+    with ``bincount`` and accumulated along the months. ``by`` is a column,
+    or labels aligned with the rows (e.g. :func:`cnmv.survival.launch_cohorts`);
+    funds with a missing key are left out. Indexed by ``date``, or by
+    ``(group, date)`` when ``by`` is given; months before a group's first
+    launch are dropped.
+    """
+    now = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    if by is None:
+        codes, groups = np.zeros(len(lifecycle), dtype=np.int64), None
+    else:
+        key = lifecycle[by] if isinstance(by, str) else pd.Series(by, index=lifecycle.index)
+        codes, groups = pd.factorize(key, sort=True)
+    keep = codes >= 0
+    if not keep.any():
+        index = pd.DatetimeIndex([], name='date') if by is None else pd.MultiIndex.from_arrays(
+            [[], pd.DatetimeIndex([])], names=['group', 'date'])
+        return pd.DataFrame({c: pd.Series(dtype=float) for c in _COLUMNS}, index=index)
+
+    alta = lifecycle['Fecha_Alta'].to_numpy('datetime64[ns]')[keep]
+    baja = lifecycle['Fecha_Baja'].to_numpy('datetime64[ns]')[keep]
+    codes = codes[keep]
+    grid = _month_grid(alta.min(), now)
+    n_months, n_groups = len(grid), 1 if groups is None else len(groups)
+
+    def cumulative(dates, group):
+        # Dates after the last grid point land in an overflow column that is dropped
+        month = np.searchsorted(grid.to_numpy(), dates, side='left')
+        counts = np.bincount(group * (n_months + 1) + month, minlength=n_groups * (n_months + 1))
+        return np.cumsum(counts.reshape(n_groups, n_months + 1)[:, :n_months], axis=1)
+
+    dead = ~np.isnat(baja)
+    launched = cumulative(alta, codes)
+    liquidated = cumulative(baja[dead], codes[dead])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bias = np.where(launched > 0, liquidated / launched, np.nan)
+
+    table = pd.DataFrame({'launched': launched.ravel(), 'liquidated': liquidated.ravel(),
+                          'alive': (launched - liquidated).ravel(), 'bias': bias.ravel()})
+    if groups is None:
+        table.index = pd.DatetimeIndex(grid, name='date')
+        return table
+    table.index = pd.MultiIndex.from_product([groups, grid], names=['group', 'date'])
+    return table[table['launched'] > 0]
@@ -0,0 +1,135 @@
+"""Bootstrap percentile intervals for the cohort-table statistics.
+
+The statistics are KM survival at fixed horizons and the median lifetime of
+the liquidated funds, per launch cohort and for all funds of the filter
+(``GLOBAL_CURVE``). Funds are resampled with replacement within each of those
+groups. A block of replicates is evaluated in a single :func:`grouped_km`
+call, using (replicate, group) as the group key, so there is no Python loop
+per replicate. Blocks are spread over a process pool. Every block draws from
+its own child of ``SeedSequence(seed)``, and the block layout depends only on
+the data, so results do not depend on the number of workers.
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .survival import (DEFAULT_LEVEL, GLOBAL_CURVE, _cohort_codes, _default_ranges, _durations, _subset,
+                       grouped_km, horizon_survival, range_label)
+
+DEFAULT_REPLICATES = 2000
+
+BOOTSTRAP_HORIZONS = (3, 5, 10, 15)
+
+# Rows resampled per block (replicates × funds); bounds worker memory
+_BLOCK_ROWS = 1_000_000
+
+# Below this many resampled rows, process start-up costs more than it saves
+_POOL_ROWS = 20_000_000
+
+
+def _grouped_median(values, group, n_groups):
+    """Median of the non-NaN ``values`` of each group (NaN for an empty group)."""
+    ok = ~np.isnan(values)
+    v, g = values[ok], group[ok]
+    order = np.lexsort((v, g))
+    v = v[order]
+    counts = np.bincount(g, minlength=n_groups)
+    start = np.r_[0, np.cumsum(counts)[:-1]]
+    out = np.full(n_groups, np.nan)
+    has = counts > 0
+    lo = start[has] + (counts[has] - 1) // 2
+    hi = start[has] + counts[has] // 2
+    out[has] = (v[lo] + v[hi]) / 2
+    return out
+
+
+def _statistics(duration, event, life, group, n_groups, horizons):
+    """``n_groups × (len(horizons) + 1)`` array: S(h) for each horizon, then median life."""
+    surv = horizon_survival(grouped_km(duration, event, group), horizons).reindex(range(n_groups))
+    return np.column_stack([surv[f'surv_{h}'].to_numpy(dtype=float) for h in horizons]
+                           + [_grouped_median(life, group, n_groups)])
+
+
+def _block(task):
+    """Statistics of ``n_rep`` stratified resamples, shape ``n_rep × groups × stats``."""
+    duration, event, life, group, n_groups, horizons, seed, n_rep = task
+    rng = np.random.default_rng(seed)
+    sizes = np.bincount(group, minlength=n_groups)
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    slot = np.tile(group, n_rep)
+    pick = starts[slot] + (rng.random(len(slot)) * sizes[slot]).astype(np.int64)
+    # Rows are sorted by (group, duration), so sorting (replicate, row) keys
+    # hands grouped_km its input already in order
+    key = np.sort(np.repeat(np.arange(n_rep) * len(group), len(group)) + pick)
+    rep, pick = np.divmod(key, len(group))
+    stats = _statistics(duration[pick], event[pick], life[pick], rep * n_groups + group[pick],
+                        n_rep * n_groups, horizons)
+    return stats.reshape(n_rep, n_groups, -1)
+
+
+def _strata(lifecycle, filter_type, as_of):
+    """Rows of each cohort (≥ 10 funds) and of the whole filter, sorted by (group, duration)."""
+    duration, event, year = _durations(lifecycle, filter_type, as_of)
+    life = _subset(lifecycle, filter_type)['Vida_Anos'].to_numpy(dtype=float)
+    ranges = _default_ranges(lifecycle)
+    codes = _cohort_codes(year, ranges)
+
+    labels, rows = [], []
+    for i, cohort in enumerate(ranges):
+        idx = np.flatnonzero(codes == i)
+        if len(idx) >= 10:
+            idx = idx[np.argsort(duration[idx], kind='stable')]
+            labels.append(range_label(*cohort))
+            rows.append(idx)
+    labels.append(GLOBAL_CURVE)
+    rows.append(np.argsort(duration, kind='stable'))
+
+    idx = np.concatenate(rows)
+    group = np.repeat(np.arange(len(rows)), [len(r) for r in rows])
+    return labels, duration[idx], event[idx], life[idx], group
+
+
+def bootstrap_intervals(lifecycle, filter_type='all', replicates=DEFAULT_REPLICATES,
+                        level=DEFAULT_LEVEL, seed=0, workers=None, as_of=None,
+                        horizons=BOOTSTRAP_HORIZONS):
+    """Percentile bootstrap intervals for the cohort-table statistics of ``filter_type``.
+
+    Returns one row per (group, statistic) with columns ``group`` (cohort
+    label or ``GLOBAL_CURVE``), ``statistic`` (``surv_<h>`` or
+    ``median_life``), ``estimate``, ``lower`` and ``upper``. ``workers=1``
+    runs in-process; by default small inputs do, and large ones use up to 4
+    processes.
+    """
+    labels, duration, event, life, group = _strata(lifecycle, filter_type, as_of)
+    n_groups = len(labels)
+    names = [f'surv_{h}' for h in horizons] + ['median_life']
+    estimate = _statistics(duration, event, life, group, n_groups, horizons)
+
+    per_block = max(1, min(replicates, _BLOCK_ROWS // max(len(group), 1)))
+    sizes = [min(per_block, replicates - i) for i in range(0, replicates, per_block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(duration, event, life, group, n_groups, horizons, s, n) for s, n in zip(seeds, sizes)]
+
+    if workers is None:
+        workers = 1 if replicates * len(group) < _POOL_ROWS else min(4, os.cpu_count() or 1)
+    if workers == 1 or len(tasks) == 1:
+        blocks = list(map(_block, tasks))
+    else:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn')) as pool:
+            blocks = list(pool.map(_block, tasks))
+    samples = np.concatenate(blocks) if blocks else np.empty((0, n_groups, len(names)))
+
+    tail = (1 - level) / 2 * 100
+    with np.errstate(all='ignore'):
+        lower, upper = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return pd.DataFrame({
+        'group': np.repeat(labels, len(names)),
+        'statistic': np.tile(names, n_groups),
+        'estimate': estimate.ravel(),
+        'lower': lower.ravel(),
+        'upper': upper.ravel(),
+    })
@@ -0,0 +1,122 @@
+"""On-disk columnar cache of the parsed tables, keyed by the source CSV content.
+
+Each derived table is written once as an uncompressed Arrow IPC (Feather v2)
+file under ``<cache_dir>/<fingerprint>/`` and read back through a memory map,
+so a restarted process or a new worker skips parsing entirely. Editing the
+CSV changes its fingerprint and therefore the cache directory; bumping
+``CACHE_VERSION`` invalidates every entry after a schema change.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .compact import compact_frame
+from .entities import build_entity_map, canonicalize
+from .ingest import DATA_FILE, load_events
+from .lifecycle import build_edges, build_lifecycle
+
+CACHE_DIR = '.cnmv_cache'
+
+CACHE_VERSION = 4
+
+_HASH_BLOCK = 1 << 20
+
+
+def fingerprint(path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Content hash of ``path``, memoised by (size, mtime) to avoid re-reading it."""
+    path = Path(path).resolve()
+    st = path.stat()
+    stamp = [st.st_size, st.st_mtime_ns]
+    memo_path = Path(cache_dir) / 'fingerprints.json'
+    try:
+        memo = json.loads(memo_path.read_text())
+    except (OSError, ValueError):
+        memo = {}
+    hit = memo.get(str(path))
+    if hit and hit['stamp'] == stamp:
+        return hit['digest']
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            h.update(block)
+    h.update(f'v{CACHE_VERSION}'.encode())
+    digest = h.hexdigest()
+
+    memo[str(path)] = {'stamp': stamp, 'digest': digest}
+    _atomic_write(memo_path, lambda tmp: tmp.write_text(json.dumps(memo)))
+    return digest
+
+
+def _atomic_write(target, write):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+    write(tmp)
+    os.replace(tmp, target)
+
+
+def write_table(df, target):
+    """Write ``df`` as an uncompressed (mmap-able) Arrow IPC file."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    _atomic_write(Path(target),
+                  lambda tmp: feather.write_feather(table, tmp, compression='uncompressed'))
+
+
+def read_table(source):
+    """Memory-map an Arrow IPC file and return it as a DataFrame."""
+    return feather.read_table(source, memory_map=True).to_pandas()
+
+
+def cached_table(name, build, path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Return table ``name`` for the current CSV, calling ``build()`` on a miss."""
+    target = Path(cache_dir) / fingerprint(path, cache_dir) / f'{name}.arrow'
+    if target.exists():
+        return read_table(target)
+    df = build().reset_index(drop=True)
+    write_table(df, target)
+    return df
+
+
+def cached_json(name, build, path=DATA_FILE, cache_dir=CACHE_DIR):
+    """JSON counterpart of :func:`cached_table` for nested, non-tabular results."""
+    target = Path(cache_dir) / fingerprint(path, cache_dir) / f'{name}.json'
+    if target.exists():
+        return json.loads(target.read_text())
+    obj = build()
+    _atomic_write(target, lambda tmp: tmp.write_text(json.dumps(obj)))
+    return obj
+
+
+def load_entity_map(path=DATA_FILE, cache_dir=CACHE_DIR, raw_events=None):
+    """Raw → canonical Gestora/Depositaria mapping for ``path`` (cached)."""
+    return cached_table('entities',
+                        lambda: build_entity_map(load_events(path) if raw_events is None
+                                                 else raw_events),
+                        path, cache_dir)
+
+
+def load_cached(path=DATA_FILE, cache_dir=CACHE_DIR, compact=True):
+    """Events, lifecycle and network edges for ``path``, from cache when fresh.
+
+    Gestora/Depositaria are resolved to canonical entity names (see
+    :mod:`cnmv.entities`). With ``compact`` (the default) the tables use the
+    dictionary-encoded schema of :mod:`cnmv.compact`; dates stay datetime64
+    for the views.
+    """
+    encode = compact_frame if compact else (lambda df: df)
+    suffix = '' if compact else '-plain'
+
+    def _events():
+        raw = load_events(path)
+        return encode(canonicalize(raw, load_entity_map(path, cache_dir, raw)))
+
+    events = cached_table('events' + suffix, _events, path, cache_dir)
+    lifecycle = cached_table('lifecycle' + suffix, lambda: encode(build_lifecycle(events)),
+                             path, cache_dir)
+    edges = cached_table('edges' + suffix, lambda: build_edges(events), path, cache_dir)
+    return events, lifecycle, edges
@@ -0,0 +1,147 @@
+"""Command-line entry point: ``python -m cnmv build`` runs the pipeline offline.
+
+``build`` parses the CSV (or reuses the cache), publishes the shared
+buffers and computes every dashboard artifact, so the next Streamlit session
+starts from precomputed results. ``--out`` also exports them for batch jobs.
+
+``ingest`` appends a new bulletin CSV to the data file and updates the
+cached tables through :class:`cnmv.incremental.LifecycleStore` instead of
+re-parsing and re-resolving the whole history.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from .artifacts import EXPORT_FORMATS, export_artifacts, load_artifacts, load_bootstrap
+from .bootstrap import DEFAULT_REPLICATES
+from .cache import CACHE_DIR, cached_table, load_cached, load_entity_map
+from .compact import compact_frame
+from .entities import ROLES, build_entity_map, canonicalize
+from .incremental import LifecycleStore
+from .ingest import DATA_FILE, _dedup, _repair_line, load_events
+from .shared import load_shared
+from .survival import FILTER_TYPES
+
+
+def _build(args):
+    t0 = time.perf_counter()
+    events, lifecycle, edges = load_shared(args.data, args.cache_dir)
+    print(f'tables     {len(events):,} events · {len(lifecycle):,} funds · {len(edges):,} links '
+          f'({time.perf_counter() - t0:.1f}s)')
+
+    t0 = time.perf_counter()
+    artifacts = load_artifacts(args.data, args.cache_dir, args.as_of)
+    print(f'artifacts  {len(artifacts["km"]):,} KM points · {len(artifacts["hhi"])} HHI periods · '
+          f'{len(artifacts["graph"]["edges"]):,} graph links ({time.perf_counter() - t0:.1f}s)')
+
+    if args.replicates:
+        t0 = time.perf_counter()
+        for filter_type in FILTER_TYPES:
+            load_bootstrap(filter_type, args.data, args.cache_dir, args.as_of, args.replicates)
+        print(f'bootstrap  {args.replicates:,} replicates × {len(FILTER_TYPES)} filters '
+              f'({time.perf_counter() - t0:.1f}s)')
+
+    if args.out:
+        written = export_artifacts(args.out, args.data, args.cache_dir, args.as_of, args.format,
+                                   args.replicates)
+        for target in written:
+            print(f'wrote      {target}')
+    return 0
+
+
+def _append_rows(source, target):
+    """Append the data lines of CSV ``source`` to ``target``; their headers must match."""
+    with open(source, 'r', encoding='utf-8-sig') as f:
+        header, *lines = f.read().splitlines()
+    with open(target, 'r', encoding='utf-8-sig') as f:
+        current = f.readline()
+    if _repair_line(header) != _repair_line(current):
+        raise SystemExit(f'{source}: header does not match {target}')
+    with open(target, 'rb+') as f:
+        f.seek(0, 2)
+        if f.tell():
+            f.seek(-1, 2)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(''.join(line + '\n' for line in lines if line.strip()).encode('utf-8'))
+
+
+def _ingest(args):
+    t0 = time.perf_counter()
+    events = load_cached(args.data, args.cache_dir, compact=False)[0]
+    seen = set()
+    _dedup(events, seen)
+    fresh = _dedup(load_events(args.bulletin), seen)
+    print(f'ingest     {len(fresh):,} new events ({time.perf_counter() - t0:.1f}s)')
+    if fresh.empty:
+        return 0
+
+    # Re-resolve entities over the raw names of the whole history, as a full build would
+    raw = pd.DataFrame({role: pd.concat([events[f'{role}_raw'].astype(object), fresh[role].astype(object)],
+                                        ignore_index=True) for role in ROLES})
+    mapping = build_entity_map(raw)
+    before = load_entity_map(args.data, args.cache_dir).set_index(['role', 'raw_name'])['canonical']
+    after = mapping.set_index(['role', 'raw_name'])['canonical'].reindex(before.index)
+    _append_rows(args.bulletin, args.data)
+    if not after.equals(before):
+        # A canonical spelling moved: every event naming it changes, so rebuild from the CSV
+        t0 = time.perf_counter()
+        events, lifecycle, edges = load_cached(args.data, args.cache_dir)
+        print(f'tables     {len(events):,} events · {len(lifecycle):,} funds · {len(edges):,} links '
+              f'(entity map changed, rebuilt in {time.perf_counter() - t0:.1f}s)')
+        return 0
+
+    t0 = time.perf_counter()
+    store = LifecycleStore.from_events(events)
+    touched = store.ingest(canonicalize(fresh, mapping))
+
+    # The data file stays the source of truth; the new fingerprint's tables come from the store
+    compact = compact_frame(store.events)
+    tables = {
+        'entities': mapping,
+        'events-plain': store.events,
+        'lifecycle-plain': store.lifecycle,
+        'edges-plain': store.edges,
+        'events': compact,
+        'lifecycle': compact_frame(store.lifecycle),
+        # build_edges over the compact events: categorical entities, nullable counts
+        'edges': store.edges.astype({'Gestora': compact['Gestora'].dtype,
+                                     'Depositaria': compact['Depositaria'].dtype, 'weight': 'Int64'}),
+    }
+    for name, table in tables.items():
+        cached_table(name, lambda table=table: table, args.data, args.cache_dir)
+    print(f'tables     {len(store.events):,} events · {len(store.lifecycle):,} funds · '
+          f'{len(store.edges):,} links · {len(touched):,} funds touched '
+          f'({time.perf_counter() - t0:.1f}s)')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cnmv',
+                                     description='Offline pipeline for the CNMV fund observatory.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='precompute tables and dashboard artifacts')
+    build.add_argument('--data', default=DATA_FILE, help='CNMV events CSV')
+    build.add_argument('--cache-dir', default=CACHE_DIR)
+    build.add_argument('--as-of', default=None,
+                       help='point-in-time date: tables as they stood then, alive funds censored '
+                            'there (YYYY-MM-DD, default the last event date)')
+    build.add_argument('--replicates', type=int, default=DEFAULT_REPLICATES,
+                       help='bootstrap replicates for the cohort-table intervals (0 skips them)')
+    build.add_argument('--out', default=None, help='also export every artifact to this directory')
+    build.add_argument('--format', choices=EXPORT_FORMATS, default='arrow',
+                       help='table format for --out')
+    build.set_defaults(run=_build)
+
+    ingest = sub.add_parser('ingest', help='append a new bulletin CSV and update the cached tables')
+    ingest.add_argument('bulletin', help='CSV of the new bulletin rows, with the data file\'s header')
+    ingest.add_argument('--data', default=DATA_FILE, help='CNMV events CSV to append to')
+    ingest.add_argument('--cache-dir', default=CACHE_DIR)
+    ingest.set_defaults(run=_ingest)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
@@ -0,0 +1,76 @@
+"""Compact, dictionary-encoded schema for the event and lifecycle tables.
+
+Entity columns (``Gestora``, ``Depositaria``, ``Nombre``, ``status``,
+``file``) become categoricals, so every groupby hashes small integer codes
+instead of Python strings; ``N_Registro`` becomes a nullable ``Int32``.
+With ``days=True`` datetime columns are also stored as ``Int32`` day
+offsets from ``DAY_EPOCH`` (see :func:`to_days` / :func:`from_days`).
+"""
+
+import numpy as np
+import pandas as pd
+
+ENTITY_COLUMNS = ['Gestora', 'Depositaria', 'Nombre', 'status', 'file',
+                  'Gestora_raw', 'Depositaria_raw']
+
+DAY_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def to_days(values):
+    """datetime64 values → nullable ``Int32`` days since ``DAY_EPOCH``."""
+    days = pd.Series(values).to_numpy(dtype='datetime64[D]')
+    mask = np.isnat(days)
+    out = (days - DAY_EPOCH).astype('int64').astype(np.int32)
+    return pd.arrays.IntegerArray(np.where(mask, 0, out).astype(np.int32), mask)
+
+
+def from_days(days):
+    """Inverse of :func:`to_days` (``NA`` → ``NaT``)."""
+    days = pd.array(days, dtype='Int32')
+    values = days.to_numpy(dtype='int64', na_value=0).astype('timedelta64[D]') + DAY_EPOCH
+    values = values.astype('datetime64[ns]')
+    values[days.isna()] = np.datetime64('NaT')
+    return values
+
+
+def compact_frame(df, days=False):
+    """Return a copy of ``df`` with the compact column encodings applied."""
+    out = df.copy()
+    for col in ENTITY_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype('category')
+    if 'N_Registro' in out.columns:
+        out['N_Registro'] = out['N_Registro'].astype('Int32')
+    if days:
+        for col in out.columns:
+            if pd.api.types.is_datetime64_any_dtype(out[col]):
+                out[col] = to_days(out[col])
+    return out
+
+
+def expand_days(df, columns):
+    """Turn ``Int32`` day-offset ``columns`` of ``df`` back into datetimes."""
+    out = df.copy()
+    for col in columns:
+        out[col] = from_days(out[col])
+    return out
+
+
+def memory_report(tables):
+    """Deep memory footprint (MB) of each table: original, compact, compact + day offsets."""
+    rows = []
+    for name, df in tables.items():
+        sizes = [
+            df.memory_usage(deep=True).sum(),
+            compact_frame(df).memory_usage(deep=True).sum(),
+            compact_frame(df, days=True).memory_usage(deep=True).sum(),
+        ]
+        rows.append({
+            'table': name,
+            'rows': len(df),
+            'original_mb': sizes[0] / 1e6,
+            'compact_mb': sizes[1] / 1e6,
+            'compact_days_mb': sizes[2] / 1e6,
+            'reduction_x': sizes[0] / sizes[2] if sizes[2] else float('nan'),
+        })
+    return pd.DataFrame(rows).set_index('table')
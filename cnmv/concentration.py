@@ -0,0 +1,127 @@
+"""Market concentration of the fund universe over time.
+
+:func:`concentration_series` is a sweep over the sorted launch and liquidation
+dates. Each fund adds +1 to its entity in the first period it is active
+and −1 in the first period after its liquidation. Running those ±1 steps
+per entity gives every count before and after each step, so the changes in
+Σ count² (hence HHI), in the number of active entities and in the number
+of active funds are known per step and accumulate over periods with one
+``cumsum``: O(n log n) for any resolution. The top-N share needs order
+statistics, so it is read from per-period entity counts, rebuilt block by
+block from the same sorted steps.
+"""
+
+import numpy as np
+import pandas as pd
+
+# First year of the dashboard's yearly HHI table
+HHI_FIRST_YEAR = 2005
+
+FREQS = ('D', 'W', 'M', 'Q', 'Y')
+
+_COLUMNS = ['active_funds', 'entities', 'hhi', 'top_share']
+
+# Periods per block when rebuilding entity counts for the top-N share
+_BLOCK = 512
+
+
+def _top_share(period, entity, step, n_periods, n_entities, top):
+    """Share of the ``top`` largest entity counts in their period total (NaN for empty periods)."""
+    out = np.full(n_periods, np.nan)
+    counts = np.zeros(n_entities, dtype=np.int64)
+    bounds = np.searchsorted(period, np.arange(0, n_periods + _BLOCK, _BLOCK))
+    for b, p0 in enumerate(range(0, n_periods, _BLOCK)):
+        rows = min(_BLOCK, n_periods - p0)
+        lo, hi = bounds[b], bounds[b + 1]
+        delta = np.bincount((period[lo:hi] - p0) * n_entities + entity[lo:hi], weights=step[lo:hi],
+                            minlength=rows * n_entities).reshape(rows, n_entities)
+        block = counts + np.cumsum(delta, axis=0).astype(np.int64)
+        counts = block[-1]
+        k = min(top, n_entities)
+        largest = -np.partition(-block, k - 1, axis=1)[:, :k] if k else np.zeros((rows, 0))
+        total = block.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[p0:p0 + rows] = np.where(total > 0, largest.sum(axis=1) / total * 100, np.nan)
+    return out
+
+
+def concentration_series(lifecycle, by='Gestora', freq='M', as_of=None, top=3):
+    """HHI, top-``top`` share and active counts per period for any grouping of the funds.
+
+    ``by`` is a column (``'Gestora'``, ``'Depositaria'``) or a list of
+    columns (``['Gestora', 'Depositaria']`` for pairs); funds with a missing
+    key are left out. ``freq`` is one of ``FREQS``, from the first launch to
+    ``as_of`` (today by default). A fund counts in a period if it was active
+    at any time in it: launched by the period's end and not liquidated before
+    its start. Indexed by period start (``date``), with ``active_funds``,
+    ``entities`` (entities with an active fund), ``hhi`` (0–10 000) and
+    ``top_share`` (% of the active funds held by the ``top`` largest entities).
+    """
+    if freq not in FREQS:
+        raise ValueError(f'freq must be one of {FREQS}, got {freq!r}')
+    now = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    codes = lifecycle.groupby(by, observed=True, sort=True).ngroup()
+    # ngroup is NaN (float) for rows whose key is missing
+    keep = codes.notna().to_numpy()
+    if not keep.any():
+        return pd.DataFrame({c: pd.Series(dtype=float) for c in _COLUMNS}, index=pd.DatetimeIndex([], name='date'))
+    entity = codes.to_numpy()[keep].astype(np.int64)
+    alta = lifecycle['Fecha_Alta'].to_numpy('datetime64[ns]')[keep]
+    baja = lifecycle['Fecha_Baja'].to_numpy('datetime64[ns]')[keep]
+    n_entities = int(entity.max()) + 1
+
+    periods = pd.period_range(pd.Timestamp(alta.min()), now, freq=freq)
+    starts = periods.start_time.to_numpy()
+    ends = (periods + 1).start_time.to_numpy()
+    n_periods = len(periods)
+
+    # +1 in the first period ending after the launch, −1 in the first one starting after the liquidation
+    born = np.searchsorted(ends, alta, side='right')
+    dead = ~np.isnat(baja)
+    gone = np.searchsorted(starts, baja[dead], side='right')
+    period = np.r_[born, gone]
+    entity = np.r_[entity, entity[dead]]
+    step = np.r_[np.ones(len(born), dtype=np.int64), -np.ones(len(gone), dtype=np.int64)]
+    inside = period < n_periods
+    period, entity, step = period[inside], entity[inside], step[inside]
+
+    # Running count per entity: sort by (entity, period), cumulative sum within each entity
+    order = np.lexsort((period, entity))
+    e, s = entity[order], step[order]
+    first = np.r_[True, e[1:] != e[:-1]]
+    total = np.cumsum(s)
+    after = total - np.r_[0, total][np.flatnonzero(first)][np.cumsum(first) - 1]
+    before = after - s
+
+    def accumulate(change):
+        return np.cumsum(np.bincount(period[order], weights=change, minlength=n_periods))
+
+    funds = accumulate(s)
+    square_sum = accumulate(after ** 2 - before ** 2)
+    entities = accumulate((after > 0).astype(np.int64) - (before > 0))
+    by_period = np.argsort(period, kind='stable')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hhi = np.where(funds > 0, square_sum / funds ** 2 * 10000, np.nan)
+    return pd.DataFrame({
+        'active_funds': funds.astype(np.int64),
+        'entities': entities.astype(np.int64),
+        'hhi': hhi,
+        'top_share': _top_share(period[by_period], entity[by_period], step[by_period], n_periods, n_entities, top),
+    }, index=pd.DatetimeIndex(starts, name='date'))
+
+
+def compute_hhi_over_time(lifecycle, years=None, as_of=None):
+    """Yearly Herfindahl–Hirschman index of Gestora shares among active funds.
+
+    One :func:`concentration_series` sweep at yearly resolution, up to ``as_of``.
+    ``years`` defaults to every year from ``HHI_FIRST_YEAR``; years with
+    fewer than 10 active funds are skipped.
+    """
+    table = concentration_series(lifecycle, 'Gestora', 'Y', as_of)
+    year = table.index.year
+    wanted = year >= HHI_FIRST_YEAR if years is None else year.isin(list(years))
+    table = table[wanted & (table['active_funds'] >= 10)]
+    return pd.DataFrame({'Año': table.index.year.to_numpy(dtype=np.int64), 'HHI': table['hhi'].round(0).to_numpy(),
+                         'Top 3 %': table['top_share'].round(1).to_numpy(),
+                         'Gestoras activas': table['entities'].to_numpy()},
+                        columns=['Año', 'HHI', 'Top 3 %', 'Gestoras activas'])
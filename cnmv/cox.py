@@ -0,0 +1,194 @@
+"""Cox proportional-hazards model of fund liquidation.
+
+:func:`fit_cox` is a Newton–Raphson fitter for the partial likelihood, with
+Efron (default) or Breslow handling of tied death times. Rows are sorted by
+duration once. On each iteration, the risk-set sums of ``w``, ``w·x`` and
+``w·x·xᵀ`` (with ``w = exp(x·β)``) are reverse cumulative sums over the
+distinct times, so each iteration costs O(n·p²) time and O(n) memory.
+
+:func:`lifecycle_covariates` builds the design matrix used by the dashboard
+from :func:`cnmv.lifecycle.build_lifecycle` output.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .survival import DEFAULT_LEVEL, _cohort_codes, _default_ranges, _durations, range_label
+
+TIES = ('efron', 'breslow')
+
+_COLUMNS = ['coef', 'se', 'hazard_ratio', 'lower', 'upper', 'z', 'p_value']
+
+
+def _alive_at(entity, when, births, deaths):
+    """Funds of each row's ``entity`` registered before ``when`` and not liquidated before it.
+
+    ``births``/``deaths`` are ``(entity, day)`` pairs; all lookups are
+    searchsorted on one combined ``entity · span + day`` key. Both are
+    counted strictly before ``when``, so a fund launched and liquidated on
+    one day cancels out (the clip only guards against a liquidation dated
+    before its launch).
+    """
+    span = int(max(when.max(), births[1].max(), deaths[1].max(initial=0))) + 1
+    b = np.sort(births[0] * span + births[1])
+    d = np.sort(deaths[0] * span + deaths[1])
+    key, floor = entity * span + when, entity * span
+    return np.maximum((np.searchsorted(b, key) - np.searchsorted(b, floor))
+                      - (np.searchsorted(d, key) - np.searchsorted(d, floor)), 0)
+
+
+def lifecycle_covariates(lifecycle, as_of=None):
+    """``(duration, event, covariates)`` for the Cox model of fund liquidation.
+
+    Covariates: ``Estructurado``; one dummy per launch cohort after the first
+    (the first cohort is the reference); ``log_gestora_funds``, the log of
+    1 + the funds the gestora had alive at the fund's launch; and
+    ``depositaria_share``, the depositaria's share (%) of all funds alive at
+    that date. Cohorts are those of :func:`cnmv.survival.survival_tables`.
+    Covariates that are constant over all funds (e.g. the dummy of a cohort
+    not launched yet on a past ``as_of``) are left out.
+    """
+    duration, event, year = _durations(lifecycle, 'all', as_of)
+    ranges = _default_ranges(lifecycle)
+    codes = _cohort_codes(year, ranges)
+    keep = codes >= 0
+
+    alta = lifecycle['Fecha_Alta'].to_numpy('datetime64[D]').astype(np.int64)
+    baja = lifecycle['Fecha_Baja'].to_numpy('datetime64[D]')
+    dead = ~np.isnat(baja)
+    start = alta.min()
+    alta, baja_day = alta - start, baja[dead].astype(np.int64) - start
+
+    def alive(column):
+        # Plain or categorical keys alike; a missing key (-1) pools the funds without one
+        entity = pd.factorize(lifecycle[column])[0].astype(np.int64)
+        return _alive_at(entity, alta, (entity, alta), (entity[dead], baja_day))
+
+    everyone = np.zeros(len(alta), dtype=np.int64)
+    total = _alive_at(everyone, alta, (everyone, alta), (everyone[dead], baja_day))
+    depositaria = np.where(lifecycle['Depositaria'].isna().to_numpy(), 0, alive('Depositaria'))
+
+    covariates = pd.DataFrame({'Estructurado': lifecycle['Estructurado'].to_numpy(dtype=float)})
+    for i, cohort in enumerate(ranges[1:], start=1):
+        covariates[f'Cohorte {range_label(*cohort)}'] = (codes == i).astype(float)
+    covariates['log_gestora_funds'] = np.log1p(alive('Gestora'))
+    covariates['depositaria_share'] = 100 * depositaria / np.maximum(total, 1)
+    covariates = covariates[keep].reset_index(drop=True)
+    return duration[keep], event[keep], covariates.loc[:, covariates.nunique() > 1]
+
+
+def _reverse_cumsum(x):
+    return np.cumsum(x[::-1], axis=0)[::-1]
+
+
+def _partial_likelihood(beta, x, time_start, time_index, event, tie_rows, phi, xx_pairs):
+    """Log partial likelihood, gradient and Hessian at ``beta`` (rows sorted by duration)."""
+    eta = x @ beta
+    w = np.exp(eta - eta.max())
+    p = x.shape[1]
+
+    # Risk-set sums at each distinct time: everything with duration ≥ t
+    s0 = _reverse_cumsum(np.add.reduceat(w, time_start))
+    s1 = _reverse_cumsum(np.add.reduceat(w[:, None] * x, time_start))
+    # Sums over the deaths tied at each distinct time
+    we = w * event
+    d0 = np.bincount(time_index, weights=we, minlength=len(time_start))
+    d1 = np.stack([np.bincount(time_index, weights=we * x[:, j], minlength=len(time_start))
+                   for j in range(p)], axis=1)
+
+    # One row per death: Efron's l-th tied death sees S − (l / d)·D
+    denom = s0[tie_rows] - phi * d0[tie_rows]
+    num1 = s1[tie_rows] - phi[:, None] * d1[tie_rows]
+    mean = num1 / denom[:, None]
+
+    loglik = (eta - eta.max())[event].sum() - np.log(denom).sum()
+    grad = x[event].sum(axis=0) - mean.sum(axis=0)
+
+    hess = np.empty((p, p))
+    for a, b in xx_pairs:
+        wxx = w * x[:, a] * x[:, b]
+        s2 = _reverse_cumsum(np.add.reduceat(wxx, time_start))
+        d2 = np.bincount(time_index, weights=wxx * event, minlength=len(time_start))
+        second = (s2[tie_rows] - phi * d2[tie_rows]) / denom
+        hess[a, b] = hess[b, a] = -(second - mean[:, a] * mean[:, b]).sum()
+    return loglik, grad, hess
+
+
+def fit_cox(duration, event, covariates, ties='efron', level=DEFAULT_LEVEL, max_iter=50, tol=1e-9):
+    """Fit a Cox proportional-hazards model; returns the hazard-ratio table.
+
+    ``covariates`` is a frame with one column per covariate. The result is
+    indexed by covariate, with columns ``coef``, ``se``, ``hazard_ratio``, its
+    ``lower``/``upper`` ``level`` bounds, ``z`` and ``p_value`` (Wald). The
+    fit summary (``n``, ``events``, ``loglik``, ``iterations``) is kept in
+    ``.attrs``.
+    """
+    if ties not in TIES:
+        raise ValueError(f'ties must be one of {TIES}, got {ties!r}')
+    names = list(covariates.columns)
+    order = np.argsort(duration, kind='stable')
+    d = np.asarray(duration, dtype=float)[order]
+    e = np.asarray(event, dtype=bool)[order]
+    x = covariates.to_numpy(dtype=float)[order]
+    # Centring leaves β unchanged and keeps exp(x·β) well scaled
+    x = x - x.mean(axis=0)
+    p = x.shape[1]
+
+    time_start = np.flatnonzero(np.r_[True, d[1:] != d[:-1]])
+    time_index = np.cumsum(np.r_[True, d[1:] != d[:-1]]) - 1
+    deaths = np.bincount(time_index, weights=e, minlength=len(time_start)).astype(np.int64)
+    tie_rows = np.repeat(np.arange(len(time_start)), deaths)
+    if ties == 'efron':
+        rank = np.arange(len(tie_rows)) - np.repeat(np.cumsum(deaths) - deaths, deaths)
+        phi = rank / deaths[tie_rows]
+    else:
+        phi = np.zeros(len(tie_rows))
+    xx_pairs = [(a, b) for a in range(p) for b in range(a, p)]
+    args = (x, time_start, time_index, e, tie_rows, phi, xx_pairs)
+
+    beta = np.zeros(p)
+    loglik, grad, hess = _partial_likelihood(beta, *args)
+    for iteration in range(1, max_iter + 1):
+        # pinv copes with a flat direction (e.g. a covariate that separates deaths)
+        step = np.linalg.pinv(-hess) @ grad
+        # Step halving keeps each Newton update an ascent step
+        for _ in range(30):
+            new = _partial_likelihood(beta + step, *args)
+            if new[0] >= loglik - 1e-12:
+                break
+            step /= 2
+        beta = beta + step
+        converged = abs(new[0] - loglik) < tol * max(1.0, abs(loglik))
+        loglik, grad, hess = new
+        if converged:
+            break
+
+    se = np.sqrt(np.diag(np.linalg.pinv(-hess)))
+    z = beta / se
+    q = NormalDist().inv_cdf(0.5 + level / 2)
+    table = pd.DataFrame({
+        'coef': beta,
+        'se': se,
+        'hazard_ratio': np.exp(beta),
+        'lower': np.exp(beta - q * se),
+        'upper': np.exp(beta + q * se),
+        'z': z,
+        'p_value': [math.erfc(abs(v) / math.sqrt(2)) for v in z],
+    }, index=pd.Index(names, name='covariate'))
+    table.attrs = {'n': len(d), 'events': int(e.sum()), 'loglik': float(loglik), 'iterations': iteration}
+    return table
+
+
+def lifecycle_cox(lifecycle, as_of=None, ties='efron'):
+    """Hazard-ratio table of :func:`lifecycle_covariates` (see :func:`fit_cox`).
+
+    Empty when there is nothing to fit (no liquidations or no varying covariate yet).
+    """
+    duration, event, covariates = lifecycle_covariates(lifecycle, as_of)
+    if not event.any() or covariates.empty:
+        return pd.DataFrame({c: pd.Series(dtype=float) for c in _COLUMNS},
+                            index=pd.Index([], dtype=object, name='covariate'))
+    return fit_cox(duration, event, covariates, ties=ties)
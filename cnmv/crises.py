@@ -0,0 +1,131 @@
+"""Event study of fund births, deaths and survival around crisis windows.
+
+Every window ``[start, end]`` is compared with the spans of the same length
+just before and just after it. Births and deaths over any span are
+differences of ``searchsorted`` positions in the sorted (group, day) event
+keys, and fund-days at risk are differences of the running sum of the
+:class:`cnmv.stock.FundStock` live-fund matrix. All windows, spans and
+groups are therefore read with one fancy-indexing step each, whatever their
+number.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stock import FundStock
+
+# Windows shaded in the Evolución charts: (label, first day, last day)
+CRISES = (
+    ('Crisis financiera', '2008-01-01', '2009-12-31'),
+    ('Crisis deuda EU', '2011-06-01', '2012-12-31'),
+    ('COVID-19', '2020-02-01', '2020-09-30'),
+)
+
+SPANS = ('before', 'during', 'after')
+
+_DAYS_PER_YEAR = 365.25
+
+
+def _span_counts(keys, n_groups, width, bounds):
+    """Events per (group, span) whose day falls in ``[bounds[..., 0], bounds[..., 1])``."""
+    keys = np.sort(keys)
+    base = np.arange(n_groups)[:, None, None] * width
+    lo = np.searchsorted(keys, base + bounds[None, ..., 0], side='left')
+    hi = np.searchsorted(keys, base + bounds[None, ..., 1], side='left')
+    return hi - lo
+
+
+def event_study(lifecycle, windows=CRISES, by=None, as_of=None):
+    """Births, deaths and hazard before, during and after each window, per group.
+
+    ``windows`` is an iterable of ``(label, start, end)`` with inclusive
+    dates; the ``before`` and ``after`` spans have the window's length and
+    are cut at the first launch and at ``as_of`` (today by default). Per span
+    come ``births_<span>``, ``deaths_<span>``, ``fund_years_<span>`` (time at
+    risk) and ``hazard_<span>`` (deaths per fund-year). ``expected_deaths``
+    applies the ``before`` hazard to the window's fund-years, and
+    ``excess_deaths`` is the observed minus expected count. ``alive_start``
+    counts the funds alive on ``start``, ``survived`` those of them still
+    alive on ``end``, and ``survival`` the ratio; both are NaN when ``end``
+    is after ``as_of`` and not observed yet. ``by`` is a column or list
+    of columns (funds with a missing key are left out). Indexed by
+    ``window``, or by ``(group, window)`` when ``by`` is given.
+    """
+    windows = list(windows)
+    stock = FundStock(lifecycle, by, as_of)
+    labels = [str(w[0]) for w in windows]
+    origin = stock.start
+    first = np.array([(pd.Timestamp(w[1]) - origin).days for w in windows], dtype=np.int64).reshape(-1)
+    last = np.array([(pd.Timestamp(w[2]) - origin).days for w in windows], dtype=np.int64).reshape(-1)
+    length = np.maximum(last - first + 1, 0)
+
+    # Day bounds [lo, hi) of the before / during / after spans, cut to the grid
+    bounds = np.stack([np.stack([first - length, first], axis=1),
+                       np.stack([first, last + 1], axis=1),
+                       np.stack([last + 1, last + 1 + length], axis=1)], axis=1)
+    bounds = np.clip(bounds, 0, stock.days)
+
+    live = stock.total[None, :] if by is None else stock.matrix
+    codes = np.zeros(len(lifecycle), dtype=np.int64) if by is None else stock.codes
+    n_groups = live.shape[0]
+    width = stock.days + 1
+    running = np.zeros((n_groups, width), dtype=np.int64)
+    np.cumsum(live, axis=1, dtype=np.int64, out=running[:, 1:])
+    fund_days = running[:, bounds[..., 1]] - running[:, bounds[..., 0]]
+
+    alta = lifecycle['Fecha_Alta'].to_numpy('datetime64[D]')
+    baja = lifecycle['Fecha_Baja'].to_numpy('datetime64[D]')
+    born = (alta - np.datetime64(origin, 'D')).astype(np.int64)
+    dead = np.where(np.isnat(baja), np.iinfo(np.int64).max // 4,
+                    (baja - np.datetime64(origin, 'D')).astype(np.int64))
+    keep = codes >= 0
+
+    def counts(day, ok):
+        ok = ok & keep & (day >= 0) & (day < stock.days)
+        return _span_counts(codes[ok] * width + day[ok], n_groups, width, bounds)
+
+    births = counts(born, np.ones(len(born), dtype=bool))
+    deaths = counts(dead, ~np.isnat(baja))
+
+    # Funds alive on each window's first day, and still alive on its last day (funds × windows)
+    at_start = (born[:, None] <= first[None, :]) & (dead[:, None] > first[None, :]) & keep[:, None]
+    survived = at_start & (dead[:, None] > last[None, :])
+    cell = codes[keep, None] * len(windows) + np.arange(len(windows))[None, :]
+
+    def per_group(mask):
+        return np.bincount(cell.ravel(), weights=mask[keep].ravel(),
+                           minlength=n_groups * len(windows)).reshape(n_groups, -1).astype(np.int64)
+
+    alive_start, alive_end = per_group(at_start), per_group(survived)
+    # Windows starting outside the grid have no funds at their start
+    outside = (first < 0) | (first >= stock.days)
+    alive_start[:, outside] = 0
+    alive_end[:, outside] = 0
+    # Survival to an end past the grid is not observed: open liquidations would count as survivors
+    alive_end = np.where((last >= stock.days)[None, :], np.nan, alive_end)
+
+    fund_years = fund_days / _DAYS_PER_YEAR
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hazard = np.where(fund_years > 0, deaths / fund_years, np.nan)
+        survival = np.where(alive_start > 0, alive_end / alive_start, np.nan)
+    expected = hazard[..., 0] * fund_years[..., 1]
+
+    columns = {'start': np.tile(pd.to_datetime([w[1] for w in windows]).to_numpy(), n_groups),
+               'end': np.tile(pd.to_datetime([w[2] for w in windows]).to_numpy(), n_groups)}
+    for k, span in enumerate(SPANS):
+        columns[f'births_{span}'] = births[..., k].ravel()
+        columns[f'deaths_{span}'] = deaths[..., k].ravel()
+        columns[f'fund_years_{span}'] = fund_years[..., k].ravel()
+        columns[f'hazard_{span}'] = hazard[..., k].ravel()
+    columns['expected_deaths'] = expected.ravel()
+    columns['excess_deaths'] = deaths[..., 1].ravel() - expected.ravel()
+    columns['alive_start'] = alive_start.ravel()
+    columns['survived'] = alive_end.ravel()
+    columns['survival'] = survival.ravel()
+
+    table = pd.DataFrame(columns)
+    if by is None:
+        table.index = pd.Index(labels, name='window')
+        return table
+    table.index = pd.MultiIndex.from_product([stock.entities.to_flat_index(), labels], names=['group', 'window'])
+    return table
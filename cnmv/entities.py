@@ -0,0 +1,135 @@
+"""Entity resolution for Gestora / Depositaria name variants.
+
+The bulletins spell the same company several ways (``", S.A., SGIIC"`` vs
+``", SGIIC, S.A."``, missing accents, truncated names). Raw names are
+reduced to a token key with the legal-form suffixes stripped; keys that are
+still different are linked when their character-trigram Jaccard similarity
+clears ``threshold``. Candidate pairs come from an inverted trigram index
+(blocking), so only names sharing enough trigrams are ever compared.
+Trade-name changes that no string similarity can catch go in ``overrides``.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+ROLES = ['Gestora', 'Depositaria']
+
+# Legal-form tokens (after removing dots): S.A., S.A.U., S.G.I.I.C., ...
+LEGAL_TOKENS = {'SA', 'SAU', 'SGIIC', 'SGC', 'SL', 'SLU'}
+
+DEFAULT_THRESHOLD = 0.85
+
+# Trigrams shared by more names than this ('ION', 'CAJ', ...) are too
+# unselective to block on
+MAX_POSTING = 200
+
+
+def name_key(name):
+    """Accent-, punctuation- and legal-form-insensitive key for a raw name."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode().upper()
+    tokens = re.findall(r'[A-Z0-9&]+', text.replace('.', ''))
+    return ' '.join(t for t in tokens if t not in LEGAL_TOKENS)
+
+
+def _trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _digits(key):
+    return tuple(re.findall(r'\d+', key))
+
+
+def _link_similar(keys, threshold):
+    """Union-find over ``keys``, joining pairs with trigram Jaccard ≥ threshold."""
+    grams = [_trigrams(k) for k in keys]
+    index = defaultdict(list)
+    for i, g in enumerate(grams):
+        for t in g:
+            index[t].append(i)
+
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, g in enumerate(grams):
+        shared = Counter()
+        for t in g:
+            posting = index[t]
+            if len(posting) <= MAX_POSTING:
+                shared.update(j for j in posting if j > i)
+        for j, n in shared.items():
+            # |A∩B| ≥ t/(1+t)·(|A|+|B|) is necessary for Jaccard ≥ t
+            if n < threshold / (1 + threshold) * (len(g) + len(grams[j])):
+                continue
+            if _digits(keys[i]) != _digits(keys[j]):
+                continue
+            if n / (len(g) + len(grams[j]) - n) >= threshold:
+                parent[find(j)] = find(i)
+    return np.array([find(i) for i in range(len(keys))])
+
+
+def build_entity_map(df, threshold=DEFAULT_THRESHOLD, overrides=None):
+    """Mapping table ``role, raw_name → entity_id, canonical``.
+
+    ``entity_id`` is a dense integer per role, ordered by canonical name;
+    ``canonical`` is the most frequent raw spelling in the cluster.
+    ``overrides`` maps raw names to a raw name of the entity they belong to
+    (e.g. an old trade name to the current one).
+    """
+    overrides = overrides or {}
+    parts = []
+    for role in ROLES:
+        counts = df[role].dropna().astype(str).value_counts()
+        if counts.empty:
+            continue
+        raw = counts.index.to_numpy(dtype=object)
+        # Names that are nothing but legal form keep their own identity
+        keys = np.array([name_key(n) or f'\0{n}' for n in raw], dtype=object)
+
+        distinct, key_code = np.unique(keys, return_inverse=True)
+        cluster = _link_similar(list(distinct), threshold)[key_code]
+
+        pos = {n: i for i, n in enumerate(raw)}
+        for alias, target in overrides.items():
+            if alias in pos and target in pos:
+                cluster[cluster == cluster[pos[alias]]] = cluster[pos[target]]
+
+        table = pd.DataFrame({'role': role, 'raw_name': raw, 'key': keys,
+                              'cluster': cluster, 'events': counts.to_numpy()})
+        # value_counts order → the first row per cluster is its most frequent spelling
+        canonical = table.groupby('cluster')['raw_name'].first()
+        table['canonical'] = table['cluster'].map(canonical)
+        ids = {c: i for i, c in enumerate(sorted(canonical.unique()))}
+        table['entity_id'] = table['canonical'].map(ids).astype(np.int32)
+        parts.append(table.drop(columns='cluster'))
+
+    if not parts:
+        return pd.DataFrame(columns=['role', 'raw_name', 'key', 'events', 'canonical', 'entity_id'])
+    return pd.concat(parts, ignore_index=True)
+
+
+def canonicalize(df, mapping):
+    """Replace Gestora/Depositaria with canonical names (raw kept as ``*_raw``).
+
+    Names missing from ``mapping`` (e.g. from a bulletin newer than the
+    mapping) pass through unchanged.
+    """
+    out = df.copy()
+    for role in ROLES:
+        if role not in out.columns:
+            continue
+        lookup = mapping.loc[mapping['role'] == role].set_index('raw_name')['canonical']
+        raw = out[role]
+        out[f'{role}_raw'] = raw
+        resolved = raw.astype(object).map(lookup)
+        out[role] = resolved.where(resolved.notna(), raw.astype(object))
+    return out
@@ -0,0 +1,155 @@
+"""Incremental maintenance of the lifecycle and network tables.
+
+A new weekly bulletin only touches the funds and Gestora–Depositaria pairs
+that appear in it. ``LifecycleStore.ingest`` recomputes lifecycle rows for
+those ``N_Registro`` values and adjusts the affected edge weights and node
+sizes, giving the same result as rebuilding from the full event history.
+
+Per-fund and per-pair state lives in dicts, and new event and lifecycle rows
+are appended to list buffers that are only concatenated when the tables are
+read, so an ingest costs O(new rows) rather than O(store).
+"""
+
+import pandas as pd
+
+from .ingest import _dedup
+from .lifecycle import _short, birth_records, build_edges, death_dates, finish_lifecycle
+
+# Stand-in for a missing N_Registro in the edge bookkeeping: drop_duplicates
+# treats every NaN registry number as the same fund, so we do too.
+_NAN_KEY = -1.0
+
+_BIRTH_COLUMNS = ['Nombre', 'Fecha_Alta', 'Gestora', 'Depositaria']
+_EDGE_COLUMNS = ['Gestora', 'Depositaria', 'weight', 'funds', 'Gestora_short', 'Depositaria_short']
+
+
+class LifecycleStore:
+    """Events, lifecycle and network tables that can absorb new events cheaply.
+
+    Build it once from the full history with :meth:`from_events`, then pass
+    each new bulletin's events (as parsed by ``cnmv.ingest``) to
+    :meth:`ingest`. ``lifecycle`` and ``edges`` come back in the row order of
+    :func:`cnmv.lifecycle.build_lifecycle` and :func:`cnmv.lifecycle.build_edges`.
+    """
+
+    def __init__(self, events, births, deaths, lifecycle, edges, edge_funds, seen):
+        self._events = [events]
+        self._births = births
+        self._deaths = deaths
+        self._lc = [lifecycle]
+        self._gone = set()
+        self._edges = edges
+        self._edge_frame = None
+        self._edge_funds = edge_funds
+        self._seen = seen
+        self.gestora_sizes, self.depositaria_sizes = {}, {}
+        for weight, _, g_short, d_short in edges.values():
+            self.gestora_sizes[g_short] = self.gestora_sizes.get(g_short, 0) + weight
+            self.depositaria_sizes[d_short] = self.depositaria_sizes.get(d_short, 0) + weight
+
+    @classmethod
+    def from_events(cls, events):
+        """Full build from an event frame (the starting point for increments)."""
+        seen = set()
+        events = _dedup(events.reset_index(drop=True), seen)
+        births = birth_records(events)
+        deaths = death_dates(events)
+        valid = events[events['Gestora'].notna() & events['Depositaria'].notna()]
+        edge_funds = set(valid['N_Registro'].fillna(_NAN_KEY).unique().tolist())
+        edges = {(e.Gestora, e.Depositaria): [e.weight, list(e.funds), e.Gestora_short, e.Depositaria_short]
+                 for e in build_edges(events).itertuples(index=False)}
+        return cls(events, births[_BIRTH_COLUMNS].to_dict('index'), deaths.to_dict(),
+                   finish_lifecycle(births, deaths), edges, edge_funds, seen)
+
+    # ── Read access ──
+
+    @property
+    def events(self):
+        if len(self._events) > 1:
+            self._events = [pd.concat(self._events, ignore_index=True)]
+        return self._events[0]
+
+    @property
+    def lifecycle(self):
+        if len(self._lc) > 1 or self._gone:
+            # Later rows supersede earlier ones for the same fund
+            lc = pd.concat(self._lc, ignore_index=True).drop_duplicates('N_Registro', keep='last')
+            lc = lc[~lc['N_Registro'].isin(list(self._gone))]
+            self._lc = [lc.sort_values('N_Registro', kind='stable').reset_index(drop=True)]
+            self._gone = set()
+        return self._lc[0]
+
+    @property
+    def edges(self):
+        if self._edge_frame is None:
+            rows = [(g, d, *self._edges[(g, d)]) for g, d in sorted(self._edges)]
+            self._edge_frame = pd.DataFrame(rows, columns=_EDGE_COLUMNS)
+        return self._edge_frame
+
+    # ── Updates ──
+
+    def ingest(self, new_events):
+        """Absorb a batch of new events; return the ``N_Registro`` values touched."""
+        new_events = _dedup(new_events.reset_index(drop=True), self._seen)
+        if new_events.empty:
+            return pd.Index([], name='N_Registro')
+        self._events.append(new_events)
+
+        affected = self._update_lifecycle(new_events)
+        self._update_edges(new_events)
+        return affected
+
+    def _update_lifecycle(self, new):
+        new_births = birth_records(new)
+        new_deaths = death_dates(new)
+
+        # Existing funds keep their first-seen attributes; only gaps are filled
+        for key, record in new_births[_BIRTH_COLUMNS].to_dict('index').items():
+            old = self._births.get(key)
+            if old is None:
+                self._births[key] = record
+                continue
+            for col in ('Nombre', 'Gestora', 'Depositaria'):
+                if pd.isna(old[col]):
+                    old[col] = record[col]
+            old['Fecha_Alta'] = min(old['Fecha_Alta'], record['Fecha_Alta'])
+        for key, date in new_deaths.items():
+            self._deaths[key] = min(self._deaths.get(key, date), date)
+
+        affected = new_births.index.union(new_deaths.index)
+        affected = affected[[k in self._births for k in affected]]
+        if affected.empty:
+            return affected
+        births = pd.DataFrame([self._births[k] for k in affected], index=affected,
+                              columns=_BIRTH_COLUMNS)
+        dead = [k for k in affected if k in self._deaths]
+        deaths = pd.Series([self._deaths[k] for k in dead], index=pd.Index(dead, dtype=float, name='N_Registro'),
+                           name='Fecha_Baja', dtype=new_deaths.dtype)
+        rows = finish_lifecycle(births, deaths)
+
+        # Funds may enter, change, or (via the >50y/negative-life filter) leave
+        kept = set(rows['N_Registro'].tolist())
+        self._gone.difference_update(kept)
+        self._gone.update(k for k in affected if k not in kept)
+        self._lc.append(rows)
+        return affected
+
+    def _update_edges(self, new):
+        valid = new[new['Gestora'].notna() & new['Depositaria'].notna()]
+        keys = valid['N_Registro'].fillna(_NAN_KEY)
+        valid = valid[~keys.isin(self._edge_funds)].drop_duplicates(subset=['N_Registro'])
+        if valid.empty:
+            return
+        self._edge_funds.update(valid['N_Registro'].fillna(_NAN_KEY).tolist())
+        self._edge_frame = None
+
+        for (g, d), grp in valid.groupby(['Gestora', 'Depositaria'], sort=False, observed=True):
+            weight = int(grp['N_Registro'].count())
+            names = grp['Nombre'].astype(object).tolist()
+            edge = self._edges.get((g, d))
+            if edge is None:
+                edge = self._edges[(g, d)] = [0, [], _short(g), _short(d)]
+            edge[0] += weight
+            edge[1] = (edge[1] + names)[:5]
+            self.gestora_sizes[edge[2]] = self.gestora_sizes.get(edge[2], 0) + weight
+            self.depositaria_sizes[edge[3]] = self.depositaria_sizes.get(edge[3], 0) + weight
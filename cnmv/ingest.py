@@ -0,0 +1,158 @@
+"""Streaming ingest of the CNMV bulletin CSV.
+
+The scraper writes some rows wrapped in an extra pair of quotes, with the
+inner quotes doubled (``"a,""b, c"",d"``). Lines are repaired one chunk at a
+time and parsed into typed frames, so peak memory is bounded by the chunk
+size instead of the file size. Bulletin dates come from the PDF filename,
+which is parsed once per distinct bulletin, not once per row.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+DATA_FILE = 'cnmv_funds_data_FINAL.csv'
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Fixed per-column types, so a chunk that happens to be all-NaN in a column
+# does not get a different inferred dtype than its neighbours.
+EVENT_DTYPES = {
+    'file': str,
+    'page': 'Int64',
+    'status': str,
+    'Nombre': str,
+    'Gestora': str,
+    'Depositaria': str,
+    'N_Registro': 'float64',
+}
+
+DEDUP_COLUMNS = ['N_Registro', 'status', 'date']
+
+
+def _repair_line(line):
+    """Undo the whole-line quoting some scraper rows carry."""
+    line = line.strip()
+    if line.startswith('"') and line.endswith('"'):
+        line = line[1:-1].replace('""', '"')
+    return line
+
+
+_WINDOW_RE = r'(\d{2})-(\d{2})-(\d{4})_al_(\d{2})-(\d{2})-(\d{4})'
+_SINGLE_RE = r'(\d{2})-(\d{2})-(\d{4})'
+
+
+def _ymd(parts, d, m, y):
+    """Vectorised ``dd-mm-yyyy`` capture groups → datetime64 (NaT if absent/invalid)."""
+    return pd.to_datetime(parts[y] + '-' + parts[m] + '-' + parts[d],
+                          format='%Y-%m-%d', errors='coerce')
+
+
+def bulletin_windows(filenames):
+    """Parse ``date_start``/``date`` (window start/end) for each bulletin filename.
+
+    ``Boletin_completo_DD-MM-YYYY_al_DD-MM-YYYY.pdf`` gives both ends of the
+    window; names carrying a single date use it for both. Returns a frame
+    indexed by filename.
+    """
+    names = pd.Series(pd.Index(filenames, dtype=object).astype(str), dtype=object)
+    full = names.str.extract(_WINDOW_RE)
+    single = names.str.extract(_SINGLE_RE)
+    has_window = full[0].notna().to_numpy()
+    fallback = _ymd(single, 0, 1, 2)
+    start = _ymd(full, 0, 1, 2).where(has_window, fallback)
+    end = _ymd(full, 3, 4, 5).where(has_window, fallback)
+    return pd.DataFrame({'date_start': start.to_numpy(), 'date': end.to_numpy()},
+                        index=pd.Index(filenames, name='file'))
+
+
+def _attach_dates(chunk, windows):
+    """Add window dates to ``chunk``, parsing only filenames not yet in ``windows``.
+
+    Rows are mapped through the categorical code of their filename, so the
+    regex work is done once per distinct bulletin rather than once per row.
+    """
+    files = pd.Categorical(chunk['file'])
+    new = files.categories.difference(windows.index)
+    if len(new):
+        windows = pd.concat([windows, bulletin_windows(new)])
+    codes = files.codes
+    for col in ('date_start', 'date'):
+        values = windows[col].reindex(files.categories).to_numpy()
+        # code -1 (missing filename) picks the trailing NaT
+        values = np.append(values, np.datetime64('NaT'))
+        chunk[col] = values[codes]
+    return chunk, windows
+
+
+def _empty_windows():
+    return pd.DataFrame({'date_start': pd.Series(dtype='datetime64[ns]'),
+                         'date': pd.Series(dtype='datetime64[ns]')},
+                        index=pd.Index([], dtype=object, name='file'))
+
+
+def _parse_chunk(lines, columns, windows=None):
+    """Parse a batch of repaired lines into a typed event frame."""
+    if windows is None:
+        windows = _empty_windows()
+    dtypes = {c: t for c, t in EVENT_DTYPES.items() if c in columns}
+    if lines:
+        chunk = pd.read_csv(io.StringIO('\n'.join(lines)), header=None, names=columns,
+                            dtype=dtypes)
+    else:
+        chunk = pd.DataFrame({c: pd.Series(dtype=dtypes.get(c, object)) for c in columns})
+    chunk, windows = _attach_dates(chunk, windows)
+    chunk = chunk.dropna(subset=['date'])
+    chunk['year'] = chunk['date'].dt.year
+    return chunk, windows
+
+
+def iter_event_chunks(path=DATA_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield typed, de-duplicated event frames of at most ``chunksize`` rows.
+
+    Duplicates (same ``N_Registro``, ``status`` and ``date``) are dropped
+    across chunk boundaries by remembering a 64-bit hash of every key seen,
+    keeping the first occurrence exactly like ``drop_duplicates`` would.
+    """
+    seen = set()
+    windows = _empty_windows()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        columns = list(pd.read_csv(io.StringIO(_repair_line(f.readline())), nrows=0).columns)
+        buf = []
+        for line in f:
+            line = _repair_line(line)
+            if line:
+                buf.append(line)
+            if len(buf) >= chunksize:
+                chunk, windows = _parse_chunk(buf, columns, windows)
+                chunk = _dedup(chunk, seen)
+                buf = []
+                if len(chunk):
+                    yield chunk
+        if buf:
+            chunk, windows = _parse_chunk(buf, columns, windows)
+            chunk = _dedup(chunk, seen)
+            if len(chunk):
+                yield chunk
+
+
+def _dedup(chunk, seen):
+    """Drop rows whose dedup key was already emitted (in this or a prior chunk).
+
+    ``seen`` is the set of key hashes emitted so far; the kept rows' hashes
+    are added to it, so each call costs O(rows in ``chunk``).
+    """
+    keys = pd.util.hash_pandas_object(chunk[DEDUP_COLUMNS], index=False).to_numpy().tolist()
+    fresh = np.fromiter((k not in seen for k in keys), dtype=bool, count=len(keys))
+    keep = fresh & ~pd.Series(keys, dtype=np.uint64).duplicated().to_numpy()
+    seen.update(k for k, ok in zip(keys, keep) if ok)
+    return chunk[keep]
+
+
+def load_events(path=DATA_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """Parse the whole CSV through the streaming reader into one event frame."""
+    chunks = list(iter_event_chunks(path, chunksize))
+    if not chunks:
+        return _parse_chunk([], list(EVENT_DTYPES))[0]
+    return pd.concat(chunks, ignore_index=True)
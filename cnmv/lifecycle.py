@@ -0,0 +1,97 @@
+"""Fund lifecycle and Gestora–Depositaria network tables derived from events."""
+
+import pandas as pd
+
+
+# Classify structured / "born to die" funds
+STRUCTURED_PATTERN = r'(?:GARANTIZAD|GARANTI[AZ]|OBJETIVO\s*\d|PLAN\s*RENTAS|PLAZO|VENCIMIENTO|MESES|BUY\s*&?\s*HOLD|HORIZONTE|PROTEC|TARGET|AHORRO\s*AÑO|CAPITAL\s*GARANTIZADO)'
+YEAR_PATTERN = r'20[0-3]\d|199\d'
+
+
+def is_structured(names):
+    """Whether each fund name marks a structured / "born to die" fund."""
+    return (names.str.contains(STRUCTURED_PATTERN, case=False, na=False, regex=True) |
+            names.str.contains(YEAR_PATTERN, na=False, regex=True))
+
+
+def birth_records(df):
+    """First registration record per ``N_Registro`` (indexed by it)."""
+    births = df[(df['status'] == 'NUEVAS_INSCRIPCIONES') & df['N_Registro'].notna()]
+    return births.groupby('N_Registro').agg(
+        Nombre=('Nombre', 'first'),
+        Fecha_Alta=('date', 'min'),
+        Gestora=('Gestora', 'first'),
+        Depositaria=('Depositaria', 'first'),
+    )
+
+
+def death_dates(df):
+    """Earliest de-registration date per ``N_Registro``."""
+    deaths = df[(df['status'] == 'BAJAS') & df['N_Registro'].notna()]
+    return deaths.groupby('N_Registro')['date'].min().rename('Fecha_Baja')
+
+
+def finish_lifecycle(births, deaths):
+    """Join birth records with death dates and derive the lifecycle columns."""
+    lc = births.reset_index().merge(deaths.reset_index(), on='N_Registro', how='left')
+    lc['Vida_Anos'] = ((lc['Fecha_Baja'] - lc['Fecha_Alta']).dt.days / 365.25).round(1)
+
+    # Clean: remove negative lives and >50yr outliers
+    lc = lc[(lc['Vida_Anos'].isna()) | ((lc['Vida_Anos'] >= 0) & (lc['Vida_Anos'] <= 50))]
+
+    lc['Activo'] = lc['Fecha_Baja'].isna()
+    lc['Año_Alta'] = lc['Fecha_Alta'].dt.year
+    lc['Año_Baja'] = lc['Fecha_Baja'].dt.year
+
+    lc['Estructurado'] = is_structured(lc['Nombre'])
+
+    return lc
+
+
+def build_lifecycle(df):
+    """Build fund lifecycle table from raw events."""
+    return finish_lifecycle(birth_records(df), death_dates(df))
+
+
+def _short(name, max_len=35):
+    """Shorten entity names for display."""
+    name = str(name)
+    # Remove common suffixes
+    for suffix in [', S.G.I.I.C., S.A.', ', S.A., SGIIC', ', S.A., S.G.I.I.C.',
+                   ', SGIIC, S.A.', ', SGIIC', ', S.A.', ', S.A']:
+        name = name.replace(suffix, '')
+    return name[:max_len] + '…' if len(name) > max_len else name
+
+
+def build_edges(df):
+    """Gestora–Depositaria edge table: each unique fund is one unit of weight."""
+    valid = df[df['Gestora'].notna() & df['Depositaria'].notna()]
+
+    funds = valid.drop_duplicates(subset=['N_Registro'])
+    # Plain strings for the list aggregation (a categorical would try to
+    # cast each list back into its categories)
+    funds = funds.assign(Nombre=funds['Nombre'].astype(object))
+    edges = funds.groupby(
+        ['Gestora', 'Depositaria'], observed=True
+    ).agg(
+        weight=('N_Registro', 'count'),
+        funds=('Nombre', lambda x: list(x)[:5])
+    ).reset_index()
+
+    edges['Gestora_short'] = edges['Gestora'].apply(_short)
+    edges['Depositaria_short'] = edges['Depositaria'].apply(_short)
+    return edges
+
+
+def node_sizes(edges):
+    """Total fund weight per (short-named) gestora and depositaria node."""
+    gestora_sizes = edges.groupby('Gestora_short', observed=True)['weight'].sum().to_dict()
+    depositaria_sizes = edges.groupby('Depositaria_short', observed=True)['weight'].sum().to_dict()
+    return gestora_sizes, depositaria_sizes
+
+
+def build_network_data(df):
+    """Build Gestora–Depositaria network from fund relationships."""
+    edges = build_edges(df)
+    gestora_sizes, depositaria_sizes = node_sizes(edges)
+    return edges, gestora_sizes, depositaria_sizes
@@ -0,0 +1,936 @@
+"""Self-contained Three.js view of the Gestora–Depositaria network.
+
+:func:`graph_data` turns the edge and lifecycle tables into a JSON-ready
+graph (per-entity and per-pair KM mortality for every link); :func:`graph_view`
+cuts it at a minimum link weight and :func:`render_3d_html` embeds the
+result in :data:`THREE_JS_TEMPLATE`. The graph is what the batch CLI stores,
+so any weight threshold can be rendered without touching the tables.
+"""
+
+import json
+
+from .survival import HORIZONS, entity_survival
+
+THREE_JS_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>CNMV Fund Network · 3D</title>
+<style>
+  * { margin: 0; padding: 0; box-sizing: border-box; }
+  body {
+    background: #0a0a0a;
+    overflow: hidden;
+    font-family: 'SF Mono', 'Fira Code', 'Consolas', monospace;
+    color: #e8e4df;
+  }
+  canvas { display: block; }
+
+  /* Vignette fade to app background */
+  #vignette {
+    position: fixed;
+    inset: 0;
+    pointer-events: none;
+    z-index: 5;
+    background:
+      radial-gradient(ellipse at center, transparent 40%, rgba(10,10,10,0.4) 75%, #0a0a0a 100%);
+  }
+  #edge-fade-top {
+    position: fixed;
+    top: 0; left: 0; right: 0;
+    height: 80px;
+    background: linear-gradient(to bottom, #0a0a0a, transparent);
+    pointer-events: none;
+    z-index: 6;
+  }
+  #edge-fade-bottom {
+    position: fixed;
+    bottom: 0; left: 0; right: 0;
+    height: 80px;
+    background: linear-gradient(to top, #0a0a0a, transparent);
+    pointer-events: none;
+    z-index: 6;
+  }
+
+  /* Tooltip */
+  #tooltip {
+    position: fixed;
+    pointer-events: none;
+    background: rgba(10,10,10,0.92);
+    border: 1px solid rgba(255,255,255,0.06);
+    border-radius: 10px;
+    padding: 14px 18px;
+    font-size: 12px;
+    line-height: 1.6;
+    max-width: 320px;
+    opacity: 0;
+    transition: opacity 0.2s ease;
+    backdrop-filter: blur(16px);
+    z-index: 100;
+    box-shadow: 0 12px 40px rgba(0,0,0,0.6);
+  }
+  #tooltip.visible { opacity: 1; }
+  #tooltip .tt-name {
+    font-size: 14px;
+    font-weight: 600;
+    margin-bottom: 4px;
+    letter-spacing: 0.5px;
+  }
+  #tooltip .tt-type {
+    font-size: 10px;
+    text-transform: uppercase;
+    letter-spacing: 2px;
+    margin-bottom: 8px;
+    opacity: 0.5;
+  }
+  #tooltip .tt-stat {
+    font-size: 11px;
+    opacity: 0.65;
+  }
+  .gestora-color { color: #e2a44e; }
+  .depositaria-color { color: #6ec4a7; }
+
+  /* Legend — bottom left, ultra subtle */
+  #legend {
+    position: fixed;
+    bottom: 20px;
+    left: 24px;
+    z-index: 50;
+    display: flex;
+    gap: 18px;
+    font-size: 10px;
+    letter-spacing: 0.5px;
+  }
+  .legend-item {
+    display: flex;
+    align-items: center;
+    gap: 6px;
+    opacity: 0.3;
+    transition: opacity 0.3s;
+  }
+  .legend-item:hover { opacity: 0.6; }
+  .legend-dot {
+    width: 6px;
+    height: 6px;
+    border-radius: 50%;
+  }
+  .legend-dot.gestora { background: #e2a44e; box-shadow: 0 0 8px rgba(226,164,78,0.4); }
+  .legend-dot.depositaria { background: #6ec4a7; box-shadow: 0 0 8px rgba(110,196,167,0.4); }
+
+  /* Stats — top right, barely visible */
+  #stats {
+    position: fixed;
+    top: 16px;
+    right: 20px;
+    z-index: 50;
+    text-align: right;
+    font-size: 9px;
+    letter-spacing: 1.5px;
+    text-transform: uppercase;
+    color: rgba(255,255,255,0.12);
+    line-height: 2.2;
+  }
+  #stats span { color: rgba(255,255,255,0.3); font-weight: 600; }
+
+  /* Controls hint — bottom right, fades out */
+  #controls-hint {
+    position: fixed;
+    bottom: 20px;
+    right: 20px;
+    z-index: 50;
+    font-size: 9px;
+    letter-spacing: 0.5px;
+    color: rgba(255,255,255,0.1);
+    text-align: right;
+    line-height: 2;
+    animation: fadeHint 6s ease forwards;
+  }
+  @keyframes fadeHint {
+    0%, 60% { opacity: 1; }
+    100% { opacity: 0; }
+  }
+</style>
+</head>
+<body>
+
+<div id="vignette"></div>
+<div id="edge-fade-top"></div>
+<div id="edge-fade-bottom"></div>
+
+<div id="tooltip">
+  <div class="tt-name"></div>
+  <div class="tt-type"></div>
+  <div class="tt-stat"></div>
+</div>
+
+<div id="stats">
+  Nodos <span id="stat-nodes">0</span><br>
+  Vínculos <span id="stat-edges">0</span><br>
+  Fondos <span id="stat-funds">0</span>
+</div>
+
+<div id="legend">
+  <div style="display: flex; align-items: center; gap: 8px; opacity: 0.4;">
+    <span style="font-size: 9px; color: rgba(255,255,255,0.5);">MORTALIDAD</span>
+    <div style="display: flex; align-items: center; gap: 3px;">
+      <span style="font-size: 8px; color: #5fa87a;">0%</span>
+      <div style="width: 80px; height: 4px; border-radius: 2px; background: linear-gradient(to right, #5ca87a, #e2a44e, #cc3333);"></div>
+      <span style="font-size: 8px; color: #cc3333;">100%</span>
+    </div>
+  </div>
+  <div class="legend-item" style="margin-left: 12px;"><div class="legend-dot gestora" style="background: rgba(255,255,255,0.4); box-shadow: none; width: 5px; height: 5px;"></div><span style="font-size: 9px;">Gestora</span></div>
+  <div class="legend-item"><div class="legend-dot depositaria" style="background: rgba(255,255,255,0.4); box-shadow: none; width: 7px; height: 7px;"></div><span style="font-size: 9px;">Depositaria</span></div>
+</div>
+
+<div id="controls-hint">
+  Arrastrar para rotar<br>
+  Scroll para zoom<br>
+  Click en nodo para fijar
+</div>
+
+<script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+<script>
+// ═══════════════════════════════════════════════════════════════════════
+// DATA
+// ═══════════════════════════════════════════════════════════════════════
+
+const GRAPH_DATA = __GRAPH_DATA_PLACEHOLDER__;
+
+// ═══════════════════════════════════════════════════════════════════════
+// SETUP
+// ═══════════════════════════════════════════════════════════════════════
+
+const W = window.innerWidth, H = window.innerHeight;
+
+const scene = new THREE.Scene();
+scene.fog = new THREE.FogExp2(0x0a0a0a, 0.0010);
+
+const camera = new THREE.PerspectiveCamera(60, W / H, 1, 10000);
+camera.position.set(0, 0, 500);
+
+const renderer = new THREE.WebGLRenderer({ antialias: true, alpha: false });
+renderer.setClearColor(0x0a0a0a, 1);
+renderer.setSize(W, H);
+renderer.setPixelRatio(Math.min(window.devicePixelRatio, 2));
+renderer.toneMapping = THREE.ACESFilmicToneMapping;
+renderer.toneMappingExposure = 1.2;
+document.body.appendChild(renderer.domElement);
+
+// ═══════════════════════════════════════════════════════════════════════
+// GLOW TEXTURE GENERATOR
+// ═══════════════════════════════════════════════════════════════════════
+
+function createGlowTexture(color, size) {
+  const c = document.createElement('canvas');
+  c.width = c.height = size;
+  const ctx = c.getContext('2d');
+  const g = ctx.createRadialGradient(size/2, size/2, 0, size/2, size/2, size/2);
+  g.addColorStop(0.0, color);
+  g.addColorStop(0.15, color);
+  g.addColorStop(0.4, color.replace('1)', '0.3)'));
+  g.addColorStop(0.7, color.replace('1)', '0.06)'));
+  g.addColorStop(1.0, 'rgba(0,0,0,0)');
+  ctx.fillStyle = g;
+  ctx.fillRect(0, 0, size, size);
+  const tex = new THREE.CanvasTexture(c);
+  tex.needsUpdate = true;
+  return tex;
+}
+
+// Mortality color gradient: green (alive) → amber (mid) → red (dead)
+function mortalityColor(mortality) {
+  const t = Math.max(0, Math.min(1, mortality / 100));
+  let r, g, b;
+  if (t < 0.4) {
+    // Green to amber
+    const s = t / 0.4;
+    r = 0.35 + s * 0.55;  // 0.35 → 0.90
+    g = 0.65 - s * 0.15;  // 0.65 → 0.50
+    b = 0.45 - s * 0.30;  // 0.45 → 0.15
+  } else {
+    // Amber to deep red
+    const s = (t - 0.4) / 0.6;
+    r = 0.90 - s * 0.10;  // 0.90 → 0.80
+    g = 0.50 - s * 0.35;  // 0.50 → 0.15
+    b = 0.15 + s * 0.05;  // 0.15 → 0.20
+  }
+  return { r, g, b };
+}
+
+function mortalityColorCSS(mortality) {
+  const { r, g, b } = mortalityColor(mortality);
+  return `rgba(${Math.round(r*255)},${Math.round(g*255)},${Math.round(b*255)},1)`;
+}
+
+// Pre-generate glow textures for a few mortality levels
+const glowTexCache = {};
+function getGlowTex(mortality) {
+  const bucket = Math.round(mortality / 10) * 10;
+  if (!glowTexCache[bucket]) {
+    glowTexCache[bucket] = createGlowTexture(mortalityColorCSS(bucket), 128);
+  }
+  return glowTexCache[bucket];
+}
+
+const glowTexWhite = createGlowTexture('rgba(255,255,255,1)', 64);
+
+// ═══════════════════════════════════════════════════════════════════════
+// BUILD GRAPH
+// ═══════════════════════════════════════════════════════════════════════
+
+const nodes = GRAPH_DATA.nodes;
+const edges = GRAPH_DATA.edges;
+
+// Create node map
+const nodeMap = {};
+nodes.forEach((n, i) => {
+  nodeMap[n.id] = i;
+  // Random initial position in sphere
+  const phi = Math.random() * Math.PI * 2;
+  const theta = Math.acos(2 * Math.random() - 1);
+  const r = 150 + Math.random() * 200;
+  n.x = r * Math.sin(theta) * Math.cos(phi);
+  n.y = r * Math.sin(theta) * Math.sin(phi);
+  n.z = r * Math.cos(theta);
+  n.vx = 0; n.vy = 0; n.vz = 0;
+  n.connections = 0;
+});
+
+// Count connections
+edges.forEach(e => {
+  const si = nodeMap[e.source];
+  const ti = nodeMap[e.target];
+  if (si !== undefined) nodes[si].connections += e.weight;
+  if (ti !== undefined) nodes[ti].connections += e.weight;
+});
+
+const maxWeight = Math.max(...nodes.map(n => n.weight));
+const totalFunds = edges.reduce((s, e) => s + e.weight, 0);
+
+// Update HUD
+document.getElementById('stat-nodes').textContent = nodes.length;
+document.getElementById('stat-edges').textContent = edges.length;
+document.getElementById('stat-funds').textContent = totalFunds;
+
+// ═══════════════════════════════════════════════════════════════════════
+// 3D FORCE SIMULATION
+// ═══════════════════════════════════════════════════════════════════════
+
+function simulate(iterations) {
+  const alpha = 0.3;
+  const repulsion = 8000;
+  const attraction = 0.0004;
+  const damping = 0.85;
+  const centerGravity = 0.002;
+
+  for (let iter = 0; iter < iterations; iter++) {
+    // Repulsion between all nodes
+    for (let i = 0; i < nodes.length; i++) {
+      for (let j = i + 1; j < nodes.length; j++) {
+        const dx = nodes[i].x - nodes[j].x;
+        const dy = nodes[i].y - nodes[j].y;
+        const dz = nodes[i].z - nodes[j].z;
+        let dist = Math.sqrt(dx*dx + dy*dy + dz*dz) + 1;
+        const force = repulsion / (dist * dist);
+        const fx = dx / dist * force;
+        const fy = dy / dist * force;
+        const fz = dz / dist * force;
+        nodes[i].vx += fx * alpha;
+        nodes[i].vy += fy * alpha;
+        nodes[i].vz += fz * alpha;
+        nodes[j].vx -= fx * alpha;
+        nodes[j].vy -= fy * alpha;
+        nodes[j].vz -= fz * alpha;
+      }
+    }
+
+    // Attraction along edges
+    edges.forEach(e => {
+      const si = nodeMap[e.source];
+      const ti = nodeMap[e.target];
+      if (si === undefined || ti === undefined) return;
+      const s = nodes[si], t = nodes[ti];
+      const dx = t.x - s.x;
+      const dy = t.y - s.y;
+      const dz = t.z - s.z;
+      const dist = Math.sqrt(dx*dx + dy*dy + dz*dz) + 1;
+      const force = dist * attraction * Math.sqrt(e.weight);
+      const fx = dx / dist * force;
+      const fy = dy / dist * force;
+      const fz = dz / dist * force;
+      s.vx += fx * alpha;
+      s.vy += fy * alpha;
+      s.vz += fz * alpha;
+      t.vx -= fx * alpha;
+      t.vy -= fy * alpha;
+      t.vz -= fz * alpha;
+    });
+
+    // Center gravity + apply velocities
+    for (let i = 0; i < nodes.length; i++) {
+      nodes[i].vx -= nodes[i].x * centerGravity;
+      nodes[i].vy -= nodes[i].y * centerGravity;
+      nodes[i].vz -= nodes[i].z * centerGravity;
+      nodes[i].vx *= damping;
+      nodes[i].vy *= damping;
+      nodes[i].vz *= damping;
+      nodes[i].x += nodes[i].vx;
+      nodes[i].y += nodes[i].vy;
+      nodes[i].z += nodes[i].vz;
+    }
+  }
+}
+
+// Run simulation
+simulate(300);
+
+// ═══════════════════════════════════════════════════════════════════════
+// CREATE 3D OBJECTS
+// ═══════════════════════════════════════════════════════════════════════
+
+const nodeGroup = new THREE.Group();
+const edgeGroup = new THREE.Group();
+const glowGroup = new THREE.Group();
+const particleGroup = new THREE.Group();
+
+scene.add(edgeGroup);
+scene.add(glowGroup);
+scene.add(nodeGroup);
+scene.add(particleGroup);
+
+// ── Edges with mortality coloring ──
+const edgeMeshes = [];
+edges.forEach(e => {
+  const si = nodeMap[e.source];
+  const ti = nodeMap[e.target];
+  if (si === undefined || ti === undefined) return;
+  const s = nodes[si], t = nodes[ti];
+
+  const points = [
+    new THREE.Vector3(s.x, s.y, s.z),
+    new THREE.Vector3(t.x, t.y, t.z)
+  ];
+  const geom = new THREE.BufferGeometry().setFromPoints(points);
+  const normW = e.weight / 120;
+  const opacity = 0.04 + normW * 0.25;
+
+  // Edge color by mortality of the relationship
+  const eMort = e.mortality !== undefined ? e.mortality : 50;
+  const { r, g, b } = mortalityColor(eMort);
+  const edgeColor = new THREE.Color(r * 0.6, g * 0.6, b * 0.6);
+
+  const mat = new THREE.LineBasicMaterial({
+    color: edgeColor,
+    transparent: true,
+    opacity: opacity,
+    blending: THREE.AdditiveBlending,
+    depthWrite: false
+  });
+  const line = new THREE.Line(geom, mat);
+  line.userData = { sourceIdx: si, targetIdx: ti, weight: e.weight, baseOpacity: opacity, mortality: eMort };
+  edgeGroup.add(line);
+  edgeMeshes.push(line);
+});
+
+// ── Nodes colored by mortality ──
+const nodeMeshes = [];
+
+nodes.forEach((n, i) => {
+  const isGestora = n.type === 'gestora';
+  const radius = isGestora
+    ? 1.5 + (n.weight / maxWeight) * 5
+    : 2 + (n.weight / maxWeight) * 7;
+
+  const mort = n.mortality !== undefined ? n.mortality : 50;
+  const { r, g, b } = mortalityColor(mort);
+
+  const geom = new THREE.SphereGeometry(radius, 24, 24);
+  const color = new THREE.Color(r, g, b);
+  const mat = new THREE.MeshBasicMaterial({
+    color: color,
+    transparent: true,
+    opacity: 0.9,
+  });
+  const mesh = new THREE.Mesh(geom, mat);
+  mesh.position.set(n.x, n.y, n.z);
+  mesh.userData = { nodeIndex: i, baseRadius: radius };
+  nodeGroup.add(mesh);
+  nodeMeshes.push(mesh);
+
+  // ── Glow sprite — colored by mortality ──
+  const glowSize = radius * (isGestora ? 10 : 12);
+  const spriteMat = new THREE.SpriteMaterial({
+    map: getGlowTex(mort),
+    transparent: true,
+    opacity: 0.12 + (n.weight / maxWeight) * 0.30,
+    blending: THREE.AdditiveBlending,
+    depthWrite: false,
+  });
+  const sprite = new THREE.Sprite(spriteMat);
+  sprite.position.set(n.x, n.y, n.z);
+  sprite.scale.set(glowSize, glowSize, 1);
+  sprite.userData = { nodeIndex: i };
+  glowGroup.add(sprite);
+});
+
+// ── Flowing particles along edges ──
+const NUM_PARTICLES = 600;
+const particlePositions = new Float32Array(NUM_PARTICLES * 3);
+const particleColors = new Float32Array(NUM_PARTICLES * 3);
+const particleSpeeds = new Float32Array(NUM_PARTICLES);
+const particleEdgeMap = new Uint16Array(NUM_PARTICLES);
+const particleProgress = new Float32Array(NUM_PARTICLES);
+
+const validEdges = edges.filter(e => nodeMap[e.source] !== undefined && nodeMap[e.target] !== undefined);
+
+for (let i = 0; i < NUM_PARTICLES; i++) {
+  const edgeIdx = Math.floor(Math.random() * validEdges.length);
+  particleEdgeMap[i] = edgeIdx;
+  particleProgress[i] = Math.random();
+  particleSpeeds[i] = 0.0008 + Math.random() * 0.003;
+
+  const e = validEdges[edgeIdx];
+  const s = nodes[nodeMap[e.source]];
+  const t = nodes[nodeMap[e.target]];
+  const p = particleProgress[i];
+  particlePositions[i*3]   = s.x + (t.x - s.x) * p;
+  particlePositions[i*3+1] = s.y + (t.y - s.y) * p;
+  particlePositions[i*3+2] = s.z + (t.z - s.z) * p;
+
+  // Color based on edge mortality
+  const eMort = e.mortality !== undefined ? e.mortality : 50;
+  const pColor = mortalityColor(eMort);
+  particleColors[i*3]   = pColor.r;
+  particleColors[i*3+1] = pColor.g;
+  particleColors[i*3+2] = pColor.b;
+}
+
+const particleGeom = new THREE.BufferGeometry();
+particleGeom.setAttribute('position', new THREE.BufferAttribute(particlePositions, 3));
+particleGeom.setAttribute('color', new THREE.BufferAttribute(particleColors, 3));
+
+const particleMat = new THREE.PointsMaterial({
+  size: 2.2,
+  map: glowTexWhite,
+  transparent: true,
+  opacity: 0.7,
+  blending: THREE.AdditiveBlending,
+  depthWrite: false,
+  vertexColors: true,
+  sizeAttenuation: true,
+});
+
+const particleMesh = new THREE.Points(particleGeom, particleMat);
+particleGroup.add(particleMesh);
+
+// ── Background stars ──
+const starCount = 2000;
+const starGeom = new THREE.BufferGeometry();
+const starPos = new Float32Array(starCount * 3);
+for (let i = 0; i < starCount; i++) {
+  starPos[i*3]   = (Math.random() - 0.5) * 4000;
+  starPos[i*3+1] = (Math.random() - 0.5) * 4000;
+  starPos[i*3+2] = (Math.random() - 0.5) * 4000;
+}
+starGeom.setAttribute('position', new THREE.BufferAttribute(starPos, 3));
+const starMat = new THREE.PointsMaterial({
+  size: 0.6,
+  color: 0x333333,
+  transparent: true,
+  opacity: 0.3,
+  blending: THREE.AdditiveBlending,
+  depthWrite: false,
+  sizeAttenuation: true,
+});
+scene.add(new THREE.Points(starGeom, starMat));
+
+// ═══════════════════════════════════════════════════════════════════════
+// CAMERA CONTROLS (manual orbit)
+// ═══════════════════════════════════════════════════════════════════════
+
+let cameraTheta = 0, cameraPhi = Math.PI / 2, cameraRadius = 500;
+let targetTheta = 0, targetPhi = Math.PI / 2, targetRadius = 500;
+let isDragging = false, lastMouseX = 0, lastMouseY = 0;
+let autoRotate = true;
+let focusedNode = null;
+
+function updateCamera() {
+  cameraTheta += (targetTheta - cameraTheta) * 0.08;
+  cameraPhi += (targetPhi - cameraPhi) * 0.08;
+  cameraRadius += (targetRadius - cameraRadius) * 0.08;
+
+  cameraPhi = Math.max(0.1, Math.min(Math.PI - 0.1, cameraPhi));
+  cameraRadius = Math.max(100, Math.min(1500, cameraRadius));
+
+  camera.position.x = cameraRadius * Math.sin(cameraPhi) * Math.cos(cameraTheta);
+  camera.position.y = cameraRadius * Math.cos(cameraPhi);
+  camera.position.z = cameraRadius * Math.sin(cameraPhi) * Math.sin(cameraTheta);
+  camera.lookAt(0, 0, 0);
+}
+
+renderer.domElement.addEventListener('mousedown', e => {
+  isDragging = true;
+  lastMouseX = e.clientX;
+  lastMouseY = e.clientY;
+  autoRotate = false;
+});
+
+renderer.domElement.addEventListener('mousemove', e => {
+  if (isDragging) {
+    const dx = e.clientX - lastMouseX;
+    const dy = e.clientY - lastMouseY;
+    targetTheta -= dx * 0.005;
+    targetPhi -= dy * 0.005;
+    lastMouseX = e.clientX;
+    lastMouseY = e.clientY;
+  }
+});
+
+renderer.domElement.addEventListener('mouseup', () => {
+  isDragging = false;
+  setTimeout(() => { autoRotate = true; }, 3000);
+});
+
+renderer.domElement.addEventListener('wheel', e => {
+  targetRadius += e.deltaY * 0.5;
+  e.preventDefault();
+}, { passive: false });
+
+// Touch support
+renderer.domElement.addEventListener('touchstart', e => {
+  if (e.touches.length === 1) {
+    isDragging = true;
+    lastMouseX = e.touches[0].clientX;
+    lastMouseY = e.touches[0].clientY;
+    autoRotate = false;
+  }
+}, { passive: true });
+
+renderer.domElement.addEventListener('touchmove', e => {
+  if (isDragging && e.touches.length === 1) {
+    const dx = e.touches[0].clientX - lastMouseX;
+    const dy = e.touches[0].clientY - lastMouseY;
+    targetTheta -= dx * 0.005;
+    targetPhi -= dy * 0.005;
+    lastMouseX = e.touches[0].clientX;
+    lastMouseY = e.touches[0].clientY;
+  }
+}, { passive: true });
+
+renderer.domElement.addEventListener('touchend', () => {
+  isDragging = false;
+  setTimeout(() => { autoRotate = true; }, 3000);
+});
+
+// ═══════════════════════════════════════════════════════════════════════
+// RAYCASTING / HOVER
+// ═══════════════════════════════════════════════════════════════════════
+
+const raycaster = new THREE.Raycaster();
+raycaster.params.Points = { threshold: 5 };
+const mouse = new THREE.Vector2();
+let hoveredNode = null;
+const tooltip = document.getElementById('tooltip');
+
+renderer.domElement.addEventListener('mousemove', e => {
+  mouse.x = (e.clientX / W) * 2 - 1;
+  mouse.y = -(e.clientY / H) * 2 + 1;
+
+  raycaster.setFromCamera(mouse, camera);
+  const intersects = raycaster.intersectObjects(nodeMeshes);
+
+  if (intersects.length > 0) {
+    const mesh = intersects[0].object;
+    const idx = mesh.userData.nodeIndex;
+    const n = nodes[idx];
+
+    if (hoveredNode !== idx) {
+      hoveredNode = idx;
+      highlightNode(idx);
+    }
+
+    // Tooltip
+    const tt = tooltip;
+    tt.querySelector('.tt-name').textContent = n.id;
+    tt.querySelector('.tt-name').style.color = mortalityColorCSS(n.mortality || 50);
+    tt.querySelector('.tt-type').textContent = n.type === 'gestora' ? '● Gestora' : '◆ Depositaria';
+
+    const mort = n.mortality !== undefined ? n.mortality : 0;
+    const total = n.total || n.weight;
+    const dead = n.dead || 0;
+    const alive = n.alive || 0;
+    const medVida = n.med_vida || 0;
+
+    let mortBar = '';
+    const barW = 100;
+    const deadW = Math.round(mort);
+    mortBar = `<div style="margin: 6px 0 4px; height: 4px; background: rgba(255,255,255,0.06); border-radius: 2px; overflow: hidden; width: ${barW}px;"><div style="height: 100%; width: ${deadW}%; background: ${mortalityColorCSS(mort)}; border-radius: 2px;"></div></div>`;
+
+    tt.querySelector('.tt-stat').innerHTML =
+      `<b style="font-size: 18px; color: ${mortalityColorCSS(mort)}">${mort.toFixed(0)}%</b> <span style="opacity: 0.5;">mortalidad a 5 años (KM)</span>${mortBar}` +
+      `<span style="opacity: 0.5;">${total} fondos</span> · <span style="color: #5fa87a;">${alive} vivos</span> · <span style="color: #c75d5d;">${dead} liquidados</span>` +
+      (medVida > 0 ? `<br><span style="opacity: 0.5;">Vida mediana:</span> ${medVida.toFixed(1)} años` : '') +
+      (n.surv ? `<br><span style="opacity: 0.5;">Supervivencia 3/5/10 años:</span> ${n.surv.map(v => v.toFixed(0) + '%').join(' · ')}` : '');
+    tt.classList.add('visible');
+
+    const offsetX = e.clientX + 20;
+    const offsetY = e.clientY - 10;
+    tt.style.left = Math.min(offsetX, W - 340) + 'px';
+    tt.style.top = Math.min(offsetY, H - 100) + 'px';
+
+    document.body.style.cursor = 'pointer';
+  } else {
+    if (hoveredNode !== null) {
+      unhighlightAll();
+      hoveredNode = null;
+    }
+    tooltip.classList.remove('visible');
+    document.body.style.cursor = 'default';
+  }
+});
+
+renderer.domElement.addEventListener('click', e => {
+  raycaster.setFromCamera(mouse, camera);
+  const intersects = raycaster.intersectObjects(nodeMeshes);
+  if (intersects.length > 0) {
+    const idx = intersects[0].object.userData.nodeIndex;
+    focusOnNode(idx);
+  }
+});
+
+function highlightNode(idx) {
+  // Dim everything
+  nodeMeshes.forEach((m, i) => {
+    if (i === idx) {
+      m.material.opacity = 1;
+      m.scale.setScalar(1.4);
+    } else {
+      m.material.opacity = 0.12;
+      m.scale.setScalar(1);
+    }
+  });
+
+  glowGroup.children.forEach((s, i) => {
+    if (i === idx) {
+      s.material.opacity = 0.8;
+    } else {
+      s.material.opacity = 0.02;
+    }
+  });
+
+  // Highlight connected edges and nodes
+  const connectedNodes = new Set();
+  edgeMeshes.forEach(line => {
+    const { sourceIdx, targetIdx, baseOpacity } = line.userData;
+    if (sourceIdx === idx || targetIdx === idx) {
+      line.material.opacity = Math.min(baseOpacity * 6, 0.8);
+      connectedNodes.add(sourceIdx === idx ? targetIdx : sourceIdx);
+    } else {
+      line.material.opacity = 0.01;
+    }
+  });
+
+  // Bring back connected nodes
+  connectedNodes.forEach(ci => {
+    nodeMeshes[ci].material.opacity = 0.7;
+    nodeMeshes[ci].scale.setScalar(1.1);
+    if (glowGroup.children[ci]) {
+      glowGroup.children[ci].material.opacity = 0.3;
+    }
+  });
+}
+
+function unhighlightAll() {
+  nodeMeshes.forEach((m, i) => {
+    m.material.opacity = 0.9;
+    m.scale.setScalar(1);
+  });
+  glowGroup.children.forEach((s, i) => {
+    const n = nodes[i];
+    if (n) {
+      s.material.opacity = 0.15 + (n.weight / maxWeight) * 0.35;
+    }
+  });
+  edgeMeshes.forEach(line => {
+    line.material.opacity = line.userData.baseOpacity;
+  });
+}
+
+function focusOnNode(idx) {
+  const n = nodes[idx];
+  // Move camera to look at this node from nearby
+  const dist = 200;
+  const dx = n.x, dy = n.y, dz = n.z;
+  const r = Math.sqrt(dx*dx + dy*dy + dz*dz);
+  if (r > 1) {
+    targetTheta = Math.atan2(dz, dx);
+    targetPhi = Math.acos(dy / r);
+    targetRadius = r + dist;
+  }
+}
+
+// ═══════════════════════════════════════════════════════════════════════
+// ANIMATION LOOP
+// ═══════════════════════════════════════════════════════════════════════
+
+let time = 0;
+
+function animate() {
+  requestAnimationFrame(animate);
+  time += 0.016;
+
+  // Auto rotation
+  if (autoRotate) {
+    targetTheta += 0.0008;
+  }
+
+  updateCamera();
+
+  // Animate particles
+  const posArr = particleGeom.attributes.position.array;
+  for (let i = 0; i < NUM_PARTICLES; i++) {
+    particleProgress[i] += particleSpeeds[i];
+    if (particleProgress[i] > 1) {
+      particleProgress[i] = 0;
+      // Optionally reassign to different edge
+      if (Math.random() < 0.3) {
+        particleEdgeMap[i] = Math.floor(Math.random() * validEdges.length);
+      }
+    }
+
+    const e = validEdges[particleEdgeMap[i]];
+    const s = nodes[nodeMap[e.source]];
+    const t = nodes[nodeMap[e.target]];
+    const p = particleProgress[i];
+
+    // Smooth step for nicer flow
+    const sp = p * p * (3 - 2 * p);
+    posArr[i*3]   = s.x + (t.x - s.x) * sp;
+    posArr[i*3+1] = s.y + (t.y - s.y) * sp;
+    posArr[i*3+2] = s.z + (t.z - s.z) * sp;
+  }
+  particleGeom.attributes.position.needsUpdate = true;
+
+  // Gentle node pulse
+  nodeMeshes.forEach((m, i) => {
+    if (hoveredNode === null) {
+      const pulse = 1 + Math.sin(time * 1.5 + i * 0.5) * 0.03;
+      m.scale.setScalar(pulse);
+    }
+  });
+
+  // Gentle glow pulse
+  glowGroup.children.forEach((s, i) => {
+    if (hoveredNode === null && nodes[i]) {
+      const base = 0.15 + (nodes[i].weight / maxWeight) * 0.35;
+      const pulse = base + Math.sin(time * 1.2 + i * 0.3) * 0.04;
+      s.material.opacity = pulse;
+    }
+  });
+
+  renderer.render(scene, camera);
+}
+
+animate();
+
+// ═══════════════════════════════════════════════════════════════════════
+// RESIZE
+// ═══════════════════════════════════════════════════════════════════════
+
+window.addEventListener('resize', () => {
+  const w = window.innerWidth, h = window.innerHeight;
+  camera.aspect = w / h;
+  camera.updateProjectionMatrix();
+  renderer.setSize(w, h);
+});
+</script>
+</body>
+</html>
+
+"""
+
+
+# Node and link colours show KM mortality at this horizon (years)
+COLOR_HORIZON = 5
+
+
+def _mortality(surv):
+    """Censoring-aware mortality % at ``COLOR_HORIZON`` from an entity_survival table."""
+    return (100 * (1 - surv[f'surv_{COLOR_HORIZON}'])).round(1)
+
+
+def _entity_stats(lifecycle, by, as_of):
+    stats = lifecycle.groupby(by, observed=True).agg(
+        total=('N_Registro', 'count'),
+        dead=('Activo', lambda x: (~x).sum()),
+        alive=('Activo', 'sum'),
+        med_vida=('Vida_Anos', lambda x: x.dropna().median())
+    )
+    surv = entity_survival(lifecycle, by, as_of=as_of).reindex(stats.index)
+    stats['mortality'] = _mortality(surv)
+    stats['surv'] = (100 * surv[[f'surv_{h}' for h in HORIZONS]]).round(1).values.tolist()
+    return {name: {'mortality': float(r['mortality']), 'total': int(r['total']),
+                   'dead': int(r['dead']), 'alive': int(r['alive']),
+                   'med_vida': float(r['med_vida']), 'surv': r['surv']}
+            for name, r in stats.iterrows()}
+
+
+def graph_data(edges, lifecycle, as_of=None):
+    """JSON-ready network: entity stats by full name plus every Gestora–Depositaria link.
+
+    Mortality is 1 − KM survival at ``COLOR_HORIZON`` years, so young
+    entities are not flattered by funds that have not had time to die.
+    """
+    e_mort = _mortality(entity_survival(lifecycle, ['Gestora', 'Depositaria'], as_of=as_of)).to_dict()
+
+    return {
+        'gestoras': _entity_stats(lifecycle, 'Gestora', as_of),
+        'depositarias': _entity_stats(lifecycle, 'Depositaria', as_of),
+        'edges': [{'gestora': r['Gestora'], 'depositaria': r['Depositaria'],
+                   'source': r['Gestora_short'], 'target': r['Depositaria_short'],
+                   'weight': int(r['weight']),
+                   'mortality': float(e_mort.get((r['Gestora'], r['Depositaria']), 50))}
+                  for _, r in edges.iterrows()],
+    }
+
+
+def _node(node_id, kind, stats):
+    return {
+        'id': node_id, 'type': kind, 'weight': 0,
+        'mortality': float(stats.get('mortality', 50)),
+        'total': int(stats.get('total', 0)),
+        'dead': int(stats.get('dead', 0)),
+        'alive': int(stats.get('alive', 0)),
+        'med_vida': round(float(stats.get('med_vida', 0) or 0), 1),
+        'surv': stats.get('surv'),
+    }
+
+
+def graph_view(graph, min_weight):
+    """Nodes and links of ``graph`` with at least ``min_weight`` funds per link."""
+    nodes = {}
+    links = []
+    for e in graph['edges']:
+        if e['weight'] < min_weight:
+            continue
+        for node_id, kind, stats in ((e['source'], 'gestora', graph['gestoras'].get(e['gestora'], {})),
+                                     (e['target'], 'depositaria', graph['depositarias'].get(e['depositaria'], {}))):
+            if node_id not in nodes:
+                nodes[node_id] = _node(node_id, kind, stats)
+            nodes[node_id]['weight'] += e['weight']
+        links.append({'source': e['source'], 'target': e['target'], 'weight': e['weight'],
+                      'mortality': round(e['mortality'], 1)})
+    return {'nodes': list(nodes.values()), 'edges': links}
+
+
+def render_3d_html(view):
+    """Standalone HTML page drawing a :func:`graph_view` result."""
+    return THREE_JS_TEMPLATE.replace('__GRAPH_DATA_PLACEHOLDER__', json.dumps(view))
+
+
+def build_3d_html(edges, lifecycle, min_weight, as_of=None):
+    """HTML for the 3D view plus its node and link counts."""
+    view = graph_view(graph_data(edges, lifecycle, as_of), min_weight)
+    return render_3d_html(view), len(view['nodes']), len(view['edges'])
@@ -0,0 +1,76 @@
+"""Rolling liquidation and launch rates over fund-time at risk.
+
+Exposure is the time funds spend alive: the live-fund matrix of
+:class:`cnmv.stock.FundStock`, summed per calendar month (``reduceat``),
+gives the fund-months at risk of every group. Deaths and launches are
+counted per (group, month) with ``bincount``. A window of any length is
+then the difference of two running sums along the months, so all windows
+and all groups come out of the same monthly arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stock import FundStock
+
+DEFAULT_WINDOWS = (12, 36)
+
+
+def _monthly(lifecycle, by, as_of):
+    """Month starts, keys and ``groups × months`` launches, deaths and fund-months at risk."""
+    stock = FundStock(lifecycle, by, as_of)
+    months = pd.date_range(stock.start.to_period('M').start_time, stock.start + pd.Timedelta(days=stock.days - 1),
+                           freq='MS')
+    first_day = np.maximum((months - stock.start).days.to_numpy(), 0)
+    days_in_month = months.days_in_month.to_numpy()
+
+    live = stock.total[None, :] if by is None else stock.matrix
+    codes = np.zeros(len(lifecycle), dtype=np.int64) if by is None else stock.codes
+    n_groups = live.shape[0]
+    exposure = (np.add.reduceat(live, first_day, axis=1, dtype=np.int64) / days_in_month
+                if stock.days else np.zeros((n_groups, len(months))))
+
+    def counts(dates):
+        # Month of each date; dates after as_of (or missing) are dropped
+        ok = (codes >= 0) & ~np.isnat(dates) & (dates <= np.datetime64(stock.start + pd.Timedelta(days=stock.days - 1)))
+        month = np.searchsorted(months.to_numpy(), dates[ok], side='right') - 1
+        return np.bincount(codes[ok] * len(months) + month, minlength=n_groups * len(months)).reshape(n_groups, -1)
+
+    launches = counts(lifecycle['Fecha_Alta'].to_numpy('datetime64[ns]'))
+    deaths = counts(lifecycle['Fecha_Baja'].to_numpy('datetime64[ns]'))
+    return months, stock.entities, launches, deaths, exposure
+
+
+def rolling_rates(lifecycle, windows=DEFAULT_WINDOWS, by=None, as_of=None):
+    """Monthly launches, deaths and exposure, with rolling rates over every window in ``windows``.
+
+    For each month up to ``as_of`` (today by default): ``launches``,
+    ``deaths`` and ``exposure`` (fund-months at risk). Then, for each window
+    of ``w`` months ending in that month: ``mortality_<w>m``, the deaths per
+    fund-year at risk (deaths / fund-months × 12), and ``launch_rate_<w>m``,
+    the launches per fund-year of the live stock. Months before a window is
+    complete, or with no exposure in it, are NaN. ``by`` is a column or list
+    of columns (funds with a missing key are left out). Indexed by ``date``
+    (month start), or by ``(group, date)`` when ``by`` is given.
+    """
+    months, keys, launches, deaths, exposure = _monthly(lifecycle, by, as_of)
+    columns = {'launches': launches, 'deaths': deaths, 'exposure': exposure}
+
+    def window_sum(x, w):
+        total = np.cumsum(x, axis=1, dtype=float)
+        out = np.full(x.shape, np.nan)
+        out[:, w - 1:] = total[:, w - 1:] - np.pad(total, ((0, 0), (1, 0)))[:, :total.shape[1] - w + 1]
+        return out
+
+    for w in windows:
+        at_risk = window_sum(exposure, w)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns[f'mortality_{w}m'] = np.where(at_risk > 0, window_sum(deaths, w) / at_risk * 12, np.nan)
+            columns[f'launch_rate_{w}m'] = np.where(at_risk > 0, window_sum(launches, w) / at_risk * 12, np.nan)
+
+    table = pd.DataFrame({name: values.ravel() for name, values in columns.items()})
+    if by is None:
+        table.index = pd.DatetimeIndex(months, name='date')
+        return table
+    table.index = pd.MultiIndex.from_product([keys.to_flat_index(), months], names=['group', 'date'])
+    return table
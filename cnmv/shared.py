@@ -0,0 +1,114 @@
+"""Read-only, memory-mapped table set shared by every session and process.
+
+:func:`publish` writes each column of the compact tables as a raw ``.npy``
+buffer (categoricals as their integer codes, nullable integers as data +
+mask). :func:`attach` maps those files read-only and wraps them in
+DataFrames without copying, so all Streamlit sessions and all server
+processes on a host read the same page-cache pages: adding workers does not
+add copies of the data. The buffers are not writeable, which also stops any
+view from mutating the shared tables by accident.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, cached_table, fingerprint, load_cached
+from .ingest import DATA_FILE
+
+SHARED_TABLES = ('events', 'lifecycle')
+
+
+def _save(directory, name, values):
+    np.save(directory / f'{name}.npy', np.ascontiguousarray(values), allow_pickle=False)
+
+
+def _load(directory, name):
+    return np.load(directory / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+
+
+def _write_table(df, directory):
+    directory.mkdir(parents=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        stem = f'c{i}'
+        if not isinstance(s.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(s.dtype):
+            # Free-text columns have no fixed-width layout; share them as codes
+            s = s.astype('category')
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            _save(directory, stem, s.array.codes)
+            columns.append({'name': col, 'kind': 'category', 'file': stem,
+                            'categories': s.cat.categories.tolist()})
+        elif isinstance(s.array, (pd.arrays.IntegerArray, pd.arrays.BooleanArray)):
+            _save(directory, stem, s.array._data)
+            _save(directory, f'{stem}.mask', s.array._mask)
+            columns.append({'name': col, 'kind': 'masked', 'file': stem, 'dtype': str(s.dtype)})
+        else:
+            _save(directory, stem, s.to_numpy())
+            columns.append({'name': col, 'kind': 'numpy', 'file': stem})
+    (directory / 'meta.json').write_text(json.dumps({'rows': len(df), 'columns': columns}))
+
+
+def _attach_table(directory):
+    meta = json.loads((directory / 'meta.json').read_text())
+    data = {}
+    for c in meta['columns']:
+        values = _load(directory, c['file'])
+        if c['kind'] == 'category':
+            dtype = pd.CategoricalDtype(pd.Index(c['categories']))
+            data[c['name']] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif c['kind'] == 'masked':
+            mask = _load(directory, f"{c['file']}.mask")
+            cls = pd.arrays.BooleanArray if c['dtype'] == 'boolean' else pd.arrays.IntegerArray
+            data[c['name']] = cls(values, mask)
+        else:
+            data[c['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def publish(tables, target):
+    """Write ``tables`` (name → DataFrame) as a shared buffer set at ``target``.
+
+    The set is assembled in a private directory and renamed into place, so
+    concurrent publishers cannot expose a half-written set; the loser of the
+    race just discards its copy.
+    """
+    target = Path(target)
+    tmp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    for name, df in tables.items():
+        _write_table(df.reset_index(drop=True), tmp / name)
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.exists():
+            raise
+    return target
+
+
+def attach(source, names=SHARED_TABLES):
+    """Map a published buffer set; returns name → read-only DataFrame."""
+    source = Path(source)
+    return {name: _attach_table(source / name) for name in names}
+
+
+def load_shared(path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Events, lifecycle and edges, with events/lifecycle attached zero-copy.
+
+    The first caller for a given CSV fingerprint publishes the set; every
+    later session or process just maps it.
+    """
+    target = Path(cache_dir) / fingerprint(path, cache_dir) / 'shared'
+    if not target.exists():
+        events, lifecycle, _ = load_cached(path, cache_dir)
+        publish({'events': events, 'lifecycle': lifecycle}, target)
+    # The edge table is small and holds per-pair fund lists; it stays in Arrow
+    edges = cached_table('edges', lambda: load_cached(path, cache_dir)[2], path, cache_dir)
+    tables = attach(target)
+    return tables['events'], tables['lifecycle'], edges
@@ -0,0 +1,96 @@
+"""Live funds per day for every entity of a grouping (Gestora, Depositaria, ...).
+
+:class:`FundStock` places each fund's launch and liquidation on a day grid
+as a +1/−1 difference array per entity (one ``bincount``). A cumulative sum
+along the days turns it into a compact ``int32`` entity × day matrix of live
+funds. A fund is live from its ``Fecha_Alta`` until the day before its
+``Fecha_Baja``. Any entity, date range, market share or cross-section is then
+a slice of that matrix.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class FundStock:
+    """Funds alive on each day, per value of ``by`` and in total.
+
+    ``by`` is a column or a list of columns; ``entities`` holds the keys in
+    matrix-row order (none when ``by`` is None), and ``codes`` the row of
+    each fund (−1 for a missing key). The total counts every fund. The grid
+    runs from the first launch to ``as_of`` (today by default).
+    """
+
+    def __init__(self, lifecycle, by='Gestora', as_of=None):
+        now = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+        if by is None:
+            codes, self.entities = pd.Series(np.nan, index=lifecycle.index), pd.Index([])
+        else:
+            groups = lifecycle.groupby(by, observed=True, sort=True)
+            codes = groups.ngroup()
+            self.entities = groups.size().index
+        alta = lifecycle['Fecha_Alta'].to_numpy('datetime64[D]')
+        baja = lifecycle['Fecha_Baja'].to_numpy('datetime64[D]')
+        self.start = pd.Timestamp(alta.min()) if len(alta) else now
+        self.days = max((now - self.start).days + 1, 0)
+
+        origin = np.datetime64(self.start, 'D')
+        # Days past the grid (or with no liquidation) go to an overflow column that is dropped
+        born = np.clip((alta - origin).astype(np.int64), 0, self.days)
+        dead = np.where(np.isnat(baja), self.days, np.clip((baja - origin).astype(np.int64), 0, self.days))
+
+        # ngroup is NaN (float) for rows whose key is missing: those only count in the total
+        keep = codes.notna().to_numpy()
+        self.codes = np.where(keep, codes.fillna(-1).to_numpy(), -1).astype(np.int64)
+        entity = self.codes[keep]
+        width = self.days + 1
+        size = len(self.entities) * width
+        diff = (np.bincount(entity * width + born[keep], minlength=size)
+                - np.bincount(entity * width + dead[keep], minlength=size))
+        self.matrix = np.cumsum(diff.reshape(len(self.entities), width)[:, :self.days], axis=1, dtype=np.int32)
+        total = np.bincount(born, minlength=width) - np.bincount(dead, minlength=width)
+        self.total = np.cumsum(total[:self.days], dtype=np.int32)
+
+    @property
+    def dates(self):
+        return pd.date_range(self.start, periods=self.days, freq='D', name='date')
+
+    def _span(self, start, end):
+        i0 = 0 if start is None else max((pd.Timestamp(start) - self.start).days, 0)
+        i1 = self.days if end is None else min((pd.Timestamp(end) - self.start).days + 1, self.days)
+        return i0, max(i0, i1)
+
+    def _rows(self, entity):
+        """Matrix rows of one key or a list of keys."""
+        if isinstance(entity, list):
+            rows = self.entities.get_indexer(entity)
+            if (rows < 0).any():
+                raise KeyError([e for e, r in zip(entity, rows) if r < 0])
+            return rows
+        return [self.entities.get_loc(entity)]
+
+    def series(self, entity=None, start=None, end=None):
+        """Live funds per day between ``start`` and ``end`` (inclusive).
+
+        ``entity`` is a key, a list of keys (summed) or None for the total.
+        """
+        i0, i1 = self._span(start, end)
+        values = self.total[i0:i1] if entity is None else self.matrix[self._rows(entity), i0:i1].sum(axis=0)
+        return pd.Series(values, index=self.dates[i0:i1], name='live_funds')
+
+    def frame(self, entities, start=None, end=None):
+        """Live funds per day, one column per key of ``entities``."""
+        i0, i1 = self._span(start, end)
+        return pd.DataFrame(self.matrix[self._rows(list(entities)), i0:i1].T, index=self.dates[i0:i1],
+                            columns=list(entities))
+
+    def share(self, entities, start=None, end=None):
+        """Market share (% of all live funds) per day, one column per key of ``entities``."""
+        i0, i1 = self._span(start, end)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.frame(entities, start, end) * 100 / self.total[i0:i1, None]
+
+    def at(self, date):
+        """Live funds of every entity on ``date`` (indexed by key)."""
+        i = min(max((pd.Timestamp(date) - self.start).days, 0), self.days - 1)
+        return pd.Series(self.matrix[:, i], index=self.entities, name='live_funds')
@@ -0,0 +1,541 @@
+"""Kaplan–Meier survival curves of fund lifetimes.
+
+Durations run from ``Fecha_Alta`` to ``Fecha_Baja``; funds still alive are
+censored at ``as_of`` (today by default). ``filter_type`` selects all funds
+(``'all'``), ordinary ones (``'normal'``) or structured ones
+(``'structured'``). The ``compute_km_*`` helpers return a curve as a
+``(times, survival, n)`` tuple. Curves read back from the precomputed table
+are :class:`SurvivalCurve` objects.
+
+:func:`grouped_counts` sorts the pooled durations once and counts events and
+removals per group at every distinct time; per-group curves, Greenwood
+bands, Nelson–Aalen cumulative hazards and log-rank statistics are all read
+off those count matrices. :class:`LaunchYearIndex` keeps them per launch year,
+cumulated over years, so cohorts of any bins are sliced without a new pass.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+FILTER_TYPES = ('all', 'normal', 'structured')
+
+# Default right-closed launch-year bins; cohort_edges stretches the outer
+# edges to the launch years present, which may relabel the outer cohorts
+COHORT_BINS = [2003, 2008, 2013, 2018, 2025]
+COHORT_LABELS = ['2004–2008', '2009–2013', '2014–2018', '2019–2025']
+
+# Curve label used for the whole-population curve in km tables
+GLOBAL_CURVE = 'global'
+
+DEFAULT_LEVEL = 0.95
+
+# Horizons (years) reported by entity_survival
+HORIZONS = (3, 5, 10)
+
+# Kernel bandwidth (years) of smoothed_hazard
+HAZARD_BANDWIDTH = 1.0
+
+
+def _subset(lifecycle, filter_type):
+    if filter_type == 'normal':
+        return lifecycle[~lifecycle['Estructurado']]
+    if filter_type == 'structured':
+        return lifecycle[lifecycle['Estructurado']]
+    return lifecycle
+
+
+def _durations(lifecycle, filter_type, as_of=None):
+    """Duration (years), event flag and launch year of the funds in ``filter_type``."""
+    now = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+    lifecycle = _subset(lifecycle, filter_type)
+
+    baja = lifecycle['Fecha_Baja']
+    end = baja.where(baja.notna(), now)
+    duration = ((end - lifecycle['Fecha_Alta']).dt.days / 365.25).clip(lower=0)
+    return (duration.to_numpy(dtype=float), baja.notna().to_numpy(),
+            lifecycle['Año_Alta'].to_numpy())
+
+
+def km_counts(duration, event):
+    """Distinct event/censoring times with their at-risk, event and censored counts.
+
+    One stable sort, then run-length counting over the sorted durations.
+    """
+    order = np.argsort(duration, kind='stable')
+    d = duration[order]
+    if not len(d):
+        empty = np.empty(0, dtype=np.int64)
+        return np.empty(0), empty, empty, empty
+    starts = np.flatnonzero(np.r_[True, d[1:] != d[:-1]])
+    removed = np.diff(np.r_[starts, len(d)])
+    deaths = np.add.reduceat(event[order].astype(np.int64), starts)
+    at_risk = len(d) - np.r_[0, np.cumsum(removed)[:-1]]
+    return d[starts], at_risk, deaths, removed - deaths
+
+
+def kaplan_meier(duration, event):
+    """Product-limit curve ``(times, survival, n)``, starting at ``(0, 1.0)``.
+
+    Ties follow the usual convention: at a time with both events and
+    censorings, the censored funds still count as at risk.
+    """
+    times, at_risk, deaths, _ = km_counts(duration, event)
+    survival = np.cumprod(1 - deaths / at_risk)
+    return np.r_[0.0, times], np.r_[1.0, survival], len(duration)
+
+
+def grouped_counts(duration, event, group, n_groups):
+    """Pooled distinct times with per-group ``(T × G)`` at-risk, event and removal counts.
+
+    ``group`` holds codes ``0..n_groups-1``; one stable sort serves every group.
+    """
+    order = np.argsort(duration, kind='stable')
+    d = duration[order]
+    if not len(d):
+        empty = np.zeros((0, n_groups), dtype=np.int64)
+        return np.empty(0), empty, empty, empty
+    new_time = np.r_[True, d[1:] != d[:-1]]
+    cell = (np.cumsum(new_time) - 1) * n_groups + np.asarray(group)[order]
+    size = int(new_time.sum()) * n_groups
+    removed = np.bincount(cell, minlength=size).reshape(-1, n_groups)
+    deaths = np.bincount(cell, weights=event[order], minlength=size).astype(np.int64).reshape(-1, n_groups)
+    at_risk = removed.sum(axis=0) - np.cumsum(removed, axis=0) + removed
+    return d[new_time], at_risk, deaths, removed
+
+
+def greenwood_band(survival, at_risk, deaths, level=DEFAULT_LEVEL):
+    """Pointwise ``level`` confidence band of a KM curve from Greenwood's variance.
+
+    The interval is formed on the log(−log S) scale, so it stays within [0, 1].
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = np.cumsum(deaths / (at_risk * (at_risk - deaths)))
+        width = z * np.sqrt(var) / np.abs(np.log(survival))
+        lower = survival ** np.exp(width)
+        upper = survival ** np.exp(-width)
+    lower = np.where(survival >= 1, 1.0, np.where(survival <= 0, 0.0, lower))
+    upper = np.where(survival >= 1, 1.0, np.where(survival <= 0, 0.0, upper))
+    return lower, upper
+
+
+def nelson_aalen(at_risk, deaths):
+    """Nelson–Aalen cumulative hazard ``H(t) = Σ d / n`` at each distinct time."""
+    return np.cumsum(deaths / at_risk)
+
+
+def binned_hazard(times, at_risk, deaths, width=1.0, max_age=None):
+    """Occurrence/exposure hazard per ``width``-year age bin: deaths ÷ fund-years at risk.
+
+    ``times``, ``at_risk`` and ``deaths`` are one group's column of the
+    count matrices. Between consecutive distinct times ``t[j-1] < t ≤ t[j]``
+    exactly ``at_risk[j]`` funds are alive, so the fund-years lived in a bin
+    are the integral of that step function over it. Deaths on an edge go to
+    the bin starting there. Returns ``(bin_starts, rates)`` for the whole
+    bins up to ``max_age`` (default: the last time); bins without exposure
+    get NaN.
+    """
+    if not len(times):
+        return np.empty(0), np.empty(0)
+    top = times[-1] if max_age is None else min(max_age, times[-1])
+    edges = np.arange(0.0, top + 1e-9, width)
+    knots = np.r_[0.0, times]
+    lived = np.r_[0.0, np.cumsum(at_risk * np.diff(knots))]
+    # Edge x lies in (knots[k], knots[k + 1]], where at_risk[k] funds are alive
+    k = np.searchsorted(times, edges, side='left')
+    exposure = lived[k] + np.r_[at_risk, 0][k] * (edges - knots[k])
+    died = np.r_[0, np.cumsum(deaths)][k]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = np.where(np.diff(exposure) > 0, np.diff(died) / np.diff(exposure), np.nan)
+    return edges[:-1], rates
+
+
+def smoothed_hazard(times, cumhaz, bandwidth=HAZARD_BANDWIDTH, grid=None):
+    """Kernel-smoothed hazard rate (Epanechnikov kernel over the Nelson–Aalen jumps).
+
+    Returns ``(grid, rates)``; the grid defaults to 0.1-year steps up to the
+    last time. Rates within ``bandwidth`` of zero are biased low, since there
+    is no boundary correction.
+    """
+    if grid is None:
+        grid = np.arange(0.0, times[-1] + 1e-9, 0.1)
+    jumps = np.diff(np.r_[0.0, cumhaz])
+    keep = jumps > 0
+    u = (grid[:, None] - times[keep][None, :]) / bandwidth
+    kernel = np.where(np.abs(u) < 1, 0.75 * (1 - u ** 2), 0.0)
+    return grid, kernel @ jumps[keep] / bandwidth
+
+
+def _band_curve(times, at_risk, deaths, removed, level):
+    """``(times, survival, lower, upper, cumhaz)`` of one group's column of the count matrices."""
+    rows = removed > 0
+    n, d = at_risk[rows], deaths[rows]
+    survival = np.cumprod(1 - d / n)
+    lower, upper = greenwood_band(survival, n, d, level)
+    return (np.r_[0.0, times[rows]], np.r_[1.0, survival], np.r_[1.0, lower], np.r_[1.0, upper],
+            np.r_[0.0, nelson_aalen(n, d)])
+
+
+def _chi2_sf(x, df):
+    """Upper tail probability of a χ² variable with integer ``df`` degrees of freedom."""
+    if x <= 0:
+        return 1.0
+    h = x / 2
+    if df % 2 == 0:
+        term = total = math.exp(-h)
+        for i in range(1, df // 2):
+            term *= h / i
+            total += term
+        return min(total, 1.0)
+    total = math.erfc(math.sqrt(h))
+    term = math.sqrt(2 * x / math.pi) * math.exp(-h)
+    for i in range(1, (df + 1) // 2):
+        total += term
+        term *= x / (2 * i + 1)
+    return min(total, 1.0)
+
+
+def logrank(at_risk, deaths):
+    """Log-rank test of equal hazards across the columns of the count matrices.
+
+    Returns ``(chi2, df, p_value)`` with ``df = groups − 1``.
+    """
+    n = at_risk.sum(axis=1)
+    d = deaths.sum(axis=1)
+    rows = (d > 0) & (n > 0)
+    n, d, n_g, d_g = n[rows], d[rows], at_risk[rows], deaths[rows]
+    share = n_g / n[:, None]
+    u = (d_g - d[:, None] * share).sum(axis=0)
+    f = np.where(n > 1, d * (n - d) / np.maximum(n - 1, 1), 0.0)
+    v = np.diag((f[:, None] * share).sum(axis=0)) - (share * f[:, None]).T @ share
+    df = at_risk.shape[1] - 1
+    if df < 1:
+        return float('nan'), df, float('nan')
+    chi2 = float(u[:-1] @ np.linalg.lstsq(v[:-1, :-1], u[:-1], rcond=None)[0])
+    return chi2, df, _chi2_sf(chi2, df)
+
+
+def grouped_km(duration, event, group):
+    """Kaplan–Meier curves of every group at once, for any number of groups.
+
+    One lexsort by (group, duration), then segmented cumulative sums: no
+    Python loop over groups. Returns a frame with one row per distinct
+    (group, time), sorted that way, with columns ``group``, ``time``,
+    ``at_risk``, ``deaths`` and ``survival``.
+    """
+    order = np.lexsort((duration, group))
+    g, d, e = np.asarray(group)[order], duration[order], event[order].astype(np.int64)
+    if not len(d):
+        return pd.DataFrame({'group': g, 'time': d, 'at_risk': e, 'deaths': e, 'survival': d})
+    new_group = np.r_[True, g[1:] != g[:-1]]
+    starts = np.flatnonzero(new_group | np.r_[True, d[1:] != d[:-1]])
+    removed = np.diff(np.r_[starts, len(d)])
+    deaths = np.add.reduceat(e, starts)
+
+    # Segment = one group's run of cells; seg maps each cell to its segment
+    first = new_group[starts]
+    seg = np.cumsum(first) - 1
+    seg_start = np.flatnonzero(first)
+
+    def segmented_cumsum(x):
+        total = np.cumsum(x)
+        return total - np.r_[0, total][seg_start][seg]
+
+    size = np.add.reduceat(removed, seg_start)
+    at_risk = size[seg] - segmented_cumsum(removed) + removed
+    factor = 1 - deaths / at_risk
+    # A zero factor (everyone at risk dies) pins the rest of the curve at 0
+    dead_out = segmented_cumsum(factor <= 0) > 0
+    survival = np.where(dead_out, 0.0, np.exp(segmented_cumsum(np.log(np.where(factor > 0, factor, 1.0)))))
+    return pd.DataFrame({'group': g[starts], 'time': d[starts], 'at_risk': at_risk,
+                         'deaths': deaths, 'survival': survival})
+
+
+def horizon_survival(curves, horizons=HORIZONS):
+    """Survival of each group of a :func:`grouped_km` frame at ``horizons`` years.
+
+    The KM value at the last time ≤ h (1.0 before a group's first time).
+    Returns a frame indexed by group with ``n``, ``events`` and ``surv_<h>``.
+    """
+    group = curves['group'].to_numpy()
+    if not len(group):
+        return pd.DataFrame(columns=['n', 'events'] + [f'surv_{h}' for h in horizons])
+    seg_start = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    time = curves['time'].to_numpy()
+    survival = curves['survival'].to_numpy()
+    deaths = curves['deaths'].to_numpy()
+    out = pd.DataFrame({'n': curves['at_risk'].to_numpy()[seg_start],
+                        'events': np.add.reduceat(deaths, seg_start)},
+                       index=pd.Index(group[seg_start], name='group'))
+    for h in horizons:
+        reached = np.add.reduceat((time <= h).astype(np.int64), seg_start)
+        out[f'surv_{h}'] = np.where(reached > 0, survival[seg_start + np.maximum(reached, 1) - 1], 1.0)
+    return out
+
+
+def entity_survival(lifecycle, by, horizons=HORIZONS, as_of=None):
+    """Censoring-aware survival at ``horizons`` years for each value of ``by``.
+
+    ``by`` is a column (``'Gestora'``) or list of columns (``['Gestora',
+    'Depositaria']``); funds with a missing key are left out. Indexed by the
+    key(s), with ``n``, ``events`` and ``surv_<h>`` (fractions).
+    """
+    duration, event, _ = _durations(lifecycle, 'all', as_of)
+    groups = lifecycle.groupby(by, observed=True, sort=True)
+    codes = groups.ngroup()
+    # ngroup is NaN (float) for rows whose key is missing
+    keep = codes.notna().to_numpy()
+    codes = codes.to_numpy()[keep].astype(np.int64)
+    table = horizon_survival(grouped_km(duration[keep], event[keep], codes), horizons)
+    table.index = groups.size().index[table.index]
+    return table
+
+
+def cohort_edges(first_year, last_year, bins=COHORT_BINS):
+    """Right-closed launch-year bin edges, with the outer edges stretched to cover ``[first_year, last_year]``.
+
+    With the default ``COHORT_BINS``, funds launched after 2025 join the last
+    cohort (relabelled, e.g. ``'2019–2026'``) instead of dropping out.
+    """
+    edges = list(bins)
+    edges[0] = min(edges[0], int(first_year) - 1)
+    edges[-1] = max(edges[-1], int(last_year))
+    return edges
+
+
+def cohort_ranges(edges):
+    """Inclusive launch-year ranges ``[(first, last), ...]`` of right-closed bin ``edges``."""
+    return [(lo + 1, hi) for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def rolling_ranges(first_year, last_year, width, step=1):
+    """Overlapping ``width``-year launch windows from ``first_year``, ``step`` years apart.
+
+    The last window ends at ``last_year``, even if it overlaps the previous
+    one by more than usual.
+    """
+    starts = list(range(int(first_year), int(last_year) - width + 2, step))
+    if not starts or starts[-1] + width - 1 < last_year:
+        starts.append(max(int(first_year), int(last_year) - width + 1))
+    return [(y, y + width - 1) for y in starts]
+
+
+def range_label(first, last):
+    return str(first) if first == last else f'{first}–{last}'
+
+
+def _default_ranges(lifecycle):
+    years = lifecycle['Año_Alta']
+    return cohort_ranges(cohort_edges(years.min(), years.max())) if len(years) else []
+
+
+def _cohort_codes(years, ranges):
+    """Index into ``ranges`` of each launch year (−1 outside every range)."""
+    codes = np.full(len(years), -1, dtype=np.int64)
+    for i, (lo, hi) in enumerate(ranges):
+        codes[(years >= lo) & (years <= hi)] = i
+    return codes
+
+
+def launch_cohorts(lifecycle, ranges=None):
+    """Cohort label of each fund (categorical, in range order; default cohorts if ``ranges`` is None)."""
+    ranges = _default_ranges(lifecycle) if ranges is None else ranges
+    codes = _cohort_codes(lifecycle['Año_Alta'].to_numpy(), ranges)
+    return pd.Series(pd.Categorical.from_codes(codes, [range_label(*r) for r in ranges]),
+                     index=lifecycle.index, name='Cohorte')
+
+
+def compute_km_curves(lifecycle, filter_type='all', as_of=None):
+    """Kaplan–Meier curve per 5-year launch cohort (cohorts under 10 funds are skipped)."""
+    index = LaunchYearIndex(lifecycle, filter_type, as_of)
+    return {label: (curve.times, curve.survival, curve.n)
+            for label, curve in index.curves(_default_ranges(lifecycle)).items()}
+
+
+def compute_km_global(lifecycle, filter_type, as_of=None):
+    """Single Kaplan–Meier curve over every fund of ``filter_type``."""
+    duration, event, _ = _durations(lifecycle, filter_type, as_of)
+    return kaplan_meier(duration, event)
+
+
+def _curve_frame(filter_type, label, curve):
+    return pd.DataFrame({'filter': filter_type, 'curve': label, 'time': curve.times,
+                         'survival': curve.survival, 'lower': curve.lower, 'upper': curve.upper,
+                         'cumhaz': curve.cumhaz, 'n': curve.n, 'events': curve.events,
+                         'median_life': curve.median_life})
+
+
+def survival_tables(lifecycle, as_of=None, level=DEFAULT_LEVEL):
+    """KM curves with Greenwood bands and log-rank tests for every filter.
+
+    Returns ``(km, tests)``. ``km`` has one row per curve point with columns
+    ``filter``, ``curve`` (cohort label or ``GLOBAL_CURVE``), ``time``,
+    ``survival``, ``lower``, ``upper``, ``cumhaz`` (Nelson–Aalen), plus the
+    curve's ``n``, ``events`` (liquidations) and ``median_life`` (median
+    ``Vida_Anos`` of the liquidated funds) repeated on every row.
+    ``tests`` holds, per
+    filter, the log-rank test across cohorts (``test='cohorts'``) and between
+    each pair of cohorts (``test='pair'``). For the ``'all'`` filter it also
+    holds normal vs structured funds (``test='structured'``). Columns are
+    ``group_a``, ``group_b``, ``chi2``, ``df`` and ``p_value``. Cohorts are
+    the default ``COHORT_BINS`` stretched over the launch years present (see
+    :func:`cohort_edges`); each filter's curves and tests are sliced from one
+    :class:`LaunchYearIndex`.
+    """
+    ranges = _default_ranges(lifecycle)
+    curves, tests = [], []
+    for filter_type in FILTER_TYPES:
+        index = LaunchYearIndex(lifecycle, filter_type, as_of)
+        for label, curve in index.curves(ranges, level).items():
+            curves.append(_curve_frame(filter_type, label, curve))
+        tests.append(index.tests(ranges).assign(filter=filter_type))
+        everyone = index.curves([(index.first, index.last)], level, min_size=0)
+        curves.append(_curve_frame(filter_type, GLOBAL_CURVE, next(iter(everyone.values()))))
+
+    duration, event, _ = _durations(lifecycle, 'all', as_of)
+    structured = lifecycle['Estructurado'].to_numpy().astype(np.int64)
+    _, at_risk, deaths, _ = grouped_counts(duration, event, structured, 2)
+    chi2, df, p_value = logrank(at_risk, deaths)
+    tests.append(pd.DataFrame([{'filter': 'all', 'test': 'structured', 'group_a': 'normal',
+                                'group_b': 'structured', 'chi2': chi2, 'df': df, 'p_value': p_value}]))
+
+    return (pd.concat(curves, ignore_index=True),
+            pd.concat(tests, ignore_index=True)[['filter', 'test', 'group_a', 'group_b', 'chi2', 'df', 'p_value']])
+
+
+class SurvivalCurve:
+    """A KM step curve with its Greenwood band, Nelson–Aalen hazard and group totals.
+
+    :meth:`at` answers any list of horizons with one ``searchsorted`` call;
+    counts and medians are fixed when the curve is built.
+    """
+
+    def __init__(self, times, survival, n, events, lower=None, upper=None, cumhaz=None,
+                 median_life=np.nan):
+        self.times = np.asarray(times, dtype=float)
+        self.survival = np.asarray(survival, dtype=float)
+        self.n = int(n)
+        self.events = int(events)
+        self.lower, self.upper, self.cumhaz = lower, upper, cumhaz
+        self.median_life = float(median_life)
+
+    @property
+    def active(self):
+        return self.n - self.events
+
+    @property
+    def mortality(self):
+        """Share of the group liquidated so far (not KM-adjusted)."""
+        return self.events / self.n if self.n else 0.0
+
+    def at(self, horizons):
+        """S(h) for each horizon: the value at the last time ≤ h (1.0 before the first)."""
+        idx = np.searchsorted(self.times, np.asarray(horizons, dtype=float), side='right') - 1
+        return np.where(idx >= 0, self.survival[np.maximum(idx, 0)], 1.0)
+
+    def median(self):
+        """KM median survival time: first time S(t) ≤ 0.5 (NaN if never reached)."""
+        below = np.flatnonzero(self.survival <= 0.5)
+        return self.times[below[0]] if len(below) else np.nan
+
+
+class LaunchYearIndex:
+    """KM counts of one filter split by launch year and cumulated over years.
+
+    One :func:`grouped_counts` pass with the launch year as the group gives
+    ``T × Y`` at-risk, death and removal matrices. Their running sums over
+    the year axis make the counts of any launch-year range ``[lo, hi]`` the
+    difference of two columns, and the counts add up exactly. Re-binning
+    cohorts (custom edges, rolling windows) therefore costs O(T) per cohort
+    and never goes back to the fund rows. The lifetimes of liquidated funds
+    are kept the same way, as per-year histograms in tenths of a year (the
+    resolution of ``Vida_Anos``), for the cohort medians.
+    """
+
+    def __init__(self, lifecycle, filter_type='all', as_of=None):
+        duration, event, year = _durations(lifecycle, filter_type, as_of)
+        life = _subset(lifecycle, filter_type)['Vida_Anos'].to_numpy(dtype=float)
+        year = year.astype(np.int64)
+        self.first = int(year.min()) if len(year) else 0
+        self.last = int(year.max()) if len(year) else -1
+        self.years = self.last - self.first + 1
+        code = year - self.first
+        self.times, *counts = grouped_counts(duration, event, code, self.years)
+        zero = np.zeros((len(self.times), 1), dtype=np.int64)
+        self._at_risk, self._deaths, self._removed = (np.hstack([zero, np.cumsum(c, axis=1)]) for c in counts)
+
+        dead = ~np.isnan(life)
+        tenths = np.rint(life[dead] * 10).astype(np.int64)
+        width = int(tenths.max(initial=0)) + 1
+        hist = np.bincount(code[dead] * width + tenths, minlength=self.years * width).reshape(self.years, width)
+        self._life = np.vstack([np.zeros((1, width), dtype=np.int64), np.cumsum(hist, axis=0)])
+
+    def _columns(self, ranges):
+        """Cumulative-matrix columns bounding each range (clipped to the years present)."""
+        bounds = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        a = np.clip(bounds[:, 0] - self.first, 0, self.years)
+        b = np.clip(bounds[:, 1] - self.first + 1, 0, self.years)
+        return a, np.maximum(a, b)
+
+    def counts(self, ranges):
+        """``(times, at_risk, deaths, removed)`` with one column per launch-year range."""
+        a, b = self._columns(ranges)
+        return (self.times, self._at_risk[:, b] - self._at_risk[:, a],
+                self._deaths[:, b] - self._deaths[:, a], self._removed[:, b] - self._removed[:, a])
+
+    def median_life(self, ranges):
+        """Median ``Vida_Anos`` of the liquidated funds of each range (NaN if none)."""
+        a, b = self._columns(ranges)
+        cum = np.cumsum(self._life[b] - self._life[a], axis=1)
+        out = np.full(len(a), np.nan)
+        for i, row in enumerate(cum):
+            n = row[-1]
+            if n:
+                out[i] = np.searchsorted(row, [(n - 1) // 2, n // 2], side='right').sum() / 20
+        return out
+
+    def curves(self, ranges, level=DEFAULT_LEVEL, min_size=10):
+        """``{label: SurvivalCurve}`` per launch-year range with at least ``min_size`` funds."""
+        times, at_risk, deaths, removed = self.counts(ranges)
+        sizes, events = removed.sum(axis=0), deaths.sum(axis=0)
+        median_life = self.median_life(ranges)
+        curves = {}
+        for i, (lo, hi) in enumerate(ranges):
+            if sizes[i] < min_size:
+                continue
+            t, surv, lower, upper, cumhaz = _band_curve(times, at_risk[:, i], deaths[:, i], removed[:, i], level)
+            curves[range_label(lo, hi)] = SurvivalCurve(t, surv, sizes[i], events[i], lower, upper, cumhaz,
+                                                        median_life[i])
+        return curves
+
+    def tests(self, ranges, min_size=10):
+        """Log-rank tests across the ranges (``'cohorts'``) and per pair (``'pair'``).
+
+        Only ranges with at least ``min_size`` funds take part. The tests
+        assume disjoint ranges; they mean little for overlapping rolling windows.
+        """
+        _, at_risk, deaths, removed = self.counts(ranges)
+        present = [i for i in range(len(ranges)) if removed[:, i].sum() >= min_size]
+        rows = []
+        if len(present) > 1:
+            rows.append(('cohorts', '', '', *logrank(at_risk[:, present], deaths[:, present])))
+            for j, a in enumerate(present):
+                for b in present[j + 1:]:
+                    rows.append(('pair', range_label(*ranges[a]), range_label(*ranges[b]),
+                                 *logrank(at_risk[:, [a, b]], deaths[:, [a, b]])))
+        return pd.DataFrame(rows, columns=['test', 'group_a', 'group_b', 'chi2', 'df', 'p_value'])
+
+
+def km_from_table(table):
+    """``{filter: {curve: SurvivalCurve}}`` from a :func:`survival_tables` km table."""
+    curves = {}
+    for (filter_type, label), grp in table.groupby(['filter', 'curve'], sort=False, observed=True):
+        first = grp.iloc[0]
+        curves.setdefault(filter_type, {})[label] = SurvivalCurve(
+            grp['time'].to_numpy(), grp['survival'].to_numpy(), first['n'], first['events'],
+            grp['lower'].to_numpy(), grp['upper'].to_numpy(), grp['cumhaz'].to_numpy(),
+            first['median_life'])
+    return curves
@@ -0,0 +1,240 @@
+"""Synthetic CNMV-like bulletin events for scaling tests and benchmarks.
+
+:func:`fit_profile` measures the bundled history: status mix, launches per
+year, the share of launches later liquidated and their lifetime
+distribution, liquidations of funds registered before the archive starts,
+repeated BAJAS, Zipf-like Gestora/Depositaria size distributions, how
+concentrated each Gestora is on one Depositaria, and the share of
+structured fund names. :func:`generate_events` draws an event stream of any
+size with that profile, in the raw CSV schema (``file, page, status,
+Nombre, Gestora, Depositaria, N_Registro``), over the same weekly bulletin
+calendar. Bigger streams mean denser bulletins; entity counts grow with the
+square root of the number of funds, as a market does.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .ingest import DATA_FILE, load_events
+from .lifecycle import STRUCTURED_PATTERN, YEAR_PATTERN
+
+NEW = 'NUEVAS_INSCRIPCIONES'
+DEAD = 'BAJAS'
+
+# Share of Gestora mentions spelled with the alternate legal suffix order,
+# so entity resolution has variants to merge
+NAME_VARIANT_RATE = 0.05
+
+_ORDINARY_TERMS = ['RENTA FIJA', 'RENTA VARIABLE', 'BOLSA', 'MONETARIO', 'MIXTO',
+                   'GLOBAL', 'EUROPA', 'DINERO', 'SELECCION', 'CRECIMIENTO', 'DIVIDENDO']
+_STRUCTURED_TERMS = ['GARANTIZADO', 'HORIZONTE', 'PLAZO FIJO', 'PROTECCION', 'VENCIMIENTO',
+                     'PLAN RENTAS', 'BUY & HOLD']
+_SERIES = ['', ' I', ' II', ' III', ' IV', ' V']
+
+
+def _zipf_alpha(counts):
+    """Exponent of a rank-size power law fitted to ``counts`` (log-log least squares)."""
+    counts = np.sort(np.asarray(counts, dtype=float))[::-1]
+    counts = counts[counts > 0]
+    if len(counts) < 2:
+        return 1.0
+    slope = np.polyfit(np.log(np.arange(1, len(counts) + 1)), np.log(counts), 1)[0]
+    return float(-slope)
+
+
+def fit_profile(events):
+    """Generator parameters measured on a parsed event frame (see :func:`generate_events`)."""
+    missing_registro = float(events['N_Registro'].isna().mean())
+    events = events[events['N_Registro'].notna()]
+    births = events[events['status'] == NEW]
+    deaths = events[events['status'] == DEAD]
+    first_birth = births.groupby('N_Registro')['date'].min()
+    first_death = deaths.groupby('N_Registro')['date'].min()
+
+    born_dead = first_death.index.intersection(first_birth.index)
+    life = (first_death[born_dead] - first_birth[born_dead]).dt.days
+    life = life[life >= 0]
+    legacy = first_death.index.difference(first_birth.index)
+
+    start = events['date_start'].min()
+    end = events['date'].max()
+    years = np.arange(start.year, end.year + 1)
+
+    def year_counts(dates):
+        return dates.dt.year.value_counts().reindex(years, fill_value=0).to_numpy(dtype=float)
+
+    def year_weights(dates):
+        counts = year_counts(dates)
+        return (counts / counts.sum()).tolist()
+
+    launched = year_counts(first_birth)
+    died = year_counts(first_birth[born_dead])
+
+    primary = births.groupby('Gestora')['Depositaria'].agg(
+        lambda s: s.value_counts(normalize=True).iloc[0] if s.notna().any() else 1.0)
+    names = births.drop_duplicates('N_Registro')['Nombre']
+    structured = (names.str.contains(STRUCTURED_PATTERN, case=False, na=False, regex=True) |
+                  names.str.contains(YEAR_PATTERN, na=False, regex=True))
+    pages = events['page'].dropna().astype(int).value_counts(normalize=True).sort_index()
+
+    return {
+        'start': start.strftime('%Y-%m-%d'),
+        'end': end.strftime('%Y-%m-%d'),
+        'years': years.tolist(),
+        'births': int(len(first_birth)),
+        'birth_year_weights': year_weights(first_birth),
+        'death_share_by_year': np.divide(died, launched, out=np.zeros_like(died),
+                                         where=launched > 0).tolist(),
+        'lifetime_quantiles': np.quantile(life, np.linspace(0, 1, 101)).tolist(),
+        'legacy_ratio': len(legacy) / len(first_birth),
+        'legacy_year_weights': year_weights(first_death[legacy]),
+        'repeat_baja_rate': (len(deaths) - len(first_death)) / len(first_death),
+        'gestoras': int(births['Gestora'].nunique()),
+        'depositarias': int(births['Depositaria'].nunique()),
+        'gestora_alpha': _zipf_alpha(births['Gestora'].value_counts()),
+        'depositaria_alpha': _zipf_alpha(births['Depositaria'].value_counts()),
+        'primary_share': float(primary.mean()),
+        'structured_share': float(structured.mean()),
+        'pages': pages.index.tolist(),
+        'page_weights': pages.to_numpy().tolist(),
+        'missing_registro_rate': missing_registro,
+    }
+
+
+def _letters(i):
+    """0 → 'A', 25 → 'Z', 26 → 'BA', ... (digit-free brand names)."""
+    out = ''
+    while True:
+        i, r = divmod(i, 26)
+        out = chr(65 + r) + out
+        if not i:
+            return out
+
+
+def _zipf_choice(rng, n_items, alpha, size):
+    weights = np.arange(1, n_items + 1, dtype=float) ** -alpha
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def _cover(rng, draws, n_items):
+    """Make every item appear at least once (observed entities have ≥ 1 fund)."""
+    if len(draws) >= n_items:
+        draws[rng.choice(len(draws), n_items, replace=False)] = np.arange(n_items)
+    return draws
+
+
+def _bulletin_files(start, n_weeks):
+    first = start + pd.to_timedelta(np.arange(n_weeks) * 7, unit='D')
+    last = first + pd.Timedelta(days=6)
+    return ('Boletin_completo_' + first.strftime('%d-%m-%Y') + '_al_'
+            + last.strftime('%d-%m-%Y') + '.pdf').to_numpy(dtype=object)
+
+
+def _day_in_year(rng, years, weights, size, start, n_days):
+    """Days since ``start`` whose calendar year follows ``weights``."""
+    jan1 = np.array([(pd.Timestamp(year=int(y), month=1, day=1) - start).days for y in years])
+    jan1 = jan1[rng.choice(len(years), size=size, p=weights)]
+    return np.clip(jan1 + rng.integers(0, 365, size=size), 0, n_days - 1)
+
+
+def _fund_names(rng, brand, structured, birth_year):
+    terms = np.where(structured,
+                     np.array(_STRUCTURED_TERMS, dtype=object)[rng.integers(0, len(_STRUCTURED_TERMS), len(brand))],
+                     np.array(_ORDINARY_TERMS, dtype=object)[rng.integers(0, len(_ORDINARY_TERMS), len(brand))])
+    series = np.array(_SERIES, dtype=object)[rng.integers(0, len(_SERIES), len(brand))]
+    maturity = (birth_year + rng.integers(1, 7, len(brand))).astype(str)
+    names = pd.Series(brand, dtype=object) + ' ' + pd.Series(terms, dtype=object)
+    dated = structured & (rng.random(len(brand)) < 0.5)
+    names[dated] = names[dated] + ' ' + pd.Series(maturity, dtype=object)[dated]
+    return (names + pd.Series(series, dtype=object) + ', FI').to_numpy(dtype=object)
+
+
+def generate_events(n_events, seed=0, profile=None):
+    """About ``n_events`` synthetic bulletin events following ``profile``.
+
+    ``profile`` defaults to :func:`fit_profile` of the bundled CSV. The result
+    is sorted by bulletin and page like the scraped file, and is
+    deterministic for a given ``seed``.
+    """
+    p = profile if profile is not None else fit_profile(load_events(DATA_FILE))
+    rng = np.random.default_rng(seed)
+
+    death_share = np.dot(p['death_share_by_year'], p['birth_year_weights'])
+    deaths_per_birth = death_share + p['legacy_ratio']
+    per_birth = 1 + deaths_per_birth * (1 + p['repeat_baja_rate'])
+    n_births = max(1, round(n_events / per_birth))
+    n_legacy = round(n_births * p['legacy_ratio'])
+    growth = np.sqrt(n_births / p['births'])
+    n_gestoras = max(1, round(p['gestoras'] * growth))
+    n_depositarias = max(1, round(p['depositarias'] * growth))
+
+    start = pd.Timestamp(p['start'])
+    n_days = (pd.Timestamp(p['end']) - start).days + 1
+    n_weeks = (n_days + 6) // 7
+    files = _bulletin_files(start, n_weeks)
+    years = np.asarray(p['years'])
+
+    # ── Launches: registry numbers grow with time, after the legacy funds ──
+    birth_day = np.sort(_day_in_year(rng, years, p['birth_year_weights'], n_births, start, n_days))
+    registro = n_legacy + 1 + np.arange(n_births)
+    gestora = _cover(rng, _zipf_choice(rng, n_gestoras, p['gestora_alpha'], n_births), n_gestoras)
+    primary = _zipf_choice(rng, n_depositarias, p['depositaria_alpha'], n_gestoras)
+    other = _zipf_choice(rng, n_depositarias, p['depositaria_alpha'], n_births)
+    depositaria = _cover(rng, np.where(rng.random(n_births) < p['primary_share'], primary[gestora], other),
+                         n_depositarias)
+    structured = rng.random(n_births) < p['structured_share']
+
+    brands = np.array([_letters(i) for i in range(max(n_gestoras, 1))], dtype=object)
+    birth_year = (start + pd.to_timedelta(birth_day, unit='D')).year.to_numpy()
+    names = _fund_names(rng, brands[gestora], structured, birth_year)
+
+    g_names = np.array([f'GESTORA {i + 1:04d}, S.G.I.I.C., S.A.' for i in range(n_gestoras)], dtype=object)
+    g_variants = np.array([f'GESTORA {i + 1:04d}, S.A., SGIIC' for i in range(n_gestoras)], dtype=object)
+    d_names = np.array([f'BANCO DEPOSITARIO {i + 1:04d}, S.A.' for i in range(n_depositarias)], dtype=object)
+    gestora_text = np.where(rng.random(n_births) < NAME_VARIANT_RATE, g_variants[gestora], g_names[gestora])
+
+    # ── Liquidations of launched funds, and of funds older than the archive ──
+    # Cohort mortality as observed by the archive end, so lifetimes are drawn
+    # from the observed distribution truncated to the time each fund has left
+    quantiles = np.asarray(p['lifetime_quantiles'])
+    pct = np.linspace(0, 100, len(quantiles))
+    share = np.asarray(p['death_share_by_year'])[birth_year - years[0]]
+    dead_idx = np.flatnonzero(rng.random(n_births) < share)
+    reach = np.interp(n_days - 1 - birth_day[dead_idx], quantiles, pct)
+    life = np.interp(rng.random(len(dead_idx)) * reach, pct, quantiles)
+    death_day = birth_day[dead_idx] + life.astype(int)
+
+    legacy_day = _day_in_year(rng, years, p['legacy_year_weights'], n_legacy, start, n_days)
+    legacy_names = _fund_names(rng, brands[_zipf_choice(rng, n_gestoras, p['gestora_alpha'], n_legacy)],
+                               rng.random(n_legacy) < p['structured_share'],
+                               start.year - rng.integers(1, 15, n_legacy))
+
+    baja_day = np.concatenate([death_day, legacy_day])
+    baja_registro = np.concatenate([registro[dead_idx], np.arange(1, n_legacy + 1)])
+    baja_names = np.concatenate([names[dead_idx], legacy_names])
+    repeat = rng.random(len(baja_day)) < p['repeat_baja_rate']
+    baja_day = np.concatenate([baja_day, np.minimum(baja_day[repeat] + 7 * rng.integers(1, 13, repeat.sum()),
+                                                    n_days - 1)])
+    baja_registro = np.concatenate([baja_registro, baja_registro[repeat]])
+    baja_names = np.concatenate([baja_names, baja_names[repeat]])
+
+    n_bajas = len(baja_day)
+    week = np.concatenate([birth_day // 7, baja_day // 7])
+    out = pd.DataFrame({
+        'week': week,
+        'page': rng.choice(p['pages'], size=len(week), p=p['page_weights']),
+        'status': np.concatenate([np.full(n_births, NEW, dtype=object), np.full(n_bajas, DEAD, dtype=object)]),
+        'Nombre': np.concatenate([names, baja_names]),
+        'Gestora': np.concatenate([gestora_text, np.full(n_bajas, None, dtype=object)]),
+        'Depositaria': np.concatenate([d_names[depositaria], np.full(n_bajas, None, dtype=object)]),
+        'N_Registro': pd.array(np.concatenate([registro, baja_registro]), dtype='Int64'),
+    })
+    out.loc[rng.random(len(out)) < p['missing_registro_rate'], 'N_Registro'] = pd.NA
+    out = out.sort_values(['week', 'page'], kind='stable', ignore_index=True)
+    out.insert(0, 'file', files[out.pop('week').to_numpy()])
+    return out
+
+
+def write_events_csv(events, path):
+    """Write ``events`` in the scraped CSV layout (UTF-8 with BOM)."""
+    events.to_csv(path, index=False, encoding='utf-8-sig')
@@ -1,17 +1,26 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.colors import sample_colorscale, unlabel_rgb
 from plotly.subplots import make_subplots
-import networkx as nx
-import numpy as np
-import re
-from collections import Counter
-from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from cnmv.artifacts import load_artifacts, load_bootstrap
+from cnmv.asof import AsOfIndex
+from cnmv.bias import survivorship_bias
+from cnmv.concentration import concentration_series
+from cnmv.crises import CRISES, event_study
+from cnmv.cube import EventCube
+from cnmv.ingest import DATA_FILE
+from cnmv.lifecycle import node_sizes
+from cnmv.network3d import graph_view, render_3d_html
+from cnmv.rates import rolling_rates
+from cnmv.shared import load_shared
+from cnmv.stock import FundStock
+from cnmv.survival import (LaunchYearIndex, binned_hazard, cohort_edges, cohort_ranges, entity_survival,
+                           km_from_table, launch_cohorts, range_label, rolling_ranges, smoothed_hazard)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────────────────────────────────────
@@ -220,966 +229,84 @@ st.markdown(f"""
 # DATA LOADING — Fixed CSV parsing
 # ─────────────────────────────────────────────────────────────────────────────
 
-@st.cache_data(show_spinner=False)
-def load_data():
-    """Parse the CNMV CSV with its tricky quoting format."""
-    with open('cnmv_funds_data_FINAL.csv', 'r', encoding='utf-8-sig') as f:
-        lines = f.readlines()
-
-    header = lines[0].strip()
-    cleaned = [header]
-    for line in lines[1:]:
-        line = line.strip()
-        if line.startswith('"') and line.endswith('"'):
-            line = line[1:-1]
-            line = line.replace('""', '"')
-        cleaned.append(line)
-
-    import io
-    df = pd.read_csv(io.StringIO('\n'.join(cleaned)))
-
-    # Extract end date from bulletin filename
-    def _extract_date(filename):
-        m = re.search(r'(\d{2})-(\d{2})-(\d{4})_al_(\d{2})-(\d{2})-(\d{4})', str(filename))
-        if m:
-            return pd.to_datetime(f"{m.group(6)}-{m.group(5)}-{m.group(4)}")
-        m = re.search(r'(\d{2})-(\d{2})-(\d{4})', str(filename))
-        if m:
-            return pd.to_datetime(f"{m.group(3)}-{m.group(2)}-{m.group(1)}")
-        return None
-
-    df['date'] = df['file'].apply(_extract_date)
-    df = df.dropna(subset=['date'])
-    df['year'] = df['date'].dt.year
-    df = df.drop_duplicates(subset=['N_Registro', 'status', 'date'])
-
-    return df
-
-
-@st.cache_data(show_spinner=False)
-def build_lifecycle(_df):
-    """Build fund lifecycle table from raw events."""
-    births = _df[_df['status'] == 'NUEVAS_INSCRIPCIONES']
-    deaths = _df[_df['status'] == 'BAJAS']
-
-    unique = births[births['N_Registro'].notna()].groupby('N_Registro').agg(
-        Nombre=('Nombre', 'first'),
-        Fecha_Alta=('date', 'min'),
-        Gestora=('Gestora', 'first'),
-        Depositaria=('Depositaria', 'first'),
-    ).reset_index()
-
-    death_dates = deaths[deaths['N_Registro'].notna()].groupby('N_Registro')['date'].min().reset_index()
-    death_dates.columns = ['N_Registro', 'Fecha_Baja']
-
-    lc = unique.merge(death_dates, on='N_Registro', how='left')
-    lc['Vida_Anos'] = ((lc['Fecha_Baja'] - lc['Fecha_Alta']).dt.days / 365.25).round(1)
-
-    # Clean: remove negative lives and >50yr outliers
-    lc = lc[(lc['Vida_Anos'].isna()) | ((lc['Vida_Anos'] >= 0) & (lc['Vida_Anos'] <= 50))]
-
-    lc['Activo'] = lc['Fecha_Baja'].isna()
-    lc['Año_Alta'] = lc['Fecha_Alta'].dt.year
-    lc['Año_Baja'] = lc['Fecha_Baja'].dt.year
-
-    # Classify structured / "born to die" funds
-    STRUCTURED_PATTERN = r'(?:GARANTIZAD|GARANTI[AZ]|OBJETIVO\s*\d|PLAN\s*RENTAS|PLAZO|VENCIMIENTO|MESES|BUY\s*&?\s*HOLD|HORIZONTE|PROTEC|TARGET|AHORRO\s*AÑO|CAPITAL\s*GARANTIZADO)'
-    YEAR_PATTERN = r'20[0-3]\d|199\d'
-    lc['Estructurado'] = (
-        lc['Nombre'].str.contains(STRUCTURED_PATTERN, case=False, na=False, regex=True) |
-        lc['Nombre'].str.contains(YEAR_PATTERN, na=False, regex=True)
-    )
-
-    return lc
-
-
-@st.cache_data(show_spinner=False)
-def build_network_data(_df):
-    """Build Gestora–Depositaria network from fund relationships."""
-    valid = _df[_df['Gestora'].notna() & _df['Depositaria'].notna()].copy()
+@st.cache_resource(show_spinner=False)
+def load_dataset():
+    """Events, lifecycle and network tables, shared read-only across sessions (no per-session copy)."""
+    return load_shared(DATA_FILE)
 
-    # Shorten names for display
-    def _short(name, max_len=35):
-        name = str(name)
-        # Remove common suffixes
-        for suffix in [', S.G.I.I.C., S.A.', ', S.A., SGIIC', ', S.A., S.G.I.I.C.', 
-                       ', SGIIC, S.A.', ', SGIIC', ', S.A.', ', S.A']:
-            name = name.replace(suffix, '')
-        return name[:max_len] + '…' if len(name) > max_len else name
 
-    # Edge data: each unique fund is one edge
-    edges = valid.drop_duplicates(subset=['N_Registro']).groupby(
-        ['Gestora', 'Depositaria']
-    ).agg(
-        weight=('N_Registro', 'count'),
-        funds=('Nombre', lambda x: list(x)[:5])
-    ).reset_index()
+@st.cache_resource(show_spinner=False)
+def load_index():
+    """Date index over the shared tables for point-in-time views."""
+    return AsOfIndex(*load_dataset())
 
-    edges['Gestora_short'] = edges['Gestora'].apply(_short)
-    edges['Depositaria_short'] = edges['Depositaria'].apply(_short)
 
-    # Node sizes
-    gestora_sizes = edges.groupby('Gestora_short')['weight'].sum().to_dict()
-    depositaria_sizes = edges.groupby('Depositaria_short')['weight'].sum().to_dict()
-
-    return edges, gestora_sizes, depositaria_sizes
-
-
-_THREE_JS_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="es">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>CNMV Fund Network · 3D</title>
-<style>
-  * { margin: 0; padding: 0; box-sizing: border-box; }
-  body {
-    background: #0a0a0a;
-    overflow: hidden;
-    font-family: 'SF Mono', 'Fira Code', 'Consolas', monospace;
-    color: #e8e4df;
-  }
-  canvas { display: block; }
-
-  /* Vignette fade to app background */
-  #vignette {
-    position: fixed;
-    inset: 0;
-    pointer-events: none;
-    z-index: 5;
-    background:
-      radial-gradient(ellipse at center, transparent 40%, rgba(10,10,10,0.4) 75%, #0a0a0a 100%);
-  }
-  #edge-fade-top {
-    position: fixed;
-    top: 0; left: 0; right: 0;
-    height: 80px;
-    background: linear-gradient(to bottom, #0a0a0a, transparent);
-    pointer-events: none;
-    z-index: 6;
-  }
-  #edge-fade-bottom {
-    position: fixed;
-    bottom: 0; left: 0; right: 0;
-    height: 80px;
-    background: linear-gradient(to top, #0a0a0a, transparent);
-    pointer-events: none;
-    z-index: 6;
-  }
-
-  /* Tooltip */
-  #tooltip {
-    position: fixed;
-    pointer-events: none;
-    background: rgba(10,10,10,0.92);
-    border: 1px solid rgba(255,255,255,0.06);
-    border-radius: 10px;
-    padding: 14px 18px;
-    font-size: 12px;
-    line-height: 1.6;
-    max-width: 320px;
-    opacity: 0;
-    transition: opacity 0.2s ease;
-    backdrop-filter: blur(16px);
-    z-index: 100;
-    box-shadow: 0 12px 40px rgba(0,0,0,0.6);
-  }
-  #tooltip.visible { opacity: 1; }
-  #tooltip .tt-name {
-    font-size: 14px;
-    font-weight: 600;
-    margin-bottom: 4px;
-    letter-spacing: 0.5px;
-  }
-  #tooltip .tt-type {
-    font-size: 10px;
-    text-transform: uppercase;
-    letter-spacing: 2px;
-    margin-bottom: 8px;
-    opacity: 0.5;
-  }
-  #tooltip .tt-stat {
-    font-size: 11px;
-    opacity: 0.65;
-  }
-  .gestora-color { color: #e2a44e; }
-  .depositaria-color { color: #6ec4a7; }
-
-  /* Legend — bottom left, ultra subtle */
-  #legend {
-    position: fixed;
-    bottom: 20px;
-    left: 24px;
-    z-index: 50;
-    display: flex;
-    gap: 18px;
-    font-size: 10px;
-    letter-spacing: 0.5px;
-  }
-  .legend-item {
-    display: flex;
-    align-items: center;
-    gap: 6px;
-    opacity: 0.3;
-    transition: opacity 0.3s;
-  }
-  .legend-item:hover { opacity: 0.6; }
-  .legend-dot {
-    width: 6px;
-    height: 6px;
-    border-radius: 50%;
-  }
-  .legend-dot.gestora { background: #e2a44e; box-shadow: 0 0 8px rgba(226,164,78,0.4); }
-  .legend-dot.depositaria { background: #6ec4a7; box-shadow: 0 0 8px rgba(110,196,167,0.4); }
-
-  /* Stats — top right, barely visible */
-  #stats {
-    position: fixed;
-    top: 16px;
-    right: 20px;
-    z-index: 50;
-    text-align: right;
-    font-size: 9px;
-    letter-spacing: 1.5px;
-    text-transform: uppercase;
-    color: rgba(255,255,255,0.12);
-    line-height: 2.2;
-  }
-  #stats span { color: rgba(255,255,255,0.3); font-weight: 600; }
-
-  /* Controls hint — bottom right, fades out */
-  #controls-hint {
-    position: fixed;
-    bottom: 20px;
-    right: 20px;
-    z-index: 50;
-    font-size: 9px;
-    letter-spacing: 0.5px;
-    color: rgba(255,255,255,0.1);
-    text-align: right;
-    line-height: 2;
-    animation: fadeHint 6s ease forwards;
-  }
-  @keyframes fadeHint {
-    0%, 60% { opacity: 1; }
-    100% { opacity: 0; }
-  }
-</style>
-</head>
-<body>
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_as_of(as_of):
+    """Events, lifecycle and network tables as they stood on ``as_of``."""
+    return load_index().tables(as_of)
 
-<div id="vignette"></div>
-<div id="edge-fade-top"></div>
-<div id="edge-fade-bottom"></div>
 
-<div id="tooltip">
-  <div class="tt-name"></div>
-  <div class="tt-type"></div>
-  <div class="tt-stat"></div>
-</div>
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_precomputed(as_of):
+    """KM curves, tests and Cox fit, HHI series, event cube and network graph (precomputed by `python -m cnmv build`)."""
+    artifacts = load_artifacts(DATA_FILE, as_of=as_of)
+    curves = km_from_table(artifacts['km'])
+    return (curves, artifacts['logrank'], artifacts['cox'], artifacts['hhi'], EventCube(artifacts['cube']),
+            artifacts['graph'])
 
-<div id="stats">
-  Nodos <span id="stat-nodes">0</span><br>
-  Vínculos <span id="stat-edges">0</span><br>
-  Fondos <span id="stat-funds">0</span>
-</div>
 
-<div id="legend">
-  <div style="display: flex; align-items: center; gap: 8px; opacity: 0.4;">
-    <span style="font-size: 9px; color: rgba(255,255,255,0.5);">MORTALIDAD</span>
-    <div style="display: flex; align-items: center; gap: 3px;">
-      <span style="font-size: 8px; color: #5fa87a;">0%</span>
-      <div style="width: 80px; height: 4px; border-radius: 2px; background: linear-gradient(to right, #5ca87a, #e2a44e, #cc3333);"></div>
-      <span style="font-size: 8px; color: #cc3333;">100%</span>
-    </div>
-  </div>
-  <div class="legend-item" style="margin-left: 12px;"><div class="legend-dot gestora" style="background: rgba(255,255,255,0.4); box-shadow: none; width: 5px; height: 5px;"></div><span style="font-size: 9px;">Gestora</span></div>
-  <div class="legend-item"><div class="legend-dot depositaria" style="background: rgba(255,255,255,0.4); box-shadow: none; width: 7px; height: 7px;"></div><span style="font-size: 9px;">Depositaria</span></div>
-</div>
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_intervals(filter_type, as_of):
+    """Bootstrap intervals for the cohort tables, indexed by (group, statistic)."""
+    return load_bootstrap(filter_type, DATA_FILE, as_of=as_of).set_index(['group', 'statistic'])
 
-<div id="controls-hint">
-  Arrastrar para rotar<br>
-  Scroll para zoom<br>
-  Click en nodo para fijar
-</div>
 
-<script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-<script>
-// ═══════════════════════════════════════════════════════════════════════
-// DATA
-// ═══════════════════════════════════════════════════════════════════════
-
-const GRAPH_DATA = __GRAPH_DATA_PLACEHOLDER__;
-
-// ═══════════════════════════════════════════════════════════════════════
-// SETUP
-// ═══════════════════════════════════════════════════════════════════════
-
-const W = window.innerWidth, H = window.innerHeight;
-
-const scene = new THREE.Scene();
-scene.fog = new THREE.FogExp2(0x0a0a0a, 0.0010);
-
-const camera = new THREE.PerspectiveCamera(60, W / H, 1, 10000);
-camera.position.set(0, 0, 500);
-
-const renderer = new THREE.WebGLRenderer({ antialias: true, alpha: false });
-renderer.setClearColor(0x0a0a0a, 1);
-renderer.setSize(W, H);
-renderer.setPixelRatio(Math.min(window.devicePixelRatio, 2));
-renderer.toneMapping = THREE.ACESFilmicToneMapping;
-renderer.toneMappingExposure = 1.2;
-document.body.appendChild(renderer.domElement);
-
-// ═══════════════════════════════════════════════════════════════════════
-// GLOW TEXTURE GENERATOR
-// ═══════════════════════════════════════════════════════════════════════
-
-function createGlowTexture(color, size) {
-  const c = document.createElement('canvas');
-  c.width = c.height = size;
-  const ctx = c.getContext('2d');
-  const g = ctx.createRadialGradient(size/2, size/2, 0, size/2, size/2, size/2);
-  g.addColorStop(0.0, color);
-  g.addColorStop(0.15, color);
-  g.addColorStop(0.4, color.replace('1)', '0.3)'));
-  g.addColorStop(0.7, color.replace('1)', '0.06)'));
-  g.addColorStop(1.0, 'rgba(0,0,0,0)');
-  ctx.fillStyle = g;
-  ctx.fillRect(0, 0, size, size);
-  const tex = new THREE.CanvasTexture(c);
-  tex.needsUpdate = true;
-  return tex;
-}
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_cohort_index(filter_type, as_of):
+    """Per-launch-year cumulative KM counts; any re-binning of cohorts slices these."""
+    return LaunchYearIndex(load_as_of(as_of)[1], filter_type, as_of)
 
-// Mortality color gradient: green (alive) → amber (mid) → red (dead)
-function mortalityColor(mortality) {
-  const t = Math.max(0, Math.min(1, mortality / 100));
-  let r, g, b;
-  if (t < 0.4) {
-    // Green to amber
-    const s = t / 0.4;
-    r = 0.35 + s * 0.55;  // 0.35 → 0.90
-    g = 0.65 - s * 0.15;  // 0.65 → 0.50
-    b = 0.45 - s * 0.30;  // 0.45 → 0.15
-  } else {
-    // Amber to deep red
-    const s = (t - 0.4) / 0.6;
-    r = 0.90 - s * 0.10;  // 0.90 → 0.80
-    g = 0.50 - s * 0.35;  // 0.50 → 0.15
-    b = 0.15 + s * 0.05;  // 0.15 → 0.20
-  }
-  return { r, g, b };
-}
 
-function mortalityColorCSS(mortality) {
-  const { r, g, b } = mortalityColor(mortality);
-  return `rgba(${Math.round(r*255)},${Math.round(g*255)},${Math.round(b*255)},1)`;
-}
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_concentration(as_of, by, freq):
+    """HHI, top-3 share and active entities of the as-of lifecycle, by ``by`` at ``freq``."""
+    return concentration_series(load_as_of(as_of)[1], list(by), freq, as_of)
 
-// Pre-generate glow textures for a few mortality levels
-const glowTexCache = {};
-function getGlowTex(mortality) {
-  const bucket = Math.round(mortality / 10) * 10;
-  if (!glowTexCache[bucket]) {
-    glowTexCache[bucket] = createGlowTexture(mortalityColorCSS(bucket), 128);
-  }
-  return glowTexCache[bucket];
-}
-
-const glowTexWhite = createGlowTexture('rgba(255,255,255,1)', 64);
-
-// ═══════════════════════════════════════════════════════════════════════
-// BUILD GRAPH
-// ═══════════════════════════════════════════════════════════════════════
-
-const nodes = GRAPH_DATA.nodes;
-const edges = GRAPH_DATA.edges;
-
-// Create node map
-const nodeMap = {};
-nodes.forEach((n, i) => {
-  nodeMap[n.id] = i;
-  // Random initial position in sphere
-  const phi = Math.random() * Math.PI * 2;
-  const theta = Math.acos(2 * Math.random() - 1);
-  const r = 150 + Math.random() * 200;
-  n.x = r * Math.sin(theta) * Math.cos(phi);
-  n.y = r * Math.sin(theta) * Math.sin(phi);
-  n.z = r * Math.cos(theta);
-  n.vx = 0; n.vy = 0; n.vz = 0;
-  n.connections = 0;
-});
-
-// Count connections
-edges.forEach(e => {
-  const si = nodeMap[e.source];
-  const ti = nodeMap[e.target];
-  if (si !== undefined) nodes[si].connections += e.weight;
-  if (ti !== undefined) nodes[ti].connections += e.weight;
-});
-
-const maxWeight = Math.max(...nodes.map(n => n.weight));
-const totalFunds = edges.reduce((s, e) => s + e.weight, 0);
-
-// Update HUD
-document.getElementById('stat-nodes').textContent = nodes.length;
-document.getElementById('stat-edges').textContent = edges.length;
-document.getElementById('stat-funds').textContent = totalFunds;
-
-// ═══════════════════════════════════════════════════════════════════════
-// 3D FORCE SIMULATION
-// ═══════════════════════════════════════════════════════════════════════
-
-function simulate(iterations) {
-  const alpha = 0.3;
-  const repulsion = 8000;
-  const attraction = 0.0004;
-  const damping = 0.85;
-  const centerGravity = 0.002;
-
-  for (let iter = 0; iter < iterations; iter++) {
-    // Repulsion between all nodes
-    for (let i = 0; i < nodes.length; i++) {
-      for (let j = i + 1; j < nodes.length; j++) {
-        const dx = nodes[i].x - nodes[j].x;
-        const dy = nodes[i].y - nodes[j].y;
-        const dz = nodes[i].z - nodes[j].z;
-        let dist = Math.sqrt(dx*dx + dy*dy + dz*dz) + 1;
-        const force = repulsion / (dist * dist);
-        const fx = dx / dist * force;
-        const fy = dy / dist * force;
-        const fz = dz / dist * force;
-        nodes[i].vx += fx * alpha;
-        nodes[i].vy += fy * alpha;
-        nodes[i].vz += fz * alpha;
-        nodes[j].vx -= fx * alpha;
-        nodes[j].vy -= fy * alpha;
-        nodes[j].vz -= fz * alpha;
-      }
-    }
-
-    // Attraction along edges
-    edges.forEach(e => {
-      const si = nodeMap[e.source];
-      const ti = nodeMap[e.target];
-      if (si === undefined || ti === undefined) return;
-      const s = nodes[si], t = nodes[ti];
-      const dx = t.x - s.x;
-      const dy = t.y - s.y;
-      const dz = t.z - s.z;
-      const dist = Math.sqrt(dx*dx + dy*dy + dz*dz) + 1;
-      const force = dist * attraction * Math.sqrt(e.weight);
-      const fx = dx / dist * force;
-      const fy = dy / dist * force;
-      const fz = dz / dist * force;
-      s.vx += fx * alpha;
-      s.vy += fy * alpha;
-      s.vz += fz * alpha;
-      t.vx -= fx * alpha;
-      t.vy -= fy * alpha;
-      t.vz -= fz * alpha;
-    });
-
-    // Center gravity + apply velocities
-    for (let i = 0; i < nodes.length; i++) {
-      nodes[i].vx -= nodes[i].x * centerGravity;
-      nodes[i].vy -= nodes[i].y * centerGravity;
-      nodes[i].vz -= nodes[i].z * centerGravity;
-      nodes[i].vx *= damping;
-      nodes[i].vy *= damping;
-      nodes[i].vz *= damping;
-      nodes[i].x += nodes[i].vx;
-      nodes[i].y += nodes[i].vy;
-      nodes[i].z += nodes[i].vz;
-    }
-  }
-}
-
-// Run simulation
-simulate(300);
-
-// ═══════════════════════════════════════════════════════════════════════
-// CREATE 3D OBJECTS
-// ═══════════════════════════════════════════════════════════════════════
-
-const nodeGroup = new THREE.Group();
-const edgeGroup = new THREE.Group();
-const glowGroup = new THREE.Group();
-const particleGroup = new THREE.Group();
-
-scene.add(edgeGroup);
-scene.add(glowGroup);
-scene.add(nodeGroup);
-scene.add(particleGroup);
-
-// ── Edges with mortality coloring ──
-const edgeMeshes = [];
-edges.forEach(e => {
-  const si = nodeMap[e.source];
-  const ti = nodeMap[e.target];
-  if (si === undefined || ti === undefined) return;
-  const s = nodes[si], t = nodes[ti];
-
-  const points = [
-    new THREE.Vector3(s.x, s.y, s.z),
-    new THREE.Vector3(t.x, t.y, t.z)
-  ];
-  const geom = new THREE.BufferGeometry().setFromPoints(points);
-  const normW = e.weight / 120;
-  const opacity = 0.04 + normW * 0.25;
-
-  // Edge color by mortality of the relationship
-  const eMort = e.mortality !== undefined ? e.mortality : 50;
-  const { r, g, b } = mortalityColor(eMort);
-  const edgeColor = new THREE.Color(r * 0.6, g * 0.6, b * 0.6);
-
-  const mat = new THREE.LineBasicMaterial({
-    color: edgeColor,
-    transparent: true,
-    opacity: opacity,
-    blending: THREE.AdditiveBlending,
-    depthWrite: false
-  });
-  const line = new THREE.Line(geom, mat);
-  line.userData = { sourceIdx: si, targetIdx: ti, weight: e.weight, baseOpacity: opacity, mortality: eMort };
-  edgeGroup.add(line);
-  edgeMeshes.push(line);
-});
-
-// ── Nodes colored by mortality ──
-const nodeMeshes = [];
-
-nodes.forEach((n, i) => {
-  const isGestora = n.type === 'gestora';
-  const radius = isGestora
-    ? 1.5 + (n.weight / maxWeight) * 5
-    : 2 + (n.weight / maxWeight) * 7;
-
-  const mort = n.mortality !== undefined ? n.mortality : 50;
-  const { r, g, b } = mortalityColor(mort);
-
-  const geom = new THREE.SphereGeometry(radius, 24, 24);
-  const color = new THREE.Color(r, g, b);
-  const mat = new THREE.MeshBasicMaterial({
-    color: color,
-    transparent: true,
-    opacity: 0.9,
-  });
-  const mesh = new THREE.Mesh(geom, mat);
-  mesh.position.set(n.x, n.y, n.z);
-  mesh.userData = { nodeIndex: i, baseRadius: radius };
-  nodeGroup.add(mesh);
-  nodeMeshes.push(mesh);
-
-  // ── Glow sprite — colored by mortality ──
-  const glowSize = radius * (isGestora ? 10 : 12);
-  const spriteMat = new THREE.SpriteMaterial({
-    map: getGlowTex(mort),
-    transparent: true,
-    opacity: 0.12 + (n.weight / maxWeight) * 0.30,
-    blending: THREE.AdditiveBlending,
-    depthWrite: false,
-  });
-  const sprite = new THREE.Sprite(spriteMat);
-  sprite.position.set(n.x, n.y, n.z);
-  sprite.scale.set(glowSize, glowSize, 1);
-  sprite.userData = { nodeIndex: i };
-  glowGroup.add(sprite);
-});
-
-// ── Flowing particles along edges ──
-const NUM_PARTICLES = 600;
-const particlePositions = new Float32Array(NUM_PARTICLES * 3);
-const particleColors = new Float32Array(NUM_PARTICLES * 3);
-const particleSpeeds = new Float32Array(NUM_PARTICLES);
-const particleEdgeMap = new Uint16Array(NUM_PARTICLES);
-const particleProgress = new Float32Array(NUM_PARTICLES);
-
-const validEdges = edges.filter(e => nodeMap[e.source] !== undefined && nodeMap[e.target] !== undefined);
-
-for (let i = 0; i < NUM_PARTICLES; i++) {
-  const edgeIdx = Math.floor(Math.random() * validEdges.length);
-  particleEdgeMap[i] = edgeIdx;
-  particleProgress[i] = Math.random();
-  particleSpeeds[i] = 0.0008 + Math.random() * 0.003;
-
-  const e = validEdges[edgeIdx];
-  const s = nodes[nodeMap[e.source]];
-  const t = nodes[nodeMap[e.target]];
-  const p = particleProgress[i];
-  particlePositions[i*3]   = s.x + (t.x - s.x) * p;
-  particlePositions[i*3+1] = s.y + (t.y - s.y) * p;
-  particlePositions[i*3+2] = s.z + (t.z - s.z) * p;
-
-  // Color based on edge mortality
-  const eMort = e.mortality !== undefined ? e.mortality : 50;
-  const pColor = mortalityColor(eMort);
-  particleColors[i*3]   = pColor.r;
-  particleColors[i*3+1] = pColor.g;
-  particleColors[i*3+2] = pColor.b;
-}
-
-const particleGeom = new THREE.BufferGeometry();
-particleGeom.setAttribute('position', new THREE.BufferAttribute(particlePositions, 3));
-particleGeom.setAttribute('color', new THREE.BufferAttribute(particleColors, 3));
-
-const particleMat = new THREE.PointsMaterial({
-  size: 2.2,
-  map: glowTexWhite,
-  transparent: true,
-  opacity: 0.7,
-  blending: THREE.AdditiveBlending,
-  depthWrite: false,
-  vertexColors: true,
-  sizeAttenuation: true,
-});
-
-const particleMesh = new THREE.Points(particleGeom, particleMat);
-particleGroup.add(particleMesh);
-
-// ── Background stars ──
-const starCount = 2000;
-const starGeom = new THREE.BufferGeometry();
-const starPos = new Float32Array(starCount * 3);
-for (let i = 0; i < starCount; i++) {
-  starPos[i*3]   = (Math.random() - 0.5) * 4000;
-  starPos[i*3+1] = (Math.random() - 0.5) * 4000;
-  starPos[i*3+2] = (Math.random() - 0.5) * 4000;
-}
-starGeom.setAttribute('position', new THREE.BufferAttribute(starPos, 3));
-const starMat = new THREE.PointsMaterial({
-  size: 0.6,
-  color: 0x333333,
-  transparent: true,
-  opacity: 0.3,
-  blending: THREE.AdditiveBlending,
-  depthWrite: false,
-  sizeAttenuation: true,
-});
-scene.add(new THREE.Points(starGeom, starMat));
-
-// ═══════════════════════════════════════════════════════════════════════
-// CAMERA CONTROLS (manual orbit)
-// ═══════════════════════════════════════════════════════════════════════
-
-let cameraTheta = 0, cameraPhi = Math.PI / 2, cameraRadius = 500;
-let targetTheta = 0, targetPhi = Math.PI / 2, targetRadius = 500;
-let isDragging = false, lastMouseX = 0, lastMouseY = 0;
-let autoRotate = true;
-let focusedNode = null;
-
-function updateCamera() {
-  cameraTheta += (targetTheta - cameraTheta) * 0.08;
-  cameraPhi += (targetPhi - cameraPhi) * 0.08;
-  cameraRadius += (targetRadius - cameraRadius) * 0.08;
-
-  cameraPhi = Math.max(0.1, Math.min(Math.PI - 0.1, cameraPhi));
-  cameraRadius = Math.max(100, Math.min(1500, cameraRadius));
-
-  camera.position.x = cameraRadius * Math.sin(cameraPhi) * Math.cos(cameraTheta);
-  camera.position.y = cameraRadius * Math.cos(cameraPhi);
-  camera.position.z = cameraRadius * Math.sin(cameraPhi) * Math.sin(cameraTheta);
-  camera.lookAt(0, 0, 0);
-}
-
-renderer.domElement.addEventListener('mousedown', e => {
-  isDragging = true;
-  lastMouseX = e.clientX;
-  lastMouseY = e.clientY;
-  autoRotate = false;
-});
-
-renderer.domElement.addEventListener('mousemove', e => {
-  if (isDragging) {
-    const dx = e.clientX - lastMouseX;
-    const dy = e.clientY - lastMouseY;
-    targetTheta -= dx * 0.005;
-    targetPhi -= dy * 0.005;
-    lastMouseX = e.clientX;
-    lastMouseY = e.clientY;
-  }
-});
-
-renderer.domElement.addEventListener('mouseup', () => {
-  isDragging = false;
-  setTimeout(() => { autoRotate = true; }, 3000);
-});
-
-renderer.domElement.addEventListener('wheel', e => {
-  targetRadius += e.deltaY * 0.5;
-  e.preventDefault();
-}, { passive: false });
-
-// Touch support
-renderer.domElement.addEventListener('touchstart', e => {
-  if (e.touches.length === 1) {
-    isDragging = true;
-    lastMouseX = e.touches[0].clientX;
-    lastMouseY = e.touches[0].clientY;
-    autoRotate = false;
-  }
-}, { passive: true });
-
-renderer.domElement.addEventListener('touchmove', e => {
-  if (isDragging && e.touches.length === 1) {
-    const dx = e.touches[0].clientX - lastMouseX;
-    const dy = e.touches[0].clientY - lastMouseY;
-    targetTheta -= dx * 0.005;
-    targetPhi -= dy * 0.005;
-    lastMouseX = e.touches[0].clientX;
-    lastMouseY = e.touches[0].clientY;
-  }
-}, { passive: true });
-
-renderer.domElement.addEventListener('touchend', () => {
-  isDragging = false;
-  setTimeout(() => { autoRotate = true; }, 3000);
-});
-
-// ═══════════════════════════════════════════════════════════════════════
-// RAYCASTING / HOVER
-// ═══════════════════════════════════════════════════════════════════════
-
-const raycaster = new THREE.Raycaster();
-raycaster.params.Points = { threshold: 5 };
-const mouse = new THREE.Vector2();
-let hoveredNode = null;
-const tooltip = document.getElementById('tooltip');
-
-renderer.domElement.addEventListener('mousemove', e => {
-  mouse.x = (e.clientX / W) * 2 - 1;
-  mouse.y = -(e.clientY / H) * 2 + 1;
-
-  raycaster.setFromCamera(mouse, camera);
-  const intersects = raycaster.intersectObjects(nodeMeshes);
-
-  if (intersects.length > 0) {
-    const mesh = intersects[0].object;
-    const idx = mesh.userData.nodeIndex;
-    const n = nodes[idx];
-
-    if (hoveredNode !== idx) {
-      hoveredNode = idx;
-      highlightNode(idx);
-    }
-
-    // Tooltip
-    const tt = tooltip;
-    tt.querySelector('.tt-name').textContent = n.id;
-    tt.querySelector('.tt-name').style.color = mortalityColorCSS(n.mortality || 50);
-    tt.querySelector('.tt-type').textContent = n.type === 'gestora' ? '● Gestora' : '◆ Depositaria';
-
-    const mort = n.mortality !== undefined ? n.mortality : 0;
-    const total = n.total || n.weight;
-    const dead = n.dead || 0;
-    const alive = n.alive || 0;
-    const medVida = n.med_vida || 0;
-
-    let mortBar = '';
-    const barW = 100;
-    const deadW = Math.round(mort);
-    mortBar = `<div style="margin: 6px 0 4px; height: 4px; background: rgba(255,255,255,0.06); border-radius: 2px; overflow: hidden; width: ${barW}px;"><div style="height: 100%; width: ${deadW}%; background: ${mortalityColorCSS(mort)}; border-radius: 2px;"></div></div>`;
-
-    tt.querySelector('.tt-stat').innerHTML =
-      `<b style="font-size: 18px; color: ${mortalityColorCSS(mort)}">${mort.toFixed(0)}%</b> <span style="opacity: 0.5;">mortalidad</span>${mortBar}` +
-      `<span style="opacity: 0.5;">${total} fondos</span> · <span style="color: #5fa87a;">${alive} vivos</span> · <span style="color: #c75d5d;">${dead} liquidados</span>` +
-      (medVida > 0 ? `<br><span style="opacity: 0.5;">Vida mediana:</span> ${medVida.toFixed(1)} años` : '');
-    tt.classList.add('visible');
-
-    const offsetX = e.clientX + 20;
-    const offsetY = e.clientY - 10;
-    tt.style.left = Math.min(offsetX, W - 340) + 'px';
-    tt.style.top = Math.min(offsetY, H - 100) + 'px';
-
-    document.body.style.cursor = 'pointer';
-  } else {
-    if (hoveredNode !== null) {
-      unhighlightAll();
-      hoveredNode = null;
-    }
-    tooltip.classList.remove('visible');
-    document.body.style.cursor = 'default';
-  }
-});
-
-renderer.domElement.addEventListener('click', e => {
-  raycaster.setFromCamera(mouse, camera);
-  const intersects = raycaster.intersectObjects(nodeMeshes);
-  if (intersects.length > 0) {
-    const idx = intersects[0].object.userData.nodeIndex;
-    focusOnNode(idx);
-  }
-});
-
-function highlightNode(idx) {
-  // Dim everything
-  nodeMeshes.forEach((m, i) => {
-    if (i === idx) {
-      m.material.opacity = 1;
-      m.scale.setScalar(1.4);
-    } else {
-      m.material.opacity = 0.12;
-      m.scale.setScalar(1);
-    }
-  });
-
-  glowGroup.children.forEach((s, i) => {
-    if (i === idx) {
-      s.material.opacity = 0.8;
-    } else {
-      s.material.opacity = 0.02;
-    }
-  });
-
-  // Highlight connected edges and nodes
-  const connectedNodes = new Set();
-  edgeMeshes.forEach(line => {
-    const { sourceIdx, targetIdx, baseOpacity } = line.userData;
-    if (sourceIdx === idx || targetIdx === idx) {
-      line.material.opacity = Math.min(baseOpacity * 6, 0.8);
-      connectedNodes.add(sourceIdx === idx ? targetIdx : sourceIdx);
-    } else {
-      line.material.opacity = 0.01;
-    }
-  });
-
-  // Bring back connected nodes
-  connectedNodes.forEach(ci => {
-    nodeMeshes[ci].material.opacity = 0.7;
-    nodeMeshes[ci].scale.setScalar(1.1);
-    if (glowGroup.children[ci]) {
-      glowGroup.children[ci].material.opacity = 0.3;
-    }
-  });
-}
 
-function unhighlightAll() {
-  nodeMeshes.forEach((m, i) => {
-    m.material.opacity = 0.9;
-    m.scale.setScalar(1);
-  });
-  glowGroup.children.forEach((s, i) => {
-    const n = nodes[i];
-    if (n) {
-      s.material.opacity = 0.15 + (n.weight / maxWeight) * 0.35;
-    }
-  });
-  edgeMeshes.forEach(line => {
-    line.material.opacity = line.userData.baseOpacity;
-  });
-}
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_stock(as_of, by='Gestora'):
+    """Live funds per day and entity (int32 matrix) of the as-of lifecycle; ``by`` is a column or a tuple."""
+    return FundStock(load_as_of(as_of)[1], list(by) if isinstance(by, tuple) else by, as_of)
 
-function focusOnNode(idx) {
-  const n = nodes[idx];
-  // Move camera to look at this node from nearby
-  const dist = 200;
-  const dx = n.x, dy = n.y, dz = n.z;
-  const r = Math.sqrt(dx*dx + dy*dy + dz*dz);
-  if (r > 1) {
-    targetTheta = Math.atan2(dz, dx);
-    targetPhi = Math.acos(dy / r);
-    targetRadius = r + dist;
-  }
-}
 
-// ═══════════════════════════════════════════════════════════════════════
-// ANIMATION LOOP
-// ═══════════════════════════════════════════════════════════════════════
-
-let time = 0;
-
-function animate() {
-  requestAnimationFrame(animate);
-  time += 0.016;
-
-  // Auto rotation
-  if (autoRotate) {
-    targetTheta += 0.0008;
-  }
-
-  updateCamera();
-
-  // Animate particles
-  const posArr = particleGeom.attributes.position.array;
-  for (let i = 0; i < NUM_PARTICLES; i++) {
-    particleProgress[i] += particleSpeeds[i];
-    if (particleProgress[i] > 1) {
-      particleProgress[i] = 0;
-      // Optionally reassign to different edge
-      if (Math.random() < 0.3) {
-        particleEdgeMap[i] = Math.floor(Math.random() * validEdges.length);
-      }
-    }
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_bias(as_of, by=None):
+    """Monthly survivorship bias of the as-of lifecycle: overall, by 'Gestora' or by 'Cohorte'."""
+    lc = load_as_of(as_of)[1]
+    return survivorship_bias(lc, launch_cohorts(lc) if by == 'Cohorte' else by, as_of)
 
-    const e = validEdges[particleEdgeMap[i]];
-    const s = nodes[nodeMap[e.source]];
-    const t = nodes[nodeMap[e.target]];
-    const p = particleProgress[i];
-
-    // Smooth step for nicer flow
-    const sp = p * p * (3 - 2 * p);
-    posArr[i*3]   = s.x + (t.x - s.x) * sp;
-    posArr[i*3+1] = s.y + (t.y - s.y) * sp;
-    posArr[i*3+2] = s.z + (t.z - s.z) * sp;
-  }
-  particleGeom.attributes.position.needsUpdate = true;
-
-  // Gentle node pulse
-  nodeMeshes.forEach((m, i) => {
-    if (hoveredNode === null) {
-      const pulse = 1 + Math.sin(time * 1.5 + i * 0.5) * 0.03;
-      m.scale.setScalar(pulse);
-    }
-  });
-
-  // Gentle glow pulse
-  glowGroup.children.forEach((s, i) => {
-    if (hoveredNode === null && nodes[i]) {
-      const base = 0.15 + (nodes[i].weight / maxWeight) * 0.35;
-      const pulse = base + Math.sin(time * 1.2 + i * 0.3) * 0.04;
-      s.material.opacity = pulse;
-    }
-  });
 
-  renderer.render(scene, camera);
-}
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_rates(as_of, windows, by=None):
+    """Monthly launches, deaths and fund-months at risk of the as-of lifecycle, with rolling rates per window."""
+    return rolling_rates(load_as_of(as_of)[1], windows, by, as_of)
 
-animate();
 
-// ═══════════════════════════════════════════════════════════════════════
-// RESIZE
-// ═══════════════════════════════════════════════════════════════════════
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_event_study(as_of, windows, by=None):
+    """Births, deaths, hazard and survival before, during and after each ``(label, start, end)`` window."""
+    return event_study(load_as_of(as_of)[1], windows, list(by) if isinstance(by, tuple) else by, as_of)
 
-window.addEventListener('resize', () => {
-  const w = window.innerWidth, h = window.innerHeight;
-  camera.aspect = w / h;
-  camera.updateProjectionMatrix();
-  renderer.setSize(w, h);
-});
-</script>
-</body>
-</html>
 
-"""
 
 # ─────────────────────────────────────────────────────────────────────────────
 # LOAD
 # ─────────────────────────────────────────────────────────────────────────────
 
 with st.spinner('Cargando datos CNMV…'):
-    df = load_data()
-    lifecycle = build_lifecycle(df)
-    net_edges, gestora_sizes, depositaria_sizes = build_network_data(df)
-
-births_df = df[df['status'] == 'NUEVAS_INSCRIPCIONES']
-deaths_df = df[df['status'] == 'BAJAS']
-total_births = len(births_df)
-total_deaths = len(deaths_df)
-active_count = lifecycle['Activo'].sum()
-mortality_pct = total_deaths / total_births * 100 if total_births > 0 else 0
-date_range_str = f"{df['date'].min().strftime('%b %Y')} — {df['date'].max().strftime('%b %Y')}"
+    all_dates = load_dataset()[0]['date']
+date_range_str = f"{all_dates.min().strftime('%b %Y')} — {all_dates.max().strftime('%b %Y')}"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1195,6 +322,35 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# Point-in-time view: every tab below reads the tables as of this date. The last option is the last
+# event in the CSV, not today: nothing after it is observed, so rates and censoring stop there
+last_event = load_index().last.normalize()
+as_of_options = list(pd.date_range(all_dates.min(), last_event, freq='ME'))
+as_of_options += [] if last_event in as_of_options else [last_event]
+as_of = st.select_slider(
+    "Ver el observatorio a fecha", options=as_of_options, value=last_event,
+    format_func=lambda d: 'Último dato' if d == last_event else d.strftime('%b %Y'),
+    help="Reconstruye fondos, liquidaciones y censura tal como estaban en esa fecha: "
+         "así se veía un ranking de solo supervivientes entonces"
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# POINT-IN-TIME TABLES
+# ─────────────────────────────────────────────────────────────────────────────
+
+with st.spinner('Cargando datos CNMV…'):
+    df, lifecycle, net_edges = load_as_of(as_of)
+    gestora_sizes, depositaria_sizes = node_sizes(net_edges)
+    km_all, logrank_df, cox_df, hhi_df, event_cube, graph_3d = load_precomputed(as_of)
+
+births_df = df[df['status'] == 'NUEVAS_INSCRIPCIONES']
+deaths_df = df[df['status'] == 'BAJAS']
+total_births = len(births_df)
+total_deaths = len(deaths_df)
+active_count = lifecycle['Activo'].sum()
+mortality_pct = total_deaths / total_births * 100 if total_births > 0 else 0
+
 # Hero metrics row
 c1, c2, c3, c4, c5 = st.columns(5)
 with c1:
@@ -1202,7 +358,8 @@ with c1:
 with c2:
     st.metric("Liquidados", f"{total_deaths:,}", f"{mortality_pct:.0f}% mortalidad")
 with c3:
-    st.metric("Activos hoy", f"{active_count:,}", f"{active_count/total_births*100:.0f}% supervivencia")
+    st.metric("Activos" if as_of == last_event else f"Activos {as_of:%m/%Y}", f"{active_count:,}",
+              f"{active_count/total_births*100:.0f}% supervivencia")
 with c4:
     med_life = lifecycle[lifecycle['Vida_Anos'].notna()]['Vida_Anos'].median()
     st.metric("Vida mediana", f"{med_life:.1f} años", "fondos liquidados")
@@ -1244,81 +401,17 @@ with tab_network:
             min_w_3d = st.slider("Mín. fondos", 1, 30, 2, key='3d_min',
                                   help="Filtra vínculos débiles")
 
-        @st.cache_data
-        def build_3d_html(_edges_df, _lifecycle_df, min_weight):
-            import json
-
-            # Compute mortality per gestora and depositaria
-            g_mort = _lifecycle_df.groupby('Gestora').agg(
-                total=('N_Registro', 'count'),
-                dead=('Activo', lambda x: (~x).sum()),
-                alive=('Activo', 'sum'),
-                med_vida=('Vida_Anos', lambda x: x.dropna().median())
-            ).reset_index()
-            g_mort['mortality'] = (g_mort['dead'] / g_mort['total'] * 100).round(1)
-            g_mort_map = dict(zip(g_mort['Gestora'], g_mort.to_dict('records')))
-
-            d_mort = _lifecycle_df.groupby('Depositaria').agg(
-                total=('N_Registro', 'count'),
-                dead=('Activo', lambda x: (~x).sum()),
-                alive=('Activo', 'sum'),
-                med_vida=('Vida_Anos', lambda x: x.dropna().median())
-            ).reset_index()
-            d_mort['mortality'] = (d_mort['dead'] / d_mort['total'] * 100).round(1)
-            d_mort_map = dict(zip(d_mort['Depositaria'], d_mort.to_dict('records')))
-
-            # Mortality per edge pair
-            e_mort = _lifecycle_df.groupby(['Gestora', 'Depositaria']).agg(
-                e_total=('N_Registro', 'count'),
-                e_dead=('Activo', lambda x: (~x).sum()),
-            ).reset_index()
-            e_mort['e_mortality'] = (e_mort['e_dead'] / e_mort['e_total'] * 100).round(1)
-            e_mort_map = {(r['Gestora'], r['Depositaria']): r['e_mortality'] for _, r in e_mort.iterrows()}
-
-            filt = _edges_df[_edges_df['weight'] >= min_weight]
-            nodes_dict = {}
-            for _, r in filt.iterrows():
-                g = r['Gestora_short']
-                d = r['Depositaria_short']
-                if g not in nodes_dict:
-                    gdata = g_mort_map.get(r['Gestora'], {})
-                    nodes_dict[g] = {
-                        'id': g, 'type': 'gestora', 'weight': 0,
-                        'mortality': float(gdata.get('mortality', 50)),
-                        'total': int(gdata.get('total', 0)),
-                        'dead': int(gdata.get('dead', 0)),
-                        'alive': int(gdata.get('alive', 0)),
-                        'med_vida': round(float(gdata.get('med_vida', 0) or 0), 1),
-                    }
-                if d not in nodes_dict:
-                    ddata = d_mort_map.get(r['Depositaria'], {})
-                    nodes_dict[d] = {
-                        'id': d, 'type': 'depositaria', 'weight': 0,
-                        'mortality': float(ddata.get('mortality', 50)),
-                        'total': int(ddata.get('total', 0)),
-                        'dead': int(ddata.get('dead', 0)),
-                        'alive': int(ddata.get('alive', 0)),
-                        'med_vida': round(float(ddata.get('med_vida', 0) or 0), 1),
-                    }
-                nodes_dict[g]['weight'] += r['weight']
-                nodes_dict[d]['weight'] += r['weight']
-
-            node_list = list(nodes_dict.values())
-            edge_list = [{'source': r['Gestora_short'], 'target': r['Depositaria_short'],
-                          'weight': int(r['weight']),
-                          'mortality': round(float(e_mort_map.get((r['Gestora'], r['Depositaria']), 50)), 1)}
-                         for _, r in filt.iterrows()]
-
-            data_json = json.dumps({'nodes': node_list, 'edges': edge_list})
-
-            html = _THREE_JS_TEMPLATE.replace('__GRAPH_DATA_PLACEHOLDER__', data_json)
-            return html, len(node_list), len(edge_list)
-
-        html_3d, n_nodes, n_edges = build_3d_html(net_edges, lifecycle, min_w_3d)
+        import streamlit.components.v1 as components
+
+        view_3d = graph_view(graph_3d, min_w_3d)
+        html_3d = render_3d_html(view_3d)
         components.html(html_3d, height=800, scrolling=False)
 
     else:
         # ── 2D PLOTLY VIEW ──
+        # networkx is only needed here; importing it lazily keeps it off the startup path
+        import networkx as nx
+
         # Controls
         with nc1:
             min_edge_weight = st.slider("Mín. fondos por vínculo", 1, 30, 3,
@@ -1343,7 +436,7 @@ with tab_network:
         if len(G.nodes()) > 0:
             # Layout
             if layout_algo == 'spring':
-                pos = nx.spring_layout(G, k=2.5/np.sqrt(len(G.nodes())), iterations=80,
+                pos = nx.spring_layout(G, k=2.5/len(G.nodes())**0.5, iterations=80,
                                        weight='weight', seed=42)
             else:
                 pos = nx.kamada_kawai_layout(G, weight='weight')
@@ -1534,118 +627,91 @@ with tab_survival:
             <span style="color: {COLORS['accent2']};">●</span> {n_estr:,} estructurados ({n_estr/len(lifecycle)*100:.0f}%)
         </div>
         """, unsafe_allow_html=True)
-
-    # ── Kaplan-Meier computation ──
-    @st.cache_data
-    def compute_km_curves(_lifecycle, filter_type='all'):
-        """Compute Kaplan-Meier survival curves by 5-year cohort."""
-        now = pd.Timestamp.now()
-        lc = _lifecycle.copy()
-        lc['duration'] = np.where(
-            lc['Fecha_Baja'].notna(),
-            (lc['Fecha_Baja'] - lc['Fecha_Alta']).dt.days / 365.25,
-            (now - lc['Fecha_Alta']).dt.days / 365.25
-        )
-        lc['event'] = lc['Fecha_Baja'].notna().astype(int)
-        lc['duration'] = lc['duration'].clip(lower=0)
-
-        if filter_type == 'normal':
-            lc = lc[~lc['Estructurado']]
-        elif filter_type == 'structured':
-            lc = lc[lc['Estructurado']]
-
-        bins = [2003, 2008, 2013, 2018, 2025]
-        labels = ['2004–2008', '2009–2013', '2014–2018', '2019–2025']
-        lc['cohort'] = pd.cut(lc['Año_Alta'], bins=bins, labels=labels, right=True)
-
-        curves = {}
-        for cohort in labels:
-            subset = lc[lc['cohort'] == cohort].copy()
-            if len(subset) < 10:
-                continue
-
-            times = sorted(subset['duration'].unique())
-            n_at_risk = len(subset)
-            survival = 1.0
-            curve_t = [0]
-            curve_s = [1.0]
-
-            for t in times:
-                events_at_t = len(subset[(subset['duration'] == t) & (subset['event'] == 1)])
-                censored_at_t = len(subset[(subset['duration'] == t) & (subset['event'] == 0)])
-
-                if n_at_risk > 0 and events_at_t > 0:
-                    survival *= (1 - events_at_t / n_at_risk)
-
-                curve_t.append(t)
-                curve_s.append(survival)
-                n_at_risk -= (events_at_t + censored_at_t)
-
-            curves[cohort] = (curve_t, curve_s, len(subset))
-
-        return curves
-
-    @st.cache_data
-    def compute_km_global(_lifecycle, filter_type):
-        """Compute single global KM curve for a subset."""
-        now = pd.Timestamp.now()
-        lc = _lifecycle.copy()
-        lc['duration'] = np.where(
-            lc['Fecha_Baja'].notna(),
-            (lc['Fecha_Baja'] - lc['Fecha_Alta']).dt.days / 365.25,
-            (now - lc['Fecha_Alta']).dt.days / 365.25
-        )
-        lc['event'] = lc['Fecha_Baja'].notna().astype(int)
-        lc['duration'] = lc['duration'].clip(lower=0)
-
-        if filter_type == 'normal':
-            lc = lc[~lc['Estructurado']]
-        elif filter_type == 'structured':
-            lc = lc[lc['Estructurado']]
-
-        times = sorted(lc['duration'].unique())
-        n_at_risk = len(lc)
-        survival = 1.0
-        curve_t = [0]
-        curve_s = [1.0]
-
-        for t in times:
-            events_at_t = len(lc[(lc['duration'] == t) & (lc['event'] == 1)])
-            censored_at_t = len(lc[(lc['duration'] == t) & (lc['event'] == 0)])
-            if n_at_risk > 0 and events_at_t > 0:
-                survival *= (1 - events_at_t / n_at_risk)
-            curve_t.append(t)
-            curve_s.append(survival)
-            n_at_risk -= (events_at_t + censored_at_t)
-
-        return curve_t, curve_s, len(lc)
-
-    cohort_colors = {
-        '2004–2008': COLORS['accent2'],
-        '2009–2013': COLORS['accent'],
-        '2014–2018': COLORS['blue'],
-        '2019–2025': COLORS['accent3'],
-    }
+    with surv_c3:
+        first_year, last_year = int(lifecycle['Año_Alta'].min()), int(lifecycle['Año_Alta'].max())
+        default_edges = cohort_edges(first_year, last_year)
+        cohort_mode = st.radio("Cohortes", ['Quinquenios', 'Cortes personalizados', 'Ventanas móviles'],
+                               horizontal=True, help="Re-agrupar las cohortes por año de lanzamiento")
+        cohort_ranges_sel = None
+        if cohort_mode == 'Cortes personalizados':
+            edges_text = st.text_input("Años de corte", ', '.join(str(e) for e in default_edges),
+                                       help="Cada cohorte va del año siguiente a un corte hasta el corte siguiente, "
+                                            "ambos incluidos: 2008, 2013 → 2009–2013")
+            try:
+                edges = sorted({int(e) for e in edges_text.replace(';', ',').split(',') if e.strip()})
+            except ValueError:
+                edges = []
+            if len(edges) < 2:
+                st.warning("Indica al menos dos años de corte; se muestran los quinquenios.")
+            else:
+                cohort_ranges_sel = cohort_ranges(edges)
+        elif cohort_mode == 'Ventanas móviles':
+            win_c1, win_c2 = st.columns(2)
+            with win_c1:
+                window = st.slider("Ancho (años)", 1, 10, 5)
+            with win_c2:
+                step = st.slider("Paso (años)", 1, 5, 1)
+            cohort_ranges_sel = rolling_ranges(first_year, last_year, window, step)
+
+    # ── Kaplan-Meier curves (precomputed) ──
+    def km_cohorts(filter_type):
+        """Per-cohort KM curves for a subset: precomputed quinquennia, or the chosen bins sliced from the index."""
+        if cohort_ranges_sel is None:
+            return {c: curve for c, curve in km_all[filter_type].items() if c != 'global'}
+        return load_cohort_index(filter_type, as_of).curves(cohort_ranges_sel)
+
+    def km_global(filter_type):
+        """Single global KM curve for a subset."""
+        return km_all[filter_type]['global']
+
+    def add_band(fig, curve, color):
+        """Shaded 95% Greenwood band behind a KM curve."""
+        times, lower, upper = curve.times, curve.lower, curve.upper
+        r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        fig.add_trace(go.Scatter(x=times, y=upper * 100, mode='lines', line=dict(width=0, shape='hv'),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=times, y=lower * 100, mode='lines', line=dict(width=0, shape='hv'),
+                                 fill='tonexty', fillcolor=f'rgba({r},{g},{b},0.12)',
+                                 showlegend=False, hoverinfo='skip'))
+
+    def fmt_p(p):
+        return '< 0.001' if p < 0.001 else f'{p:.3f}'
+
+    def fmt_ci(intervals, cohort, stat, scale=100):
+        """Bootstrap 95% interval of one cohort-table cell as 'lo–hi'."""
+        try:
+            lo, hi = intervals.loc[(cohort, stat), ['lower', 'upper']] * scale
+        except KeyError:
+            return None
+        return None if pd.isna(lo) else f'{lo:.1f}–{hi:.1f}'
+
+    def cohort_palette(labels):
+        """Colour per cohort label: the four house colours, or a Plasma ramp for more cohorts."""
+        if len(labels) <= 4:
+            return dict(zip(labels, [COLORS['accent2'], COLORS['accent'], COLORS['blue'], COLORS['accent3']]))
+        ramp = sample_colorscale('Plasma', [i / (len(labels) - 1) * 0.9 for i in range(len(labels))])
+        return {c: '#%02x%02x%02x' % tuple(int(v) for v in unlabel_rgb(rgb)) for c, rgb in zip(labels, ramp)}
 
     # ── COMPARE MODE ──
     if fund_filter == 'Comparar ambos':
 
         st.markdown("### Curvas globales: Normales vs Estructurados")
 
-        t_n, s_n, n_n = compute_km_global(lifecycle, 'normal')
-        t_s, s_s, n_s = compute_km_global(lifecycle, 'structured')
+        km_n, km_s = km_global('normal'), km_global('structured')
 
         fig_compare = go.Figure()
+        add_band(fig_compare, km_n, COLORS['accent'])
+        add_band(fig_compare, km_s, COLORS['accent2'])
 
         fig_compare.add_trace(go.Scatter(
-            x=t_n, y=[s * 100 for s in s_n],
-            mode='lines', name=f'Fondos normales (n={n_n})',
+            x=km_n.times, y=km_n.survival * 100,
+            mode='lines', name=f'Fondos normales (n={km_n.n})',
             line=dict(color=COLORS['accent'], width=2.5, shape='hv'),
             hovertemplate='<b>%{x:.1f} años</b><br>Sup: %{y:.1f}%<extra>Normales</extra>'
         ))
         fig_compare.add_trace(go.Scatter(
-            x=t_s, y=[s * 100 for s in s_s],
-            mode='lines', name=f'Estructurados (n={n_s})',
+            x=km_s.times, y=km_s.survival * 100,
+            mode='lines', name=f'Estructurados (n={km_s.n})',
             line=dict(color=COLORS['accent2'], width=2.5, shape='hv', dash='dot'),
             hovertemplate='<b>%{x:.1f} años</b><br>Sup: %{y:.1f}%<extra>Estructurados</extra>'
         ))
@@ -1674,17 +740,19 @@ with tab_survival:
         )
         st.plotly_chart(fig_compare, use_container_width=True)
 
-        # Delta metrics
-        def _surv_at(times, surv, yr):
-            for i in range(len(times)-1, -1, -1):
-                if times[i] <= yr:
-                    return surv[i] * 100
-            return 100.0
+        lr = logrank_df[logrank_df['test'] == 'structured'].iloc[0]
+        st.markdown(f"""
+        <p style="color: {COLORS['text_muted']}; font-size: 0.85rem; margin-top: -0.5rem;">
+            Bandas: IC 95% de Greenwood · Test log-rank normales vs estructurados:
+            χ² = {lr['chi2']:.1f}, p = {lr['p_value']:.2g}
+        </p>
+        """, unsafe_allow_html=True)
 
+        # Delta metrics
+        delta_years = [3, 5, 10, 15]
         dc1, dc2, dc3, dc4 = st.columns(4)
-        for col, yr in zip([dc1, dc2, dc3, dc4], [3, 5, 10, 15]):
-            sn = _surv_at(t_n, s_n, yr)
-            ss = _surv_at(t_s, s_s, yr)
+        for col, yr, sn, ss in zip([dc1, dc2, dc3, dc4], delta_years,
+                                   km_n.at(delta_years) * 100, km_s.at(delta_years) * 100):
             delta = sn - ss
             with col:
                 st.metric(f"Sup. {yr} años",
@@ -1697,70 +765,78 @@ with tab_survival:
         # ── Per-cohort comparison small multiples ──
         st.markdown("### Comparación por cohorte")
 
-        km_norm = compute_km_curves(lifecycle, 'normal')
-        km_estr = compute_km_curves(lifecycle, 'structured')
+        km_norm = km_cohorts('normal')
+        km_estr = km_cohorts('structured')
 
-        cohort_labels = ['2004–2008', '2009–2013', '2014–2018', '2019–2025']
-        fig_multi = make_subplots(rows=1, cols=4, shared_yaxes=True,
+        cohort_labels = [range_label(*r) for r in cohort_ranges_sel or cohort_ranges(default_edges)]
+        cohort_labels = [c for c in cohort_labels if c in km_norm or c in km_estr]
+        n_cols = max(1, min(4, len(cohort_labels)))
+        n_rows = max(1, -(-len(cohort_labels) // n_cols))
+        fig_multi = make_subplots(rows=n_rows, cols=n_cols, shared_yaxes=True,
                                   subplot_titles=[f"<b>{c}</b>" for c in cohort_labels],
-                                  horizontal_spacing=0.04)
+                                  horizontal_spacing=0.04, vertical_spacing=0.12 / n_rows)
 
         for idx, cohort in enumerate(cohort_labels):
-            col = idx + 1
+            row, col = idx // n_cols + 1, idx % n_cols + 1
             show_legend = (idx == 0)
 
             if cohort in km_norm:
-                t, s, n = km_norm[cohort]
+                curve = km_norm[cohort]
                 fig_multi.add_trace(go.Scatter(
-                    x=t, y=[v*100 for v in s],
+                    x=curve.times, y=curve.survival * 100,
                     mode='lines', name=f'Normales',
                     line=dict(color=COLORS['accent'], width=2, shape='hv'),
                     showlegend=show_legend,
-                    hovertemplate=f'<b>{cohort}</b><br>%{{x:.1f}} años: %{{y:.1f}}%<extra>Normales (n={n})</extra>'
-                ), row=1, col=col)
+                    hovertemplate=f'<b>{cohort}</b><br>%{{x:.1f}} años: %{{y:.1f}}%<extra>Normales (n={curve.n})</extra>'
+                ), row=row, col=col)
 
             if cohort in km_estr:
-                t, s, n = km_estr[cohort]
+                curve = km_estr[cohort]
                 fig_multi.add_trace(go.Scatter(
-                    x=t, y=[v*100 for v in s],
+                    x=curve.times, y=curve.survival * 100,
                     mode='lines', name=f'Estructurados',
                     line=dict(color=COLORS['accent2'], width=2, shape='hv', dash='dot'),
                     showlegend=show_legend,
-                    hovertemplate=f'<b>{cohort}</b><br>%{{x:.1f}} años: %{{y:.1f}}%<extra>Estructurados (n={n})</extra>'
-                ), row=1, col=col)
+                    hovertemplate=f'<b>{cohort}</b><br>%{{x:.1f}} años: %{{y:.1f}}%<extra>Estructurados (n={curve.n})</extra>'
+                ), row=row, col=col)
 
             fig_multi.add_hline(y=50, line_dash='dot', line_color='rgba(255,255,255,0.06)',
-                                row=1, col=col)
+                                row=row, col=col)
 
         fig_multi.update_layout(
             **PLOTLY_LAYOUT,
-            height=380,
+            height=80 + 300 * n_rows,
             legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
                         yanchor='top', y=1.15, xanchor='left', x=0.0, orientation='h'),
         )
-        for i in range(1, 5):
-            fig_multi.update_xaxes(range=[0, 21], tickvals=[0,5,10,15,20], tickfont=dict(size=9, color=COLORS['text_muted']),
-                                    gridcolor='rgba(255,255,255,0.03)', row=1, col=i)
+        fig_multi.update_xaxes(range=[0, 21], tickvals=[0,5,10,15,20], tickfont=dict(size=9, color=COLORS['text_muted']),
+                                gridcolor='rgba(255,255,255,0.03)')
         fig_multi.update_yaxes(range=[0, 105], gridcolor='rgba(255,255,255,0.03)',
-                                tickfont=dict(size=9, color=COLORS['text_muted']), row=1, col=1)
+                                tickfont=dict(size=9, color=COLORS['text_muted']), col=1)
 
         st.plotly_chart(fig_multi, use_container_width=True)
 
         # Comparison summary table
         st.markdown("### Resumen comparativo")
         comp_rows = []
+        with st.spinner('Calculando intervalos bootstrap…'):
+            comp_ci = {tipo: load_intervals(tipo, as_of) for tipo in ('normal', 'structured')}
         for cohort in cohort_labels:
             for label, km_data, tipo in [('Normal', km_norm, 'normal'), ('Estructurado', km_estr, 'structured')]:
                 if cohort not in km_data:
                     continue
-                t, s, n = km_data[cohort]
+                curve = km_data[cohort]
+                s5, s10, s15 = curve.at([5, 10, 15]) * 100
                 comp_rows.append({
                     'Cohorte': cohort,
                     'Tipo': label,
-                    'n': n,
-                    'Sup. 5 años %': round(_surv_at(t, s, 5), 1),
-                    'Sup. 10 años %': round(_surv_at(t, s, 10), 1),
-                    'Sup. 15 años %': round(_surv_at(t, s, 15), 1),
+                    'n': curve.n,
+                    'Sup. 5 años %': round(s5, 1),
+                    'IC 5 años': fmt_ci(comp_ci[tipo], cohort, 'surv_5'),
+                    'Sup. 10 años %': round(s10, 1),
+                    'IC 10 años': fmt_ci(comp_ci[tipo], cohort, 'surv_10'),
+                    'Sup. 15 años %': round(s15, 1),
+                    'IC 15 años': fmt_ci(comp_ci[tipo], cohort, 'surv_15'),
                 })
 
         st.dataframe(pd.DataFrame(comp_rows), use_container_width=True, hide_index=True,
@@ -1769,6 +845,7 @@ with tab_survival:
                          'Sup. 10 años %': st.column_config.ProgressColumn(format='%.1f%%', min_value=0, max_value=100),
                          'Sup. 15 años %': st.column_config.ProgressColumn(format='%.1f%%', min_value=0, max_value=100),
                      })
+        st.caption("IC: intervalo de confianza al 95% por bootstrap percentil (remuestreo de fondos dentro de cada cohorte).")
 
     else:
         # ── SINGLE VIEW MODE ──
@@ -1778,15 +855,18 @@ with tab_survival:
             'Solo estructurados': 'structured',
         }
         ftype = filter_map[fund_filter]
-        km_curves = compute_km_curves(lifecycle, ftype)
+        km_curves = km_cohorts(ftype)
+        cohort_colors = cohort_palette(list(km_curves))
 
         fig_km = go.Figure()
-        for cohort, (times, surv, n) in km_curves.items():
+        for cohort, curve in km_curves.items():
+            add_band(fig_km, curve, cohort_colors.get(cohort, '#888888'))
+        for cohort, curve in km_curves.items():
             color = cohort_colors.get(cohort, '#888')
             fig_km.add_trace(go.Scatter(
-                x=times, y=[s * 100 for s in surv],
+                x=curve.times, y=curve.survival * 100,
                 mode='lines',
-                name=f'{cohort} (n={n})',
+                name=f'{cohort} (n={curve.n})',
                 line=dict(color=color, width=2.5, shape='hv'),
                 hovertemplate='<b>%{x:.1f} años</b><br>Supervivencia: %{y:.1f}%<extra>' + cohort + '</extra>'
             ))
@@ -1821,47 +901,56 @@ with tab_survival:
         )
         st.plotly_chart(fig_km, use_container_width=True)
 
+        # Log-rank tests between cohorts (not defined for overlapping windows)
+        if cohort_ranges_sel is None:
+            tests = logrank_df[logrank_df['filter'] == ftype]
+        elif cohort_mode == 'Cortes personalizados':
+            tests = load_cohort_index(ftype, as_of).tests(cohort_ranges_sel)
+        else:
+            tests = logrank_df.iloc[:0]
+            st.caption("Bandas: IC 95% de Greenwood · Sin test log-rank: las ventanas móviles se solapan.")
+        overall = tests[tests['test'] == 'cohorts']
+        if len(overall):
+            lr = overall.iloc[0]
+            st.markdown(f"""
+            <p style="color: {COLORS['text_muted']}; font-size: 0.85rem; margin-top: -0.5rem;">
+                Bandas: IC 95% de Greenwood · Test log-rank entre cohortes:
+                χ² = {lr['chi2']:.1f} ({int(lr['df'])} g.l.), p = {lr['p_value']:.2g}
+            </p>
+            """, unsafe_allow_html=True)
+            pairs = tests[tests['test'] == 'pair']
+            with st.expander("Comparaciones log-rank por pares"):
+                st.dataframe(pd.DataFrame({
+                    'Cohorte A': pairs['group_a'],
+                    'Cohorte B': pairs['group_b'],
+                    'χ²': pairs['chi2'].round(2),
+                    'p-valor': pairs['p_value'].map(fmt_p),
+                    'Significativa (5%)': pairs['p_value'] < 0.05,
+                }), use_container_width=True, hide_index=True)
+
         # Cohort stats table
         st.markdown("### Tabla de cohortes")
 
         cohort_stats = []
-        now = pd.Timestamp.now()
-
-        # Get the right subset
-        if ftype == 'normal':
-            lc_sub = lifecycle[~lifecycle['Estructurado']]
-        elif ftype == 'structured':
-            lc_sub = lifecycle[lifecycle['Estructurado']]
-        else:
-            lc_sub = lifecycle
-
-        for cohort, (times, surv, n) in km_curves.items():
-            def surv_at(target_yr):
-                for i in range(len(times)-1, -1, -1):
-                    if times[i] <= target_yr:
-                        return surv[i] * 100
-                return 100.0
-
-            subset = lc_sub[
-                lc_sub['Año_Alta'].between(
-                    int(cohort.split('–')[0]),
-                    int(cohort.split('–')[1])
-                )
-            ]
-            active_n = subset['Activo'].sum()
-            dead_n = (~subset['Activo']).sum()
-            med_vida = subset[subset['Vida_Anos'].notna()]['Vida_Anos'].median()
+        with st.spinner('Calculando intervalos bootstrap…'):
+            cohort_ci = load_intervals(ftype, as_of)
 
+        for cohort, curve in km_curves.items():
+            s3, s5, s10 = curve.at([3, 5, 10]) * 100
             cohort_stats.append({
                 'Cohorte': cohort,
-                'Fondos': n,
-                'Activos': int(active_n),
-                'Liquidados': int(dead_n),
-                'Mortalidad %': round(dead_n / n * 100, 1) if n > 0 else 0,
-                'Sup. 3 años %': round(surv_at(3), 1),
-                'Sup. 5 años %': round(surv_at(5), 1),
-                'Sup. 10 años %': round(surv_at(10), 1),
-                'Vida mediana': round(med_vida, 1) if pd.notna(med_vida) else None,
+                'Fondos': curve.n,
+                'Activos': curve.active,
+                'Liquidados': curve.events,
+                'Mortalidad %': round(curve.mortality * 100, 1),
+                'Sup. 3 años %': round(s3, 1),
+                'IC 3 años': fmt_ci(cohort_ci, cohort, 'surv_3'),
+                'Sup. 5 años %': round(s5, 1),
+                'IC 5 años': fmt_ci(cohort_ci, cohort, 'surv_5'),
+                'Sup. 10 años %': round(s10, 1),
+                'IC 10 años': fmt_ci(cohort_ci, cohort, 'surv_10'),
+                'Vida mediana': round(curve.median_life, 1) if pd.notna(curve.median_life) else None,
+                'IC vida': fmt_ci(cohort_ci, cohort, 'median_life', scale=1),
             })
 
         st.dataframe(pd.DataFrame(cohort_stats), use_container_width=True, hide_index=True,
@@ -1871,6 +960,104 @@ with tab_survival:
                          'Sup. 5 años %': st.column_config.ProgressColumn(format='%.1f%%', min_value=0, max_value=100),
                          'Sup. 10 años %': st.column_config.ProgressColumn(format='%.1f%%', min_value=0, max_value=100),
                      })
+        st.caption("IC: intervalo de confianza al 95% por bootstrap percentil (remuestreo de fondos dentro de cada cohorte).")
+
+        with st.expander("Supervivencia año a año (%)"):
+            years = list(range(1, 21))
+            yearly = pd.DataFrame([curve.at(years) * 100 for curve in km_curves.values()],
+                                  index=pd.Index(list(km_curves), name='Cohorte'),
+                                  columns=[f'{y} a' for y in years])
+            st.dataframe(yearly.round(1), use_container_width=True)
+
+    # ── Hazard rates (yearly deaths ÷ fund-years from the cohort index; smoothed Nelson–Aalen) ──
+    st.markdown("---")
+    st.markdown("### ¿Cuándo mueren los fondos? Riesgo por año de vida")
+
+    if fund_filter == 'Comparar ambos':
+        hz_rates = [('Normales', 'normal', COLORS['accent']), ('Estructurados', 'structured', COLORS['accent2'])]
+        hz_cumulative = [(label, km_global(f), color) for label, f, color in hz_rates]
+    else:
+        hz_rates = [('Todos' if ftype == 'all' else fund_filter.replace('Solo ', '').capitalize(), ftype, COLORS['accent'])]
+        hz_cumulative = [(c, curve, cohort_colors[c]) for c, curve in km_curves.items()]
+
+    hz_c1, hz_c2 = st.columns(2)
+    with hz_c1:
+        fig_rate = go.Figure()
+        bar_w = 0.8 / len(hz_rates)
+        for i, (label, f, color) in enumerate(hz_rates):
+            index = load_cohort_index(f, as_of)
+            times, at_risk, deaths, _ = index.counts([(index.first, index.last)])
+            starts, rates = binned_hazard(times, at_risk[:, 0], deaths[:, 0], max_age=21)
+            grid, smooth = smoothed_hazard(km_all[f]['global'].times, km_all[f]['global'].cumhaz)
+            fig_rate.add_trace(go.Bar(
+                x=starts + 0.5, y=rates * 100, name=f'{label} · anual',
+                marker_color=color, opacity=0.45, width=bar_w, offset=-0.4 + bar_w * i,
+                customdata=[f'{a:.0f}–{a + 1:.0f}' for a in starts],
+                hovertemplate='<b>%{customdata} años</b><br>%{y:.1f} bajas por 100 fondos-año<extra>' + label + '</extra>'
+            ))
+            fig_rate.add_trace(go.Scatter(
+                x=grid, y=smooth * 100, mode='lines', name=f'{label} · suavizado',
+                line=dict(color=color, width=2),
+                hovertemplate='%{x:.1f} años: %{y:.1f}<extra>' + label + '</extra>'
+            ))
+        fig_rate.update_layout(
+            **PLOTLY_LAYOUT, height=400, barmode='overlay',
+            title=dict(text='<b>Tasa de mortalidad por edad</b>', font=dict(size=14, color=COLORS['text']), x=0),
+            xaxis=dict(title='Años desde registro', range=[0, 21],
+                       gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
+            yaxis=dict(title='Bajas por 100 fondos-año', gridcolor='rgba(255,255,255,0.04)',
+                       tickfont=dict(color=COLORS['text_muted'])),
+            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
+                        yanchor='top', y=0.98, xanchor='right', x=0.98),
+        )
+        st.plotly_chart(fig_rate, use_container_width=True)
+
+    with hz_c2:
+        fig_cumhaz = go.Figure()
+        for label, curve, color in hz_cumulative:
+            fig_cumhaz.add_trace(go.Scatter(
+                x=curve.times, y=curve.cumhaz, mode='lines', name=label,
+                line=dict(color=color, width=2, shape='hv'),
+                hovertemplate='<b>%{x:.1f} años</b><br>H(t) = %{y:.2f}<extra>' + label + '</extra>'
+            ))
+        fig_cumhaz.update_layout(
+            **PLOTLY_LAYOUT, height=400,
+            title=dict(text='<b>Riesgo acumulado (Nelson–Aalen)</b>', font=dict(size=14, color=COLORS['text']), x=0),
+            xaxis=dict(title='Años desde registro', range=[0, 21],
+                       gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
+            yaxis=dict(title='Riesgo acumulado H(t)', gridcolor='rgba(255,255,255,0.04)',
+                       tickfont=dict(color=COLORS['text_muted'])),
+            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
+                        yanchor='top', y=0.98, xanchor='left', x=0.02),
+        )
+        st.plotly_chart(fig_cumhaz, use_container_width=True)
+
+    st.caption("Barras: aumento del riesgo acumulado en cada año de vida (bajas por 100 fondos-año en riesgo). "
+               "Línea: tasa suavizada con núcleo de Epanechnikov de 1 año, sesgada a la baja cerca de 0.")
+
+    # ── Cox model (precomputed, all funds) ──
+    st.markdown("---")
+    st.markdown("### ¿Qué acelera la liquidación? Modelo de Cox")
+
+    cox_labels = {
+        'Estructurado': 'Estructurado (vs normal)',
+        'log_gestora_funds': 'Tamaño de la gestora al lanzamiento (log fondos vivos)',
+        'depositaria_share': 'Cuota de la depositaria al lanzamiento (por pp)',
+    }
+    # The reference is the first default cohort of the fit, whether or not its KM curve is shown
+    cox_cohorts = [range_label(*r) for r in cohort_ranges(cohort_edges(lifecycle['Año_Alta'].min(),
+                                                                       lifecycle['Año_Alta'].max()))]
+    cox_labels.update({f'Cohorte {c}': f'Cohorte {c} (vs {cox_cohorts[0]})' for c in cox_cohorts[1:]})
+    st.dataframe(pd.DataFrame({
+        'Variable': cox_df['covariate'].map(cox_labels).fillna(cox_df['covariate']),
+        'Hazard ratio': cox_df['hazard_ratio'].round(3),
+        'IC 95%': [f'{lo:.2f}–{hi:.2f}' for lo, hi in zip(cox_df['lower'], cox_df['upper'])],
+        'Coef.': cox_df['coef'].round(3),
+        'Error est.': cox_df['se'].round(3),
+        'p-valor': cox_df['p_value'].map(fmt_p),
+    }), use_container_width=True, hide_index=True)
+    st.caption("Riesgos proporcionales de Cox sobre todos los fondos, con empates de Efron. "
+               "Un hazard ratio > 1 indica mayor riesgo de liquidación en cualquier momento de la vida del fondo.")
 
     # ── Life distribution histogram (always shown) ──
     st.markdown("---")
@@ -1972,24 +1159,49 @@ with tab_temporal:
     </p>
     """, unsafe_allow_html=True)
 
-    tc1, tc2 = st.columns([1, 3])
+    tc1, tc2, tc3 = st.columns([1, 2, 1])
     with tc1:
-        granularity = st.selectbox("Granularidad", ['Anual', 'Trimestral', 'Mensual'], index=0)
-
-    # Aggregate
-    if granularity == 'Anual':
-        ts = df.groupby(['year', 'status']).size().unstack(fill_value=0)
-        ts.index = pd.to_datetime(ts.index.astype(str) + '-07-01')
-    elif granularity == 'Trimestral':
-        df_q = df.copy()
-        df_q['q'] = df_q['date'].dt.to_period('Q')
-        ts = df_q.groupby(['q', 'status']).size().unstack(fill_value=0)
-        ts.index = ts.index.to_timestamp()
+        granularity = st.selectbox("Granularidad", ['Anual', 'Trimestral', 'Mensual', 'Semanal'], index=0)
+    with tc2:
+        ts_gestora = st.selectbox("Filtrar gestora",
+                                  ['Todas'] + sorted(event_cube.cube['Gestora'].dropna().unique().tolist()))
+    with tc3:
+        ts_tipo = st.selectbox("Tipo", ['Todos', 'Normales', 'Estructurados'])
+
+    with st.expander("Ventanas de crisis"):
+        st.caption("Períodos sombreados en los gráficos y comparados en el estudio de eventos. Añade filas para nuevas ventanas (p. ej. la subida de tipos de 2022).")
+        crisis_table = st.data_editor(
+            pd.DataFrame(list(CRISES), columns=['Evento', 'Inicio', 'Fin']).assign(
+                Inicio=lambda d: pd.to_datetime(d['Inicio']).dt.date, Fin=lambda d: pd.to_datetime(d['Fin']).dt.date),
+            num_rows='dynamic', use_container_width=True, hide_index=True, key='crisis_windows',
+            column_config={'Inicio': st.column_config.DateColumn(format='YYYY-MM-DD'),
+                           'Fin': st.column_config.DateColumn(format='YYYY-MM-DD')})
+    crises = [(str(r.Evento), pd.Timestamp(r.Inicio), pd.Timestamp(r.Fin))
+              for r in crisis_table.dropna(subset=['Inicio', 'Fin']).itertuples(index=False)
+              if pd.Timestamp(r.Inicio) <= pd.Timestamp(r.Fin)]
+    crises = [(label if label not in ('', 'None', 'nan') else f'{s:%Y-%m}', s, e) for label, s, e in crises]
+
+    # Roll up the precomputed week × status × gestora × depositaria × tipo cube
+    ts_freq = {'Anual': 'Y', 'Trimestral': 'Q', 'Mensual': 'M', 'Semanal': 'W'}[granularity]
+    ts_flag = {'Todos': None, 'Normales': False, 'Estructurados': True}[ts_tipo]
+    ts = event_cube.series(ts_freq, gestora=None if ts_gestora == 'Todas' else ts_gestora, estructurado=ts_flag)
+
+    # Live funds at each period end, from the day-level stock matrix
+    if ts_gestora == 'Todas' and ts_flag is None:
+        live = load_stock(as_of).series()
     else:
-        df_m = df.copy()
-        df_m['m'] = df_m['date'].dt.to_period('M')
-        ts = df_m.groupby(['m', 'status']).size().unstack(fill_value=0)
-        ts.index = ts.index.to_timestamp()
+        # Only keys with funds by as_of are rows of the matrix; none left means no line
+        stock = (load_stock(as_of, 'Estructurado') if ts_gestora == 'Todas'
+                 else load_stock(as_of, ('Gestora', 'Estructurado')))
+        flags = [False, True] if ts_flag is None else [ts_flag]
+        keys = [f if ts_gestora == 'Todas' else (ts_gestora, f) for f in flags]
+        keys = [k for k in keys if k in stock.entities]
+        live = stock.series(keys) if keys else None
+    period_end = {'Y': pd.offsets.YearEnd(0), 'Q': pd.offsets.QuarterEnd(0), 'M': pd.offsets.MonthEnd(0),
+                  'W': pd.Timedelta(days=6)}[ts_freq]
+    ts_live = live.asof(ts.index + period_end).to_numpy() if live is not None and len(ts) else float('nan')
+    if granularity == 'Anual':
+        ts.index = ts.index + pd.DateOffset(months=6)
 
     ts = ts.rename(columns={'NUEVAS_INSCRIPCIONES': 'Altas', 'BAJAS': 'Bajas'})
     if 'Altas' not in ts.columns:
@@ -1998,7 +1210,7 @@ with tab_temporal:
         ts['Bajas'] = 0
 
     ts['Neto'] = ts['Altas'] - ts['Bajas']
-    ts['Acumulado'] = ts['Neto'].cumsum()
+    ts['Vivos'] = ts_live
 
     # Main chart: dual axis
     fig_ts = make_subplots(specs=[[{"secondary_y": True}]])
@@ -2019,20 +1231,16 @@ with tab_temporal:
         hovertemplate='<b>%{x|%Y-%m}</b><br>Bajas: %{y}<extra></extra>'
     ), secondary_y=False)
 
-    fig_ts.add_trace(go.Scatter(
-        x=ts.index, y=ts['Acumulado'],
-        name='Acumulado neto',
-        line=dict(color=COLORS['accent'], width=2.5),
-        mode='lines',
-        hovertemplate='<b>%{x|%Y-%m}</b><br>Acumulado: %{y:+,}<extra></extra>'
-    ), secondary_y=True)
+    if live is not None:
+        fig_ts.add_trace(go.Scatter(
+            x=ts.index, y=ts['Vivos'],
+            name='Fondos vivos (fin de período)',
+            line=dict(color=COLORS['accent'], width=2.5),
+            mode='lines',
+            hovertemplate='<b>%{x|%Y-%m}</b><br>Fondos vivos: %{y:,.0f}<extra></extra>'
+        ), secondary_y=True)
 
     # Crisis overlays
-    crises = [
-        ("Crisis financiera", "2008-01-01", "2009-12-31"),
-        ("Crisis deuda EU", "2011-06-01", "2012-12-31"),
-        ("COVID-19", "2020-02-01", "2020-09-30"),
-    ]
     for label, s, e in crises:
         fig_ts.add_vrect(x0=s, x1=e, fillcolor="rgba(199,93,93,0.07)",
                          layer="below", line_width=0)
@@ -2047,7 +1255,9 @@ with tab_temporal:
         **PLOTLY_LAYOUT,
         height=550,
         barmode='relative',
-        title=dict(text='<b>Altas vs Bajas · Balance acumulado</b>',
+        title=dict(text='<b>Altas vs Bajas · Fondos vivos</b>'
+                        + ('' if ts_gestora == 'Todas' else f' · {ts_gestora[:40]}')
+                        + ('' if ts_tipo == 'Todos' else f' · {ts_tipo}'),
                    font=dict(size=16, color=COLORS['text']), x=0, xanchor='left'),
         legend=dict(
             orientation='h', yanchor='top', y=1.12, xanchor='center', x=0.5,
@@ -2057,7 +1267,7 @@ with tab_temporal:
         xaxis=dict(gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
         yaxis=dict(title='Fondos por período', gridcolor='rgba(255,255,255,0.04)',
                    tickfont=dict(color=COLORS['text_muted'])),
-        yaxis2=dict(title='Acumulado neto', gridcolor='rgba(255,255,255,0.04)',
+        yaxis2=dict(title='Fondos vivos', rangemode='tozero', gridcolor='rgba(255,255,255,0.04)',
                     tickfont=dict(color=COLORS['text_muted']),
                     showgrid=False),
     )
@@ -2068,63 +1278,267 @@ with tab_temporal:
     st.markdown("---")
     mc1, mc2, mc3, mc4 = st.columns(4)
     with mc1:
-        worst_idx = ts['Neto'].idxmin()
-        st.metric("Peor período", f"{ts.loc[worst_idx, 'Neto']:+.0f}",
-                  worst_idx.strftime('%Y-%m'))
+        if len(ts):
+            worst_idx = ts['Neto'].idxmin()
+            st.metric("Peor período", f"{ts.loc[worst_idx, 'Neto']:+.0f}",
+                      worst_idx.strftime('%Y-%m'))
     with mc2:
-        best_idx = ts['Neto'].idxmax()
-        st.metric("Mejor período", f"{ts.loc[best_idx, 'Neto']:+.0f}",
-                  best_idx.strftime('%Y-%m'))
+        if len(ts):
+            best_idx = ts['Neto'].idxmax()
+            st.metric("Mejor período", f"{ts.loc[best_idx, 'Neto']:+.0f}",
+                      best_idx.strftime('%Y-%m'))
     with mc3:
         st.metric("Total altas", f"{ts['Altas'].sum():,.0f}")
     with mc4:
         st.metric("Total bajas", f"{ts['Bajas'].sum():,.0f}")
 
+    # ── Event study: each crisis window vs the spans of equal length before and after it ──
+    st.markdown("---")
+    st.markdown("### Estudio de eventos: crisis")
+    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Cada ventana frente a los períodos de igual duración inmediatamente anteriores y posteriores. Mortalidad en bajas por cada 100 fondos-año en riesgo; bajas esperadas con la mortalidad del período anterior. Sigue los filtros de gestora y tipo.</p>", unsafe_allow_html=True)
+
+    if crises:
+        study_windows = tuple(crises)
+        if ts_gestora == 'Todas' and ts_flag is None:
+            study = load_event_study(as_of, study_windows)
+        else:
+            study_by, study_key = {(True, False): ('Estructurado', ts_flag), (False, True): ('Gestora', ts_gestora),
+                                   (False, False): (('Gestora', 'Estructurado'), (ts_gestora, ts_flag))}[
+                (ts_gestora == 'Todas', ts_flag is None)]
+            study = load_event_study(as_of, study_windows, study_by)
+            # Compare keys one by one: tuple keys would be read as (group, window) by .loc
+            study = study[[g == study_key for g in study.index.get_level_values('group')]].droplevel('group')
+
+        if len(study):
+            study_table = pd.DataFrame({
+                'Evento': study.index.get_level_values(-1),
+                'Período': [f'{s:%Y-%m} → {e:%Y-%m}' for s, e in zip(study['start'], study['end'])],
+                'Vivos al inicio': study['alive_start'].to_numpy(),
+                'Supervivencia %': (study['survival'] * 100).round(1).to_numpy(),
+                'Altas antes': study['births_before'].to_numpy(),
+                'Altas durante': study['births_during'].to_numpy(),
+                'Altas después': study['births_after'].to_numpy(),
+                'Bajas antes': study['deaths_before'].to_numpy(),
+                'Bajas durante': study['deaths_during'].to_numpy(),
+                'Bajas después': study['deaths_after'].to_numpy(),
+                'Mortalidad antes': (study['hazard_before'] * 100).round(1).to_numpy(),
+                'Mortalidad durante': (study['hazard_during'] * 100).round(1).to_numpy(),
+                'Mortalidad después': (study['hazard_after'] * 100).round(1).to_numpy(),
+                'Bajas esperadas': study['expected_deaths'].round(0).to_numpy(),
+                'Exceso de bajas': study['excess_deaths'].round(0).to_numpy(),
+            })
+            st.dataframe(study_table, use_container_width=True, hide_index=True)
+            st.download_button("Descargar CSV", study.reset_index().to_csv(index=False).encode('utf-8'),
+                               file_name=f'estudio_crisis_{as_of:%Y%m%d}.csv', mime='text/csv',
+                               key='crisis_csv')
+        else:
+            st.info("Sin fondos para el filtro seleccionado.")
+
+    # ── Survivorship bias over time (one sweep over birth/death dates) ──
+    st.markdown("---")
+    st.markdown("### Sesgo de supervivencia a lo largo del tiempo")
+    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Porcentaje de los fondos lanzados hasta cada mes que ya estaban liquidados: lo que una base de datos de solo supervivientes no muestra.</p>", unsafe_allow_html=True)
+
+    bias_total = load_bias(as_of)
+    bias_now = bias_total.iloc[-1]
+    bc1, bc2 = st.columns([1, 3])
+    with bc1:
+        st.metric("Fondos invisibles" if as_of == last_event else f"Fondos invisibles {as_of:%m/%Y}",
+                  f"{bias_now['bias'] * 100:.1f}%",
+                  f"{int(bias_now['liquidated']):,} de {int(bias_now['launched']):,} lanzados",
+                  delta_color="off")
+        bias_view = st.radio("Desglose", ['Total', 'Por cohorte', 'Por gestora'])
+        bias_groups = None
+        if bias_view == 'Por cohorte':
+            bias_groups = load_bias(as_of, 'Cohorte')
+            bias_shown = list(bias_groups.index.get_level_values('group').unique())
+        elif bias_view == 'Por gestora':
+            bias_groups = load_bias(as_of, 'Gestora')
+            latest = bias_groups.groupby(level='group', observed=True)['launched'].last().sort_values(ascending=False)
+            bias_shown = st.multiselect("Gestoras", latest.index.tolist(), default=latest.index[:5].tolist())
+
+    with bc2:
+        fig_bias = go.Figure()
+        fig_bias.add_trace(go.Scatter(
+            x=bias_total.index, y=bias_total['bias'] * 100, name='Total',
+            line=dict(color=COLORS['text'] if bias_groups is not None else COLORS['accent'], width=2.5,
+                      dash='dot' if bias_groups is not None else 'solid'),
+            customdata=bias_total[['liquidated', 'launched']],
+            hovertemplate='<b>%{x|%Y-%m}</b><br>%{y:.1f}% (%{customdata[0]:,} de %{customdata[1]:,})<extra>Total</extra>'
+        ))
+        if bias_groups is not None:
+            palette = [COLORS['accent2'], COLORS['accent'], COLORS['blue'], COLORS['accent3'],
+                       COLORS['purple'], COLORS['green'], COLORS['red']]
+            for i, group in enumerate(bias_shown):
+                series = bias_groups.loc[group]
+                fig_bias.add_trace(go.Scatter(
+                    x=series.index, y=series['bias'] * 100, name=str(group)[:40],
+                    line=dict(color=palette[i % len(palette)], width=2),
+                    customdata=series[['liquidated', 'launched']],
+                    hovertemplate='<b>%{x|%Y-%m}</b><br>%{y:.1f}% (%{customdata[0]:,} de %{customdata[1]:,})<extra>'
+                                  + str(group)[:40] + '</extra>'
+                ))
+        for label, s, e in crises:
+            fig_bias.add_vrect(x0=s, x1=e, fillcolor="rgba(199,93,93,0.07)", layer="below", line_width=0)
+        fig_bias.update_layout(
+            **PLOTLY_LAYOUT,
+            height=420,
+            title=dict(text='<b>% de fondos lanzados ya liquidados</b>',
+                       font=dict(size=14, color=COLORS['text']), x=0, xanchor='left'),
+            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
+                        yanchor='top', y=0.98, xanchor='left', x=0.02),
+            xaxis=dict(gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
+            yaxis=dict(title='Sesgo de supervivencia (%)', range=[0, 100], gridcolor='rgba(255,255,255,0.04)',
+                       tickfont=dict(color=COLORS['text_muted'])),
+        )
+        st.plotly_chart(fig_bias, use_container_width=True)
+
+    # ── Rolling mortality and launch rates (deaths and launches per fund-year at risk) ──
+    st.markdown("---")
+    st.markdown("### Tasas móviles de mortalidad y lanzamientos")
+    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Liquidaciones y lanzamientos en cada ventana móvil por cada 100 fondos-año en riesgo (tiempo que los fondos pasan vivos dentro de la ventana).</p>", unsafe_allow_html=True)
+
+    rc1, rc2, rc3 = st.columns([1, 2, 1])
+    with rc1:
+        rates_windows = st.multiselect("Ventanas (meses)", [3, 6, 12, 24, 36, 60], default=[12, 36])
+    with rc2:
+        rates_view = st.radio("Comparar", ['Total', 'Por tipo', 'Por gestora'], horizontal=True)
+    with rc3:
+        rates_measure = st.radio("Tasa", ['Ambas', 'Mortalidad', 'Lanzamientos'], horizontal=True)
+
+    rates_windows = tuple(sorted(rates_windows))
+    if rates_windows:
+        if rates_view == 'Total':
+            rates_table = load_rates(as_of, rates_windows)
+            rates_groups = {'Total': rates_table}
+        elif rates_view == 'Por tipo':
+            rates_table = load_rates(as_of, rates_windows, 'Estructurado')
+            rates_groups = {label: rates_table.loc[flag] for flag, label in ((False, 'Normales'), (True, 'Estructurados'))
+                            if flag in rates_table.index.get_level_values('group')}
+        else:
+            rates_table = load_rates(as_of, rates_windows, 'Gestora')
+            exposure = rates_table['exposure'].groupby(level='group').sum().sort_values(ascending=False)
+            rates_shown = st.multiselect("Gestoras", exposure.index.tolist(), default=exposure.index[:4].tolist(),
+                                         key='rates_gestoras')
+            rates_groups = {str(g)[:40]: rates_table.loc[g] for g in rates_shown}
+
+        palette = [COLORS['accent2'], COLORS['accent'], COLORS['blue'], COLORS['accent3'],
+                   COLORS['purple'], COLORS['green'], COLORS['red']]
+        kinds = [('mortality', 'Mortalidad', 'solid'), ('launch_rate', 'Lanzamientos', 'dash')]
+        kinds = [k for k in kinds if rates_measure in ('Ambas', k[1])]
+        fig_rates = go.Figure()
+        for i, (label, series) in enumerate(rates_groups.items()):
+            for j, w in enumerate(rates_windows):
+                for column, kind, dash in kinds:
+                    name = f'{kind} {w}m' if len(rates_groups) == 1 else f'{label} · {kind} {w}m'
+                    fig_rates.add_trace(go.Scatter(
+                        x=series.index, y=series[f'{column}_{w}m'] * 100, name=name, mode='lines',
+                        line=dict(color=palette[(i * len(rates_windows) + j) % len(palette)], width=2, dash=dash),
+                        hovertemplate='<b>%{x|%Y-%m}</b><br>%{y:.1f} por 100 fondos-año<extra>' + name + '</extra>'
+                    ))
+        for label, s, e in crises:
+            fig_rates.add_vrect(x0=s, x1=e, fillcolor="rgba(199,93,93,0.07)", layer="below", line_width=0)
+        fig_rates.update_layout(
+            **PLOTLY_LAYOUT,
+            height=420,
+            title=dict(text='<b>Tasas anualizadas en ventanas móviles</b>',
+                       font=dict(size=14, color=COLORS['text']), x=0, xanchor='left'),
+            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
+                        yanchor='top', y=0.98, xanchor='left', x=0.02),
+            xaxis=dict(gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
+            yaxis=dict(title='Por 100 fondos-año', rangemode='tozero', gridcolor='rgba(255,255,255,0.04)',
+                       tickfont=dict(color=COLORS['text_muted'])),
+        )
+        st.plotly_chart(fig_rates, use_container_width=True)
+        st.download_button("Descargar CSV", rates_table.reset_index().to_csv(index=False).encode('utf-8'),
+                           file_name=f'tasas_moviles_{as_of:%Y%m%d}.csv', mime='text/csv')
+
+    # ── Live funds and market share per entity (day × entity stock matrix) ──
+    st.markdown("---")
+    st.markdown("### Fondos vivos y cuota de mercado")
+    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Fondos registrados y aún no liquidados en cada día, por entidad.</p>", unsafe_allow_html=True)
+
+    sc1, sc2, sc3 = st.columns([1, 3, 1])
+    with sc1:
+        stock_by = st.selectbox("Agrupar por", ['Gestora', 'Depositaria'])
+    entity_stock = load_stock(as_of, stock_by)
+    stock_now = entity_stock.at(as_of).sort_values(ascending=False)
+    with sc2:
+        stock_shown = st.multiselect("Entidades", stock_now.index.tolist(), default=stock_now.index[:5].tolist())
+    with sc3:
+        stock_measure = st.radio("Medida", ['Fondos vivos', 'Cuota %'], horizontal=True)
+
+    if stock_shown:
+        stock_values = (entity_stock.frame(stock_shown) if stock_measure == 'Fondos vivos'
+                        else entity_stock.share(stock_shown))
+        palette = [COLORS['accent2'], COLORS['accent'], COLORS['blue'], COLORS['accent3'],
+                   COLORS['purple'], COLORS['green'], COLORS['red']]
+        fig_stock = go.Figure()
+        for i, entity in enumerate(stock_shown):
+            fig_stock.add_trace(go.Scatter(
+                x=stock_values.index, y=stock_values[entity], name=str(entity)[:40], mode='lines',
+                line=dict(color=palette[i % len(palette)], width=2),
+                hovertemplate='<b>%{x|%Y-%m-%d}</b><br>'
+                              + ('%{y:,} fondos' if stock_measure == 'Fondos vivos' else '%{y:.1f}%')
+                              + '<extra>' + str(entity)[:40] + '</extra>'
+            ))
+        fig_stock.update_layout(
+            **PLOTLY_LAYOUT,
+            height=420,
+            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=10),
+                        yanchor='top', y=0.98, xanchor='left', x=0.02),
+            xaxis=dict(gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted'])),
+            yaxis=dict(title='Fondos vivos' if stock_measure == 'Fondos vivos' else 'Cuota de fondos vivos (%)',
+                       rangemode='tozero', gridcolor='rgba(255,255,255,0.04)',
+                       tickfont=dict(color=COLORS['text_muted'])),
+        )
+        st.plotly_chart(fig_stock, use_container_width=True)
+
     # ── Concentration / HHI over time ──
     st.markdown("---")
     st.markdown("### Concentración del mercado (HHI)")
-    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Índice Herfindahl-Hirschman de gestoras por año. Valores &gt; 1500 indican concentración moderada, &gt; 2500 alta.</p>", unsafe_allow_html=True)
-
-    @st.cache_data
-    def compute_hhi_over_time(_lifecycle):
-        results = []
-        for year in range(2005, 2026):
-            # Funds active in this year
-            active = _lifecycle[
-                (_lifecycle['Fecha_Alta'].dt.year <= year) &
-                ((_lifecycle['Fecha_Baja'].isna()) | (_lifecycle['Fecha_Baja'].dt.year >= year))
-            ]
-            if len(active) < 10:
-                continue
-            shares = active.groupby('Gestora').size() / len(active) * 100
-            hhi = (shares ** 2).sum()
-            top3 = shares.nlargest(3).sum()
-            n_gestoras = len(shares)
-            results.append({'Año': year, 'HHI': round(hhi, 0), 'Top 3 %': round(top3, 1),
-                           'Gestoras activas': n_gestoras})
-        return pd.DataFrame(results)
-
-    hhi_df = compute_hhi_over_time(lifecycle)
+    st.markdown(f"<p style='color:{COLORS['text_muted']}; margin-top:-0.7rem;'>Índice Herfindahl-Hirschman por período, sobre los fondos activos en algún momento del período. Valores &gt; 1500 indican concentración moderada, &gt; 2500 alta.</p>", unsafe_allow_html=True)
+
+    hc1, hc2, _ = st.columns([1, 1, 2])
+    with hc1:
+        hhi_dimension = st.selectbox("Dimensión", ['Gestora', 'Depositaria', 'Gestora–Depositaria'])
+    with hc2:
+        hhi_resolution = st.selectbox("Resolución", ['Anual', 'Mensual', 'Diaria'])
+    hhi_entities = {'Gestora': 'Gestoras activas', 'Depositaria': 'Depositarias activas',
+                    'Gestora–Depositaria': 'Pares activos'}[hhi_dimension]
+
+    if hhi_dimension == 'Gestora' and hhi_resolution == 'Anual':
+        # Precomputed yearly table
+        hhi_x, hhi_values, hhi_top, hhi_count = hhi_df['Año'], hhi_df['HHI'], hhi_df['Top 3 %'], hhi_df['Gestoras activas']
+        hhi_hover = '%{x}'
+    else:
+        by = ('Gestora', 'Depositaria') if hhi_dimension == 'Gestora–Depositaria' else (hhi_dimension,)
+        hhi_series = load_concentration(as_of, by, {'Anual': 'Y', 'Mensual': 'M', 'Diaria': 'D'}[hhi_resolution])
+        hhi_series = hhi_series[hhi_series['active_funds'] >= 10]
+        hhi_x = hhi_series.index.year if hhi_resolution == 'Anual' else hhi_series.index
+        hhi_values, hhi_top, hhi_count = hhi_series['hhi'].round(0), hhi_series['top_share'], hhi_series['entities']
+        hhi_hover = '%{x}' if hhi_resolution == 'Anual' else '%{x|%Y-%m-%d}'
 
     fig_hhi = make_subplots(specs=[[{"secondary_y": True}]])
 
     fig_hhi.add_trace(go.Bar(
-        x=hhi_df['Año'], y=hhi_df['HHI'],
+        x=hhi_x, y=hhi_values,
         name='HHI',
         marker=dict(
-            color=[COLORS['accent'] if v > 1500 else COLORS['blue'] for v in hhi_df['HHI']],
-            opacity=0.8
+            color=[COLORS['accent'] if v > 1500 else COLORS['blue'] for v in hhi_values],
+            opacity=0.8, line=dict(width=0)
         ),
-        hovertemplate='<b>%{x}</b><br>HHI: %{y:.0f}<extra></extra>'
+        customdata=hhi_top,
+        hovertemplate=f'<b>{hhi_hover}</b><br>HHI: %{{y:.0f}}<br>Top 3: %{{customdata:.1f}}%<extra></extra>'
     ), secondary_y=False)
 
     fig_hhi.add_trace(go.Scatter(
-        x=hhi_df['Año'], y=hhi_df['Gestoras activas'],
-        name='Gestoras activas',
+        x=hhi_x, y=hhi_count,
+        name=hhi_entities,
         line=dict(color=COLORS['accent3'], width=2),
-        mode='lines+markers',
+        mode='lines+markers' if hhi_resolution == 'Anual' else 'lines',
         marker=dict(size=5),
-        hovertemplate='<b>%{x}</b><br>%{y} gestoras<extra></extra>'
+        hovertemplate=f'<b>{hhi_hover}</b><br>%{{y}} {hhi_entities.split()[0].lower()}<extra></extra>'
     ), secondary_y=True)
 
     # HHI threshold lines
@@ -2140,16 +1554,16 @@ with tab_temporal:
     fig_hhi.update_layout(
         **PLOTLY_LAYOUT,
         height=400,
-        title=dict(text='<b>Concentración de gestoras (HHI) y número de actores</b>',
+        title=dict(text=f'<b>Concentración por {hhi_dimension.lower()} (HHI) y número de actores</b>',
                    font=dict(size=16, color=COLORS['text']), x=0, xanchor='left'),
         legend=dict(
             orientation='h', yanchor='top', y=1.1, xanchor='center', x=0.5,
             bgcolor='rgba(0,0,0,0)', font=dict(color=COLORS['text'], size=11)),
         xaxis=dict(gridcolor='rgba(255,255,255,0.04)', tickfont=dict(color=COLORS['text_muted']),
-                   dtick=2),
+                   dtick=2 if hhi_resolution == 'Anual' else None),
         yaxis=dict(title='HHI', gridcolor='rgba(255,255,255,0.04)',
                    tickfont=dict(color=COLORS['text_muted'])),
-        yaxis2=dict(title='Gestoras activas', showgrid=False,
+        yaxis2=dict(title=hhi_entities, showgrid=False,
                     tickfont=dict(color=COLORS['text_muted'])),
     )
 
@@ -2242,12 +1656,15 @@ with tab_explorer:
             st.markdown("---")
             st.markdown("### Mortalidad por gestora")
 
-            mort_by_g = result.groupby('Gestora').agg(
+            mort_by_g = result.groupby('Gestora', observed=True).agg(
                 Total=('N_Registro', 'count'),
                 Liquidados=('Activo', lambda x: (~x).sum()),
                 Vida_Media=('Vida_Anos', 'mean')
             ).round(1)
             mort_by_g['Mortalidad %'] = (mort_by_g['Liquidados'] / mort_by_g['Total'] * 100).round(1)
+            # Censoring-aware: share of funds dead within 5 years (Kaplan–Meier)
+            km_g = entity_survival(result, 'Gestora', as_of=as_of)
+            mort_by_g['Mortalidad KM 5a %'] = (100 * (1 - km_g['surv_5'])).round(1)
             mort_by_g = mort_by_g[mort_by_g['Total'] >= 3].sort_values('Total', ascending=False).head(15)
 
             fig_mort = go.Figure()
@@ -2265,7 +1682,10 @@ with tab_explorer:
                 name='Liquidados',
                 orientation='h',
                 marker=dict(color=COLORS['red'], opacity=0.8),
-                hovertemplate='<b>%{y}</b><br>Liquidados: %{x}<extra></extra>'
+                customdata=mort_by_g['Mortalidad KM 5a %'],
+                text=[f'{v:.0f}% a 5 años' for v in mort_by_g['Mortalidad KM 5a %']],
+                textposition='outside', textfont=dict(size=10, color=COLORS['text_muted']),
+                hovertemplate='<b>%{y}</b><br>Liquidados: %{x}<br>Mortalidad KM a 5 años: %{customdata:.1f}%<extra></extra>'
             ))
 
             fig_mort.update_layout(
@@ -0,0 +1,37 @@
+"""Shared fixtures: a small synthetic event history with the bundled CSV's profile."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cnmv.ingest import DATA_FILE, load_events
+from cnmv.lifecycle import build_edges, build_lifecycle
+from cnmv.synthetic import fit_profile, generate_events, write_events_csv
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope='session')
+def events(tmp_path_factory):
+    """Parsed events of a ~3000-event synthetic CSV (plain, non-categorical columns)."""
+    profile = fit_profile(load_events(ROOT / DATA_FILE))
+    path = tmp_path_factory.mktemp('synthetic') / 'events.csv'
+    write_events_csv(generate_events(3000, seed=7, profile=profile), path)
+    return load_events(path)
+
+
+@pytest.fixture(scope='session')
+def lifecycle(events):
+    return build_lifecycle(events)
+
+
+@pytest.fixture(scope='session')
+def edges(events):
+    return build_edges(events)
+
+
+@pytest.fixture(scope='session')
+def as_of(events):
+    """Last event date: the latest state the synthetic history observes."""
+    return pd.Timestamp(events['date'].max()).normalize()
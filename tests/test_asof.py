@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from cnmv.asof import AsOfIndex
+from cnmv.lifecycle import build_edges, build_lifecycle
+
+
+@pytest.fixture(scope='module')
+def index(events, lifecycle, edges):
+    return AsOfIndex(events, lifecycle, edges)
+
+
+@pytest.mark.parametrize('date', ['2006-03-31', '2010-12-31', '2016-06-30', '2022-01-31'])
+def test_views_match_rebuild_from_truncated_history(index, events, date):
+    past = events[events['date'] <= pd.Timestamp(date)].reset_index(drop=True)
+    got_events, got_lc, got_edges = index.tables(date)
+    pd.testing.assert_frame_equal(got_events, past)
+
+    want = build_lifecycle(past).sort_values('N_Registro').reset_index(drop=True)
+    got = got_lc.sort_values('N_Registro').reset_index(drop=True)[want.columns]
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+    key = ['Gestora', 'Depositaria']
+    pd.testing.assert_frame_equal(got_edges.sort_values(key).reset_index(drop=True),
+                                  build_edges(past).sort_values(key).reset_index(drop=True))
+
+
+def test_latest_date_returns_full_tables(index, events, lifecycle, edges, as_of):
+    got_events, got_lc, got_edges = index.tables(as_of)
+    assert got_events is events and got_lc is lifecycle and got_edges is edges
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.bias import survivorship_bias
+from cnmv.survival import launch_cohorts
+
+
+def _naive(lifecycle, t):
+    """All funds launched by ``t`` against the survivors-only view of that day."""
+    launched = lifecycle[lifecycle['Fecha_Alta'] <= t]
+    survivors = launched[launched['Fecha_Baja'].isna() | (launched['Fecha_Baja'] > t)]
+    return len(launched), len(survivors)
+
+
+@pytest.fixture(scope='module', params=['last', 'mid-month'])
+def cut(request, as_of):
+    """The fixture's last event date, and a mid-month date three years earlier."""
+    return as_of if request.param == 'last' else pd.Timestamp(as_of.year - 3, 6, 17)
+
+
+def test_bias_matches_survivors_only_view(lifecycle, cut):
+    table = survivorship_bias(lifecycle, as_of=cut)
+    assert table.index[-1] == cut
+    assert (table.index[:-1] == table.index[:-1] + pd.offsets.MonthEnd(0)).all()
+    for t, row in table.iloc[::7].iloc[1:].iterrows():
+        launched, survivors = _naive(lifecycle, t)
+        assert (row['launched'], row['alive']) == (launched, survivors)
+        assert row['liquidated'] == launched - survivors
+        assert row['bias'] == pytest.approx(1 - survivors / launched)
+
+
+@pytest.mark.parametrize('by', ['Gestora', 'Cohorte'])
+def test_grouped_bias_matches_per_group_view(lifecycle, cut, by):
+    labels = lifecycle['Gestora'] if by == 'Gestora' else launch_cohorts(lifecycle)
+    table = survivorship_bias(lifecycle, labels.to_numpy() if by == 'Cohorte' else by, as_of=cut)
+    sizes = labels[(lifecycle['Fecha_Alta'] <= cut).to_numpy()].value_counts()
+    # Groups whose first launch is after the cut have no rows yet
+    later = set(labels.dropna()) - set(sizes.index)
+    assert later.isdisjoint(table.index.get_level_values('group'))
+    for group in sizes.index[:4].tolist() + sizes.index[-2:].tolist():
+        funds = lifecycle[(labels == group).to_numpy()]
+        rows = table.xs(group, level='group')
+        assert rows.index[0] == min(funds['Fecha_Alta'].min() + pd.offsets.MonthEnd(0), cut)
+        for t, row in rows.iloc[::5].iterrows():
+            launched, survivors = _naive(funds, t)
+            assert (row['launched'], row['alive']) == (launched, survivors)
+            assert row['bias'] == pytest.approx(1 - survivors / launched)
+    # Every fund with a key is in exactly one group
+    last = table.groupby(level='group').tail(1)
+    assert last['launched'].sum() == (lifecycle['Fecha_Alta'] <= cut)[labels.notna().to_numpy()].sum()
+    assert np.isfinite(last['bias']).all()
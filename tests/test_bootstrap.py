@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from cnmv.bootstrap import BOOTSTRAP_HORIZONS, bootstrap_intervals
+from cnmv.survival import GLOBAL_CURVE, _durations, kaplan_meier, launch_cohorts
+
+
+@pytest.fixture(scope='module')
+def intervals(lifecycle, as_of):
+    return bootstrap_intervals(lifecycle, 'all', replicates=200, seed=3, workers=1, as_of=as_of)
+
+
+def test_estimates_match_direct_km(lifecycle, as_of, intervals):
+    duration, event, _ = _durations(lifecycle, 'all', as_of)
+    cohort = launch_cohorts(lifecycle).astype(object).to_numpy()
+    life = lifecycle['Vida_Anos'].to_numpy(dtype=float)
+    for label, rows in intervals.groupby('group'):
+        member = np.ones(len(duration), dtype=bool) if label == GLOBAL_CURVE else cohort == label
+        times, survival, _ = kaplan_meier(duration[member], event[member])
+        estimate = rows.set_index('statistic')['estimate']
+        for h in BOOTSTRAP_HORIZONS:
+            assert estimate[f'surv_{h}'] == pytest.approx(survival[np.searchsorted(times, h, side='right') - 1])
+        assert estimate['median_life'] == pytest.approx(np.nanmedian(life[member]))
+
+
+def test_intervals_bracket_estimates(intervals):
+    ok = intervals.dropna()
+    assert len(ok) > 0
+    assert (ok['lower'] <= ok['estimate'] + 1e-12).all()
+    assert (ok['estimate'] <= ok['upper'] + 1e-12).all()
+
+
+def test_seeded_and_independent_of_workers(lifecycle, as_of, intervals, monkeypatch):
+    # Small blocks, so several of them are spread over the pool
+    monkeypatch.setattr('cnmv.bootstrap._BLOCK_ROWS', 20 * 2 * len(lifecycle))
+    serial = bootstrap_intervals(lifecycle, 'all', replicates=200, seed=3, workers=1, as_of=as_of)
+    pooled = bootstrap_intervals(lifecycle, 'all', replicates=200, seed=3, workers=2, as_of=as_of)
+    np.testing.assert_array_equal(pooled[['lower', 'upper']].to_numpy(), serial[['lower', 'upper']].to_numpy())
+    other = bootstrap_intervals(lifecycle, 'all', replicates=200, seed=4, workers=1, as_of=as_of)
+    assert not np.array_equal(other['lower'].to_numpy(), serial['lower'].to_numpy(), equal_nan=True)
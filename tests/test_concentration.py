@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.concentration import compute_hhi_over_time, concentration_series
+
+
+def _reference(lifecycle, by, freq, as_of, top=3):
+    """Per-period counts of the funds active at any time in the period, one period at a time."""
+    periods = pd.period_range(lifecycle['Fecha_Alta'].min(), as_of, freq=freq)
+    key = lifecycle[by].astype(str).agg('|'.join, axis=1) if isinstance(by, list) else lifecycle[by]
+    keep = lifecycle[by].notna().all(axis=1) if isinstance(by, list) else key.notna()
+    rows = []
+    for period in periods:
+        start, end = period.start_time, (period + 1).start_time
+        active = keep & (lifecycle['Fecha_Alta'] < end) & ~(lifecycle['Fecha_Baja'] < start)
+        counts = key[active].value_counts().to_numpy()
+        n = counts.sum()
+        rows.append((n, len(counts), (counts ** 2).sum() / n ** 2 * 10000 if n else np.nan,
+                     np.sort(counts)[::-1][:top].sum() / n * 100 if n else np.nan))
+    return pd.DataFrame(rows, columns=['active_funds', 'entities', 'hhi', 'top_share'],
+                        index=pd.DatetimeIndex(periods.start_time, name='date'))
+
+
+@pytest.mark.parametrize('by, freq', [('Gestora', 'M'), ('Gestora', 'Y'), ('Depositaria', 'Q'),
+                                      (['Gestora', 'Depositaria'], 'M'), ('Gestora', 'W')])
+def test_sweep_matches_per_period_counts(lifecycle, as_of, by, freq):
+    got = concentration_series(lifecycle, by, freq, as_of)
+    pd.testing.assert_frame_equal(got, _reference(lifecycle, by, freq, as_of), check_dtype=False,
+                                  check_freq=False)
+
+
+def test_yearly_table(lifecycle, as_of):
+    table = compute_hhi_over_time(lifecycle, as_of=as_of)
+    ref = _reference(lifecycle, 'Gestora', 'Y', as_of)
+    ref = ref[(ref.index.year >= 2005) & (ref['active_funds'] >= 10)]
+    np.testing.assert_array_equal(table['Año'], ref.index.year)
+    np.testing.assert_array_equal(table['HHI'], ref['hhi'].round(0))
+    np.testing.assert_array_equal(table['Gestoras activas'], ref['entities'])
+
+
+def test_unknown_freq(lifecycle):
+    with pytest.raises(ValueError):
+        concentration_series(lifecycle, freq='H')
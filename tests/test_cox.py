@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.cox import _alive_at, fit_cox, lifecycle_covariates, lifecycle_cox
+
+
+def _partial_loglik(beta, duration, event, x, ties):
+    """Reference Cox log partial likelihood, one distinct death time at a time."""
+    eta = x @ beta
+    total = 0.0
+    for t in np.unique(duration[event]):
+        dead = (duration == t) & event
+        risk = np.exp(eta[duration >= t]).sum()
+        tied = np.exp(eta[dead]).sum()
+        d = dead.sum()
+        shares = np.arange(d) / d if ties == 'efron' else np.zeros(d)
+        total += eta[dead].sum() - np.log(risk - shares * tied).sum()
+    return total
+
+
+@pytest.fixture(scope='module')
+def design(lifecycle, as_of):
+    rng = np.random.default_rng(1)
+    duration = ((lifecycle['Fecha_Baja'].fillna(as_of) - lifecycle['Fecha_Alta']).dt.days // 365).to_numpy(float)
+    event = lifecycle['Fecha_Baja'].notna().to_numpy()
+    x = pd.DataFrame({'Estructurado': lifecycle['Estructurado'].to_numpy(dtype=float),
+                      'noise': rng.normal(size=len(lifecycle))})
+    # Whole years: many tied death times
+    return duration, event, x
+
+
+@pytest.mark.parametrize('ties', ['efron', 'breslow'])
+def test_fit_maximises_reference_likelihood(design, ties):
+    duration, event, x = design
+    table = fit_cox(duration, event, x, ties=ties)
+    beta, xs = table['coef'].to_numpy(), x.to_numpy()
+
+    def loglik(b):
+        return _partial_loglik(b, duration, event, xs, ties)
+
+    step = 1e-4
+    eye = np.eye(len(beta)) * step
+    grad = np.array([(loglik(beta + h) - loglik(beta - h)) / (2 * step) for h in eye])
+    np.testing.assert_allclose(grad, 0, atol=1e-4)
+    hess = np.array([[(loglik(beta + a + b) - loglik(beta + a - b) - loglik(beta - a + b) + loglik(beta - a - b))
+                      / (4 * step ** 2) for b in eye] for a in eye])
+    np.testing.assert_allclose(table['se'], np.sqrt(np.diag(np.linalg.inv(-hess))), rtol=1e-3)
+    # Centring and shifting the linear predictor leave the partial likelihood unchanged
+    assert table.attrs['loglik'] == pytest.approx(loglik(beta), rel=1e-9)
+
+
+def test_alive_at_matches_brute_force():
+    rng = np.random.default_rng(2)
+    entity = rng.integers(0, 4, 300)
+    born = rng.integers(0, 200, 300)
+    dies = rng.random(300) < 0.6
+    died = born + rng.integers(0, 60, 300)
+    # Some funds launched and liquidated on the same day
+    died[:20] = born[:20]
+    dies[:20] = True
+    got = _alive_at(entity, born, (entity, born), (entity[dies], died[dies]))
+    want = [((entity == g) & (born < t) & ~(dies & (died < t))).sum() for g, t in zip(entity, born)]
+    np.testing.assert_array_equal(got, want)
+    assert (got >= 0).all()
+
+
+def test_covariates_on_plain_lifecycle_with_same_day_liquidation(lifecycle, as_of):
+    assert not isinstance(lifecycle['Gestora'].dtype, pd.CategoricalDtype)
+    extra = lifecycle.iloc[:3].copy()
+    extra['N_Registro'] = [-1.0, -2.0, -3.0]
+    extra['Fecha_Alta'] = extra['Fecha_Alta'].iloc[0] + pd.Timedelta(days=14)
+    extra['Fecha_Baja'] = extra['Fecha_Alta']
+    lc = pd.concat([lifecycle, extra], ignore_index=True)
+    _, _, covariates = lifecycle_covariates(lc, as_of)
+    assert np.isfinite(covariates.to_numpy()).all()
+    assert (covariates['log_gestora_funds'] >= 0).all()
+    assert (covariates['depositaria_share'] >= 0).all()
+    table = lifecycle_cox(lc, as_of)
+    assert np.isfinite(table[['coef', 'se']].to_numpy()).all()
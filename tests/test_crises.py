@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.crises import CRISES, SPANS, event_study
+
+
+def _reference(lifecycle, label, start, end, as_of):
+    """Counts, fund-days and survival of one window, from the fund rows directly."""
+    alta, baja = lifecycle['Fecha_Alta'], lifecycle['Fecha_Baja']
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    length = end - start + pd.Timedelta(days=1)
+    grid = (alta.min(), as_of + pd.Timedelta(days=1))
+    out = {}
+    for span, (lo, hi) in zip(SPANS, [(start - length, start), (start, end + pd.Timedelta(days=1)),
+                                      (end + pd.Timedelta(days=1), end + pd.Timedelta(days=1) + length)]):
+        lo, hi = min(max(lo, grid[0]), grid[1]), min(max(hi, grid[0]), grid[1])
+        out[f'births_{span}'] = ((alta >= lo) & (alta < hi)).sum()
+        out[f'deaths_{span}'] = ((baja >= lo) & (baja < hi)).sum()
+        stay = (baja.fillna(grid[1]).clip(upper=hi) - alta.clip(lower=lo)).dt.days.clip(lower=0)
+        out[f'fund_years_{span}'] = stay.sum() / 365.25 if hi > lo else 0.0
+    alive = (alta <= start) & ~(baja <= start) if grid[0] <= start <= as_of else pd.Series(False, index=alta.index)
+    out['alive_start'] = alive.sum()
+    out['survived'] = (alive & ~(baja <= end)).sum() if end <= as_of else np.nan
+    return out
+
+
+WINDOWS = list(CRISES) + [('Subida de tipos 2022', '2022-03-01', '2023-09-30'),
+                          ('Antes del archivo', '1990-01-01', '1990-12-31')]
+
+
+@pytest.fixture(scope='module')
+def cut():
+    # Mid-window as_of: the last window ends after it
+    return pd.Timestamp('2023-01-15')
+
+
+def test_windows_match_fund_rows(lifecycle, cut):
+    table = event_study(lifecycle, WINDOWS, as_of=cut)
+    for label, start, end in WINDOWS:
+        row = table.loc[label]
+        for column, value in _reference(lifecycle, label, start, end, cut).items():
+            if np.isnan(value):
+                assert np.isnan(row[column]), (label, column)
+            else:
+                assert row[column] == pytest.approx(value), (label, column)
+        expected = row['hazard_before'] * row['fund_years_during']
+        assert row['expected_deaths'] == pytest.approx(expected, nan_ok=True)
+
+
+def test_no_survival_past_as_of(lifecycle, cut):
+    table = event_study(lifecycle, WINDOWS, by='Gestora', as_of=cut)
+    rates = table.xs('Subida de tipos 2022', level='window')
+    assert rates['alive_start'].sum() > 0
+    assert rates['survived'].isna().all() and rates['survival'].isna().all()
+
+
+def test_groups_add_up_to_the_total(lifecycle, as_of):
+    total = event_study(lifecycle, WINDOWS, as_of=as_of)
+    grouped = event_study(lifecycle, WINDOWS, by=['Gestora', 'Estructurado'], as_of=as_of)
+    columns = [f'{c}_{s}' for c in ('births', 'deaths', 'fund_years') for s in SPANS] + ['alive_start', 'survived']
+    summed = grouped[columns].groupby(level='window', sort=False).sum()
+    np.testing.assert_allclose(summed.loc[total.index].to_numpy(), total[columns].to_numpy())
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.cube import EventCube, event_cube
+from cnmv.lifecycle import is_structured
+
+
+@pytest.fixture(scope='module')
+def cube(events, lifecycle):
+    return EventCube(event_cube(events, lifecycle))
+
+
+@pytest.fixture(scope='module')
+def linked_bajas(events, lifecycle):
+    """BAJAS events joined to their fund's lifecycle row."""
+    bajas = events[events['status'] == 'BAJAS'].assign(N_Registro=lambda d: d['N_Registro'].astype(float))
+    keys = lifecycle[['N_Registro', 'Gestora', 'Estructurado']].astype({'N_Registro': float})
+    return bajas.drop(columns=['Gestora']).merge(keys, on='N_Registro')
+
+
+def _yearly(series, status):
+    counts = series[status] if status in series else pd.Series(dtype=np.int64)
+    return counts[counts > 0].rename(lambda d: d.year).astype(np.int64)
+
+
+def test_gestora_roll_ups_follow_the_fund(cube, lifecycle, linked_bajas):
+    for gestora in lifecycle['Gestora'].value_counts().index[:5]:
+        series = cube.series('Y', gestora=gestora)
+        launches = lifecycle[lifecycle['Gestora'] == gestora].groupby('Año_Alta').size()
+        pd.testing.assert_series_equal(_yearly(series, 'NUEVAS_INSCRIPCIONES'), launches,
+                                       check_names=False, check_index_type=False)
+        bajas = linked_bajas[linked_bajas['Gestora'] == gestora].groupby('year').size()
+        assert len(bajas) > 0
+        pd.testing.assert_series_equal(_yearly(series, 'BAJAS'), bajas, check_names=False, check_index_type=False)
+        # At least one BAJAS per liquidated fund, in the year of its Fecha_Baja
+        deaths = lifecycle[lifecycle['Gestora'] == gestora].groupby('Año_Baja').size()
+        assert (_yearly(series, 'BAJAS').reindex(deaths.index.astype(int), fill_value=0) >= deaths.to_numpy()).all()
+
+
+@pytest.mark.parametrize('flag', [False, True])
+def test_structured_roll_ups_follow_the_fund(cube, events, lifecycle, linked_bajas, flag):
+    series = cube.series('Y', estructurado=flag)
+    launches = lifecycle[lifecycle['Estructurado'] == flag].groupby('Año_Alta').size()
+    pd.testing.assert_series_equal(_yearly(series, 'NUEVAS_INSCRIPCIONES'), launches,
+                                   check_names=False, check_index_type=False)
+    # Linked liquidations take the fund's flag; the others are classified by their own name
+    bajas = events[events['status'] == 'BAJAS']
+    unlinked = bajas[~bajas['N_Registro'].astype(float).isin(lifecycle['N_Registro'].astype(float))]
+    flags = pd.concat([linked_bajas[['year', 'Estructurado']],
+                       unlinked[['year']].assign(Estructurado=is_structured(unlinked['Nombre']).to_numpy())])
+    want = flags[flags['Estructurado'] == flag].groupby('year').size()
+    pd.testing.assert_series_equal(_yearly(series, 'BAJAS'), want, check_names=False, check_index_type=False)
+
+
+def test_every_event_counted_once(cube, events):
+    for freq in ('W', 'M', 'Q', 'Y'):
+        totals = cube.series(freq).sum()
+        assert totals.to_dict() == events['status'].value_counts().to_dict()
+    # Liquidations of funds outside the lifecycle have no Gestora: only the unfiltered total has them
+    by_gestora = cube.cube[cube.cube['Gestora'].notna()].groupby('status', observed=True)['count'].sum()
+    assert by_gestora['BAJAS'] < (events['status'] == 'BAJAS').sum()
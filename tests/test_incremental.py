@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from cnmv.incremental import LifecycleStore
+from cnmv.lifecycle import build_edges, build_lifecycle
+
+
+def _sorted(df, keys):
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def test_weekly_ingest_matches_full_rebuild(events):
+    files = events['file'].unique()
+    cut = len(files) // 2
+    store = LifecycleStore.from_events(events[events['file'].isin(files[:cut])])
+    for name in files[cut:cut + 40]:
+        store.ingest(events[events['file'] == name])
+    store.ingest(events[events['file'].isin(files[cut + 40:])])
+
+    full = build_lifecycle(events).reset_index(drop=True)
+    pd.testing.assert_frame_equal(store.lifecycle[full.columns], full, check_dtype=False)
+
+    edges = build_edges(events)
+    got = _sorted(store.edges[['Gestora', 'Depositaria', 'weight']], ['Gestora', 'Depositaria'])
+    want = _sorted(edges[['Gestora', 'Depositaria', 'weight']], ['Gestora', 'Depositaria'])
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_edges_keep_the_first_five_funds_in_ingest_order(events):
+    files = events['file'].unique()
+    store = LifecycleStore.from_events(events[events['file'].isin(files[:10])])
+    for name in files[10:]:
+        store.ingest(events[events['file'] == name])
+
+    # The reference is a rebuild over the same history, in the order it was ingested
+    want = build_edges(store.events)
+    got = store.edges
+    pd.testing.assert_frame_equal(got[want.columns], want, check_dtype=False)
+    assert store.gestora_sizes == want.groupby('Gestora_short')['weight'].sum().to_dict()
+    assert store.depositaria_sizes == want.groupby('Depositaria_short')['weight'].sum().to_dict()
+
+
+def test_reingesting_a_bulletin_changes_nothing(events):
+    store = LifecycleStore.from_events(events)
+    before = store.lifecycle.copy()
+    touched = store.ingest(events[events['file'] == events['file'].iloc[-1]])
+    assert len(touched) == 0
+    pd.testing.assert_frame_equal(store.lifecycle, before)
+    assert np.array_equal(store.events['N_Registro'].to_numpy(), events['N_Registro'].to_numpy(), equal_nan=True)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.rates import rolling_rates
+
+
+def _monthly_reference(lifecycle, as_of):
+    """Launches, deaths and fund-months at risk per calendar month, one month at a time."""
+    months = pd.date_range(lifecycle['Fecha_Alta'].min().to_period('M').start_time, as_of, freq='MS')
+    alta, baja = lifecycle['Fecha_Alta'], lifecycle['Fecha_Baja']
+    end_of_grid = as_of + pd.Timedelta(days=1)
+    rows = []
+    for month in months:
+        lo, hi = max(month, alta.min()), min(month + pd.offsets.MonthBegin(1), end_of_grid)
+        days = ((baja.fillna(end_of_grid).clip(upper=hi) - alta.clip(lower=lo)).dt.days).clip(lower=0).sum()
+        in_month = [(s >= month) & (s < hi) for s in (alta, baja)]
+        rows.append((in_month[0].sum(), in_month[1].sum(), days / month.days_in_month))
+    return pd.DataFrame(rows, columns=['launches', 'deaths', 'exposure'], index=pd.DatetimeIndex(months, name='date'))
+
+
+@pytest.fixture(scope='module')
+def mid_month(as_of):
+    return as_of - pd.Timedelta(days=100)
+
+
+def test_monthly_counts_and_windows(lifecycle, mid_month):
+    got = rolling_rates(lifecycle, windows=(1, 12, 36), as_of=mid_month)
+    ref = _monthly_reference(lifecycle, mid_month)
+    pd.testing.assert_frame_equal(got[['launches', 'deaths', 'exposure']], ref, check_dtype=False, check_freq=False)
+    for w in (1, 12, 36):
+        deaths, launches, exposure = (ref[c].rolling(w).sum() for c in ('deaths', 'launches', 'exposure'))
+        np.testing.assert_allclose(got[f'mortality_{w}m'], (deaths / exposure * 12).where(exposure > 0))
+        np.testing.assert_allclose(got[f'launch_rate_{w}m'], (launches / exposure * 12).where(exposure > 0))
+
+
+def test_groups_add_up_to_the_total(lifecycle, mid_month):
+    total = rolling_rates(lifecycle, as_of=mid_month)
+    grouped = rolling_rates(lifecycle, by=['Gestora', 'Estructurado'], as_of=mid_month)
+    summed = grouped[['launches', 'deaths', 'exposure']].groupby(level='date').sum()
+    pd.testing.assert_frame_equal(summed, total[['launches', 'deaths', 'exposure']], check_dtype=False,
+                                  check_freq=False)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cnmv.stock import FundStock
+
+
+def _live(lifecycle, day):
+    """Funds live on ``day``: launched by then and not liquidated on or before it."""
+    return (lifecycle['Fecha_Alta'] <= day) & ~(lifecycle['Fecha_Baja'] <= day)
+
+
+@pytest.fixture(scope='module')
+def stocked(lifecycle):
+    # One fund without a Gestora: it counts in the total only
+    lc = lifecycle.copy()
+    lc.loc[lc.index[5], 'Gestora'] = np.nan
+    return lc
+
+
+def test_total_and_entities_match_brute_force(stocked, as_of):
+    stock = FundStock(stocked, 'Gestora', as_of)
+    days = pd.date_range(stock.start, as_of, periods=25).normalize()
+    total = stock.series()
+    for day in days:
+        live = _live(stocked, day)
+        assert total[day] == live.sum()
+        want = stocked[live].groupby('Gestora').size()
+        got = stock.at(day)
+        np.testing.assert_array_equal(got.reindex(want.index).to_numpy(), want.to_numpy())
+        assert got.drop(want.index).eq(0).all()
+    assert total.index[-1] == as_of
+
+
+def test_frame_share_and_lists(stocked, as_of):
+    stock = FundStock(stocked, ['Gestora', 'Estructurado'], as_of)
+    keys = list(stock.entities[:3])
+    frame = stock.frame(keys, '2010-01-01', '2010-12-31')
+    assert len(frame) == 365
+    for key in keys:
+        np.testing.assert_array_equal(frame[key], stock.series(key, '2010-01-01', '2010-12-31'))
+    np.testing.assert_array_equal(stock.series(keys, '2010-01-01', '2010-12-31'), frame.sum(axis=1))
+    share = stock.share(keys, '2010-01-01', '2010-12-31')
+    total = stock.series(None, '2010-01-01', '2010-12-31').to_numpy()
+    np.testing.assert_allclose(share.to_numpy(), frame.to_numpy() * 100 / total[:, None])
+    with pytest.raises(KeyError):
+        stock.series([('NO SUCH GESTORA', False)])
+
+
+def test_total_only(stocked, as_of):
+    stock = FundStock(stocked, None, as_of)
+    assert len(stock.entities) == 0 and stock.matrix.shape == (0, stock.days)
+    assert stock.series()[as_of] == _live(stocked, as_of).sum()
@@ -0,0 +1,236 @@
+import numpy as np
+import pytest
+
+from cnmv.survival import (FILTER_TYPES, HORIZONS, LaunchYearIndex, SurvivalCurve, _durations, _subset, binned_hazard,
+                           entity_survival, greenwood_band, grouped_counts, grouped_km, kaplan_meier, km_counts, logrank, nelson_aalen, range_label,
+                           rolling_ranges, smoothed_hazard)
+
+
+def _product_limit(duration, event):
+    """Reference KM: one pass per distinct time, censored funds at risk at their own time."""
+    times, survival, s = [0.0], [1.0], 1.0
+    for t in np.unique(duration):
+        at_risk = (duration >= t).sum()
+        deaths = ((duration == t) & event).sum()
+        s *= 1 - deaths / at_risk
+        times.append(t)
+        survival.append(s)
+    return np.array(times), np.array(survival)
+
+
+@pytest.fixture(scope='module')
+def durations(lifecycle, as_of):
+    duration, event, year = _durations(lifecycle, 'all', as_of)
+    return duration, event, year
+
+
+def test_kaplan_meier_matches_product_limit(durations):
+    duration, event, _ = durations
+    times, survival, n = kaplan_meier(duration, event)
+    want_times, want_survival = _product_limit(duration, event)
+    assert n == len(duration)
+    np.testing.assert_allclose(times, want_times)
+    np.testing.assert_allclose(survival, want_survival)
+
+
+def test_grouped_km_matches_per_group_curves(durations):
+    duration, event, year = durations
+    group = year % 4
+    curves = grouped_km(duration, event, group)
+    for g in np.unique(group):
+        rows = curves[curves['group'] == g]
+        want_times, want_survival = _product_limit(duration[group == g], event[group == g])
+        np.testing.assert_allclose(rows['time'], want_times[1:])
+        np.testing.assert_allclose(rows['survival'], want_survival[1:])
+
+
+def test_grouped_km_curve_reaching_zero():
+    duration = np.array([1.0, 2.0, 2.0, 1.0])
+    event = np.array([True, True, True, False])
+    curves = grouped_km(duration, event, np.array([0, 0, 0, 1]))
+    np.testing.assert_allclose(curves['survival'], [2 / 3, 0.0, 1.0])
+
+
+def test_grouped_km_sparse_unsorted_codes(durations):
+    duration, event, year = durations
+    rng = np.random.default_rng(3)
+    group = np.array([7, 1000, 42])[rng.integers(0, 3, len(duration))]
+    curves = grouped_km(duration, event, group)
+    assert curves['group'].unique().tolist() == [7, 42, 1000]
+    for g in (7, 42, 1000):
+        rows = curves[curves['group'] == g]
+        mask = group == g
+        want_times, want_survival = _product_limit(duration[mask], event[mask])
+        np.testing.assert_allclose(rows['survival'], want_survival[1:])
+        np.testing.assert_array_equal(rows['at_risk'], [(duration[mask] >= t).sum() for t in want_times[1:]])
+
+
+@pytest.mark.parametrize('by', ['Gestora', ['Gestora', 'Depositaria']])
+def test_entity_survival_matches_per_entity_km(lifecycle, as_of, durations, by):
+    duration, event, _ = durations
+    table = entity_survival(lifecycle, by, as_of=as_of)
+    keys = lifecycle[[by] if isinstance(by, str) else by]
+    present = keys.notna().all(axis=1).to_numpy()
+    assert table['n'].sum() == present.sum()
+
+    for key, rows in keys[present].groupby(list(keys.columns), sort=True):
+        mask = lifecycle.index.isin(rows.index)
+        got = table.loc[key]
+        assert (got['n'], got['events']) == (mask.sum(), event[mask].sum())
+        want_times, want_survival = _product_limit(duration[mask], event[mask])
+        for h in HORIZONS:
+            assert got[f'surv_{h}'] == pytest.approx(want_survival[np.searchsorted(want_times, h, side='right') - 1])
+
+
+def _logrank_reference(duration, event, group):
+    """Reference k-sample log-rank statistic, one distinct death time at a time."""
+    groups = np.unique(group)
+    u = np.zeros(len(groups))
+    v = np.zeros((len(groups), len(groups)))
+    for t in np.unique(duration[event]):
+        risk = duration >= t
+        n = risk.sum()
+        d = ((duration == t) & event).sum()
+        n_g = np.array([(risk & (group == g)).sum() for g in groups])
+        d_g = np.array([((duration == t) & event & (group == g)).sum() for g in groups])
+        u += d_g - d * n_g / n
+        if n > 1:
+            share = n_g / n
+            v += d * (n - d) / (n - 1) * (np.diag(share) - np.outer(share, share))
+    return float(u[:-1] @ np.linalg.solve(v[:-1, :-1], u[:-1])), len(groups) - 1
+
+
+def test_logrank_matches_reference(durations):
+    duration, event, year = durations
+    group = (year >= 2012).astype(np.int64) + (year >= 2018)
+    _, at_risk, deaths, _ = grouped_counts(duration, event, group, 3)
+    chi2, df, p_value = logrank(at_risk, deaths)
+    want_chi2, want_df = _logrank_reference(duration, event, group)
+    assert df == want_df
+    assert chi2 == pytest.approx(want_chi2, rel=1e-9)
+    # scipy is not a dependency; it only checks the series p-value when present
+    stats = pytest.importorskip('scipy.stats')
+    assert p_value == pytest.approx(stats.chi2.sf(want_chi2, want_df), rel=1e-6, abs=1e-300)
+
+
+def test_greenwood_band_by_hand():
+    at_risk, deaths = np.array([5, 4, 2, 1]), np.array([1, 1, 0, 1])
+    survival = np.array([4 / 5, 3 / 5, 3 / 5, 0.0])
+    lower, upper = greenwood_band(survival, at_risk, deaths, level=0.95)
+
+    # Greenwood sum Σ d / (n (n − d)); Var S = S² Σ, Var log(−log S) = Σ / (log S)²
+    greenwood = np.array([1 / 20, 1 / 20 + 1 / 12, 1 / 20 + 1 / 12])
+    s = survival[:3]
+    var_s = s ** 2 * greenwood
+    np.testing.assert_allclose(var_s, [0.032, 0.048, 0.048])
+    half = 1.959963984540054 * np.sqrt(var_s) / (s * np.abs(np.log(s)))
+    np.testing.assert_allclose(np.log(-np.log(lower[:3])), np.log(-np.log(s)) + half)
+    np.testing.assert_allclose(np.log(-np.log(upper[:3])), np.log(-np.log(s)) - half)
+    np.testing.assert_allclose(lower[:3], s ** np.exp(half))
+    assert np.all((lower[:3] < s) & (s < upper[:3]))
+    # Everyone left dies: the band collapses to 0
+    assert (lower[3], upper[3]) == (0.0, 0.0)
+
+
+def test_greenwood_band_before_any_death_is_one():
+    lower, upper = greenwood_band(np.array([1.0, 0.5]), np.array([4, 2]), np.array([0, 1]))
+    assert (lower[0], upper[0]) == (1.0, 1.0)
+    assert 0 < lower[1] < 0.5 < upper[1] < 1
+
+
+def test_logrank_identical_groups_is_zero(durations):
+    duration, event, _ = durations
+    group = np.r_[np.zeros(len(duration), dtype=np.int64), np.ones(len(duration), dtype=np.int64)]
+    _, at_risk, deaths, _ = grouped_counts(np.r_[duration, duration], np.r_[event, event], group, 2)
+    chi2, df, p_value = logrank(at_risk, deaths)
+    assert (chi2, df) == (pytest.approx(0, abs=1e-9), 1)
+    assert p_value == pytest.approx(1)
+
+
+@pytest.mark.parametrize('filter_type', FILTER_TYPES)
+def test_launch_year_index_slices_match_direct_km(lifecycle, as_of, filter_type):
+    duration, event, year = _durations(lifecycle, filter_type, as_of)
+    life = _subset(lifecycle, filter_type)['Vida_Anos'].to_numpy(dtype=float)
+    index = LaunchYearIndex(lifecycle, filter_type, as_of)
+    # Uneven custom bins, a single year, ranges past either end, and overlapping rolling windows
+    ranges = [(1990, 2004), (2005, 2005), (2006, 2013), (2014, 2040)]
+    ranges += rolling_ranges(index.first, index.last, 7, 3)
+    curves = index.curves(ranges, min_size=1)
+    times, at_risk, _, _ = index.counts(ranges)
+    horizons = np.arange(0.0, 30.0, 0.25)
+
+    for i, (lo, hi) in enumerate(ranges):
+        mask = (year >= lo) & (year <= hi)
+        np.testing.assert_array_equal(at_risk[:, i], (duration[mask][None, :] >= times[:, None]).sum(axis=1))
+        if not mask.any():
+            continue
+        curve = curves[range_label(lo, hi)]
+        assert (curve.n, curve.events) == (mask.sum(), event[mask].sum())
+
+        want_times, want_survival = _product_limit(duration[mask], event[mask])
+        idx = np.searchsorted(want_times, horizons, side='right') - 1
+        np.testing.assert_allclose(curve.at(horizons), want_survival[idx])
+        below = np.flatnonzero(want_survival <= 0.5)
+        want_median = want_times[below[0]] if len(below) else np.nan
+        np.testing.assert_allclose(curve.median(), want_median)
+        dead = mask & ~np.isnan(life)
+        want_life = np.median(life[dead]) if dead.any() else np.nan
+        np.testing.assert_allclose(curve.median_life, want_life)
+
+
+def test_survival_curve_steps_and_median():
+    curve = SurvivalCurve([0.0, 1.0, 2.5, 4.0], [1.0, 0.8, 0.5, 0.3], n=10, events=6)
+    # Before the first time, on each step, between steps, and past the last time
+    horizons = [-1.0, 0.0, 0.5, 1.0, 2.0, 2.5, 3.99, 4.0, 50.0]
+    np.testing.assert_allclose(curve.at(horizons), [1.0, 1.0, 1.0, 0.8, 0.8, 0.5, 0.5, 0.3, 0.3])
+    # S reaches exactly 0.5 at 2.5
+    assert curve.median() == 2.5
+    assert SurvivalCurve([0.0, 1.0, 3.0], [1.0, 0.6, 0.45], n=5, events=2).median() == 3.0
+
+
+def test_survival_curve_never_reaching_half():
+    curve = SurvivalCurve([0.0, 2.0, 5.0], [1.0, 0.9, 0.7], n=10, events=3)
+    assert np.isnan(curve.median())
+    np.testing.assert_allclose(curve.at([1.0, 5.0, 20.0]), [1.0, 0.7, 0.7])
+    assert (curve.active, curve.mortality) == (7, 0.3)
+
+
+def test_nelson_aalen_matches_brute_force(durations):
+    duration, event, _ = durations
+    times, at_risk, deaths, _ = km_counts(duration, event)
+    want = np.cumsum([((duration == t) & event).sum() / (duration >= t).sum() for t in times])
+    np.testing.assert_allclose(nelson_aalen(at_risk, deaths), want)
+
+
+@pytest.mark.parametrize('width', [1.0, 2.5])
+def test_binned_hazard_is_deaths_over_exposure(durations, width):
+    duration, event, _ = durations
+    times, at_risk, deaths, _ = km_counts(duration, event)
+    starts, rates = binned_hazard(times, at_risk, deaths, width=width, max_age=20)
+    assert np.allclose(starts, np.arange(0.0, 20.0 - width + 1e-9, width))
+    for a, rate in zip(starts, rates):
+        died = ((duration >= a) & (duration < a + width) & event).sum()
+        exposure = np.clip(duration - a, 0, width).sum()
+        assert rate == pytest.approx(died / exposure, rel=1e-9)
+
+
+def test_binned_hazard_by_hand():
+    # Three funds: one dies at 0.5, one is censored at 1.5, one dies at 2.5
+    times, at_risk, deaths = np.array([0.5, 1.5, 2.5]), np.array([3, 2, 1]), np.array([1, 0, 1])
+    starts, rates = binned_hazard(times, at_risk, deaths)
+    # Fund-years: [0, 1) 0.5 + 1 + 1, [1, 2) 0.5 + 1
+    np.testing.assert_allclose(starts, [0.0, 1.0])
+    np.testing.assert_allclose(rates, [1 / 2.5, 0 / 1.5])
+
+
+def test_smoothed_hazard_matches_kernel_sum(durations):
+    duration, event, _ = durations
+    times, at_risk, deaths, _ = km_counts(duration, event)
+    bandwidth = 1.5
+    grid, rates = smoothed_hazard(times, nelson_aalen(at_risk, deaths), bandwidth)
+    want = np.zeros(len(grid))
+    for t, n, d in zip(times, at_risk, deaths):
+        u = (grid - t) / bandwidth
+        want += np.where(np.abs(u) < 1, 0.75 * (1 - u ** 2), 0.0) * d / n / bandwidth
+    assert grid[0] == 0 and grid[-1] == pytest.approx(times[-1], abs=0.1)
+    np.testing.assert_allclose(rates, want, atol=1e-12)